@@ -1 +1,19 @@
 """Main conftest.py file."""
+
+import pytest
+
+from snippet_annotation.utilities.cache import configure_default_cache
+
+
+@pytest.fixture(autouse=True)
+def annotation_cache(tmp_path):
+    """Keeps data cached by loaders in a temporary directory during tests.
+
+    Args:
+        tmp_path: Temporary directory unique to the test.
+
+    Yields:
+        The default cache used by loaders.
+    """
+    yield configure_default_cache(cache_dir=str(tmp_path / "cache"))
+    configure_default_cache()
@@ -0,0 +1,85 @@
+"""Compares memory used by slotted and regular annotation classes.
+
+Usage:
+    python -m scripts.benchmark_annotation_memory [num_objects]
+
+The given number of intervals and worker annotations (100000 by default) is
+created with the classes from `snippet_annotation.annotation` and with
+regular dataclasses with the same fields, and the memory allocated for them
+is reported.
+"""
+
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, List
+
+from snippet_annotation.annotation import InputText, Interval, WorkerAnnotation
+
+
+@dataclass
+class DictInterval:
+    """Interval stored in an instance dictionary."""
+
+    start: int
+    end: int
+
+
+@dataclass
+class DictWorkerAnnotation:
+    """Worker annotation stored in an instance dictionary."""
+
+    intervals: List[Any]
+    input_text: InputText
+    worker_id: str
+
+
+def get_allocated_bytes(create: Callable[[int], Any], num_objects: int) -> int:
+    """Measures memory allocated for objects kept alive by a list.
+
+    Args:
+        create: Function creating one object from its number.
+        num_objects: Number of objects to create.
+
+    Returns:
+        Number of allocated bytes.
+    """
+    tracemalloc.start()
+    objects = [create(i) for i in range(num_objects)]
+    allocated_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return allocated_bytes
+
+
+if __name__ == "__main__":
+    num_objects = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    input_text = InputText("query", "query_id", "text", "text_id")
+    benchmarks = [
+        (
+            "Interval",
+            lambda i: DictInterval(i, i + 1),
+            lambda i: Interval(i, i + 1),
+        ),
+        (
+            "FrozenWorkerAnnotation",
+            lambda i: DictWorkerAnnotation(
+                [DictInterval(i, i + 1)], input_text, "worker"
+            ),
+            lambda i: WorkerAnnotation(
+                [Interval(i, i + 1)], input_text, "worker"
+            ).freeze(),
+        ),
+    ]
+    for name, create_regular, create_slotted in benchmarks:
+        regular_bytes = get_allocated_bytes(create_regular, num_objects)
+        slotted_bytes = get_allocated_bytes(create_slotted, num_objects)
+        print(
+            "{}: {:.1f} bytes per object with instance dictionaries, "
+            "{:.1f} bytes with slots ({:.1f}x less)".format(
+                name,
+                regular_bytes / num_objects,
+                slotted_bytes / num_objects,
+                regular_bytes / slotted_bytes,
+            )
+        )
@@ -0,0 +1,173 @@
+"""Measures the time of importing modules of the snippet_annotation package.
+
+Usage:
+    python -m scripts.benchmark_import_time [--repeat N] [--budget-ratio R]
+
+Every module is imported in a fresh interpreter started with
+`python -X importtime` and the cumulative import time of the module, including
+modules it imports, is reported. The budget is a fraction of the time of
+importing pandas measured in the same way, so that it does not depend on the
+speed of the machine. The script exits with status 1 if importing any module
+takes longer than the budget or loads a heavy dependency, which should only be
+imported by the code that uses it.
+"""
+
+import argparse
+import pkgutil
+import subprocess
+import sys
+from typing import Dict, List
+
+import snippet_annotation
+
+# Dependencies that are slow to import with package modules that may import
+# them eagerly.
+HEAVY_MODULES = {
+    "pandas": (),
+    "nltk": (),
+    "numpy": (
+        "snippet_annotation.interval_store",
+        "snippet_annotation.task_coverage",
+    ),
+}
+# Module whose import time is the baseline of the budget.
+BASELINE_MODULE = "pandas"
+# Import time budget of a module as a fraction of the baseline. Modules that do
+# not import heavy dependencies take about a quarter of the baseline.
+DEFAULT_BUDGET_RATIO = 0.5
+
+
+def get_package_modules() -> List[str]:
+    """Lists modules of the snippet_annotation package.
+
+    Returns:
+        Names of modules.
+    """
+    return sorted(
+        module.name
+        for module in pkgutil.walk_packages(
+            snippet_annotation.__path__, snippet_annotation.__name__ + "."
+        )
+    )
+
+
+def measure_import_times(modules: List[str]) -> Dict[str, int]:
+    """Imports modules in a fresh interpreter and measures import times.
+
+    Args:
+        modules: Names of modules imported in the given order.
+
+    Raises:
+        CalledProcessError: If any of the modules cannot be imported.
+
+    Returns:
+        Cumulative import time in microseconds of every module imported by
+        the interpreter, indexed by the name of the module.
+    """
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "; ".join("import {}".format(module) for module in modules),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    # Lines have the form "import time: self [us] | cumulative | module".
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            import_times[module.strip()] = int(cumulative)
+    return import_times
+
+
+def get_heavy_modules(
+    import_times: Dict[str, int], modules: List[str]
+) -> List[str]:
+    """Finds heavy dependencies that should not have been imported.
+
+    Args:
+        import_times: Import times indexed by the name of the module.
+        modules: Names of package modules imported by the interpreter.
+
+    Returns:
+        Names of heavy dependencies that are imported although none of the
+        modules may import them.
+    """
+    return [
+        heavy_module
+        for heavy_module, importing_modules in HEAVY_MODULES.items()
+        if heavy_module in import_times
+        and not any(module in importing_modules for module in modules)
+    ]
+
+
+def parse_args() -> argparse.Namespace:
+    """Parses command line arguments.
+
+    Returns:
+        Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="benchmark_import_time.py",
+        description="Measures import time of snippet_annotation modules.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of imports of every module, the fastest one is kept.",
+    )
+    parser.add_argument(
+        "--budget-ratio",
+        type=float,
+        default=DEFAULT_BUDGET_RATIO,
+        help="Maximum import time of a module as a fraction of the import "
+        "time of {}.".format(BASELINE_MODULE),
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    baseline_ms = (
+        min(
+            measure_import_times([BASELINE_MODULE])[BASELINE_MODULE]
+            for _ in range(args.repeat)
+        )
+        / 1000
+    )
+    budget_ms = args.budget_ratio * baseline_ms
+    print(
+        "Budget: {:.1f} ms ({:.0%} of importing {} in {:.1f} ms)".format(
+            budget_ms, args.budget_ratio, BASELINE_MODULE, baseline_ms
+        )
+    )
+    failed = False
+    for module in get_package_modules():
+        measurements = [
+            measure_import_times([module]) for _ in range(args.repeat)
+        ]
+        import_time_ms = (
+            min(import_times[module] for import_times in measurements) / 1000
+        )
+        heavy_modules = get_heavy_modules(measurements[0], [module])
+        over_budget = import_time_ms > budget_ms
+        failed = failed or over_budget or len(heavy_modules) > 0
+        print(
+            "{:<50} {:>8.1f} ms{}{}".format(
+                module,
+                import_time_ms,
+                "  over budget" if over_budget else "",
+                "  imports " + ", ".join(heavy_modules)
+                if heavy_modules
+                else "",
+            )
+        )
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,46 @@
+"""Compares parsing of task answers against `ast.literal_eval`.
+
+Usage:
+    python -m scripts.benchmark_task_answers [data_dir]
+
+All `Answer.taskAnswers` cells found in CSV files under the given directory
+(`data/large_scale/all` by default) are parsed with both methods.
+"""
+
+import ast
+import os
+import sys
+import timeit
+
+import pandas as pd
+
+from snippet_annotation.utilities.task_answers import parse_task_answers
+
+if __name__ == "__main__":
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "data/large_scale/all"
+    payloads = []
+    for root, _, files in os.walk(data_dir):
+        for file in files:
+            if file.endswith(".csv"):
+                annotated_data = pd.read_csv(os.path.join(root, file))
+                if "Answer.taskAnswers" in annotated_data.columns:
+                    payloads.extend(annotated_data["Answer.taskAnswers"])
+
+    literal_eval_time = min(
+        timeit.repeat(
+            lambda: [ast.literal_eval(payload) for payload in payloads],
+            number=1,
+            repeat=20,
+        )
+    )
+    parser_time = min(
+        timeit.repeat(
+            lambda: [parse_task_answers(payload, None) for payload in payloads],
+            number=1,
+            repeat=20,
+        )
+    )
+    print("Parsed {} task answers".format(len(payloads)))
+    print("ast.literal_eval:   {:.4f}s".format(literal_eval_time))
+    print("parse_task_answers: {:.4f}s".format(parser_time))
+    print("Speedup: {:.1f}x".format(literal_eval_time / parser_time))
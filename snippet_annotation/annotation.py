@@ -5,9 +5,9 @@ crowdsourcing task is annotated be several different workers. Each task
 can be done by a group of different workers.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 # The query_id and text_id used to index the dictionary of annotations done by
 # different workers.
@@ -40,20 +40,45 @@ class TaskVariant(Enum):
     PARAGRAPH = 2
 
 
-@dataclass
-class Interval:
+class _Slotted:
+    """Mixin for frozen dataclasses with slots instead of instance dicts.
+
+    Frozen instances cannot be unpickled by setting their slots, so they are
+    pickled as calls to the constructor with values of all fields.
+    """
+
+    __slots__: Tuple[str, ...] = ()
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        """Gets the constructor and arguments recreating the instance.
+
+        Returns:
+            Class of the instance and values of its fields.
+        """
+        return (
+            self.__class__,
+            tuple(getattr(self, name) for name in self.__slots__),
+        )
+
+
+@dataclass(frozen=True)
+class Interval(_Slotted):
     """Class for the start and end position of a snippet in a text."""
 
+    __slots__ = ("start", "end")
+
     # The start character position is included in the snippet.
     start: int
     # The end character position is not included in the snippet.
     end: int
 
 
-@dataclass
-class InputText:
+@dataclass(frozen=True)
+class InputText(_Slotted):
     """Class for input text (a paragraph or a sentence) for annotation task."""
 
+    __slots__ = ("query", "query_id", "text", "text_id")
+
     # Text of the query.
     query: str
     # Id of the query.
@@ -64,6 +89,100 @@ class InputText:
     text_id: str
 
 
+class TextStore:
+    """Class for query and text strings shared by many input texts.
+
+    Every worker annotating a text gets a row with its own copy of the query
+    and the text. The store keeps the first copy seen for every query_id and
+    text_id and hands it out instead of the later ones, so each distinct
+    text is held in memory once.
+    """
+
+    def __init__(self) -> None:
+        """Creates an empty store of queries and texts."""
+        self._queries: Dict[str, str] = {}
+        self._texts: Dict[str, str] = {}
+        self._input_texts: Dict[QueryPassage, InputText] = {}
+
+    def __len__(self) -> int:
+        """Counts distinct texts in the store.
+
+        Returns:
+            Number of texts.
+        """
+        return len(self._texts)
+
+    def get_query(self, query_id: str, query: str) -> str:
+        """Gets the shared copy of a query.
+
+        Args:
+            query_id: Id of the query.
+            query: Text of the query.
+
+        Returns:
+            Shared query string equal to the given one.
+        """
+        return _get_shared_string(self._queries, query_id, query)
+
+    def get_text(self, text_id: str, text: str) -> str:
+        """Gets the shared copy of a sentence or paragraph.
+
+        Args:
+            text_id: Id of the sentence or the paragraph.
+            text: Text of the sentence or the paragraph.
+
+        Returns:
+            Shared text string equal to the given one.
+        """
+        return _get_shared_string(self._texts, text_id, text)
+
+    def get_input_text(
+        self, query: str, query_id: str, text: str, text_id: str
+    ) -> InputText:
+        """Gets the input text shared by all annotations of the same text.
+
+        Args:
+            query: Text of the query.
+            query_id: Id of the query.
+            text: Text of the sentence or paragraph relevant to the query.
+            text_id: Id of the sentence or the paragraph.
+
+        Returns:
+            Input text referencing shared query and text strings.
+        """
+        input_text = self._input_texts.get((query_id, text_id))
+        if (
+            input_text is not None
+            and input_text.query == query
+            and input_text.text == text
+        ):
+            return input_text
+        input_text = InputText(
+            query=self.get_query(query_id, query),
+            query_id=query_id,
+            text=self.get_text(text_id, text),
+            text_id=text_id,
+        )
+        self._input_texts.setdefault((query_id, text_id), input_text)
+        return input_text
+
+
+def _get_shared_string(strings: Dict[str, str], key: str, string: str) -> str:
+    """Gets the first copy of a string stored under a key.
+
+    Args:
+        strings: Dictionary with shared strings.
+        key: Id of the string.
+        string: Copy of the string.
+
+    Returns:
+        The stored copy if it is equal to the given string, otherwise the
+        given string (a key reused for a different string is not shared).
+    """
+    shared_string = strings.setdefault(key, string)
+    return shared_string if shared_string == string else string
+
+
 @dataclass
 class WorkerAnnotation:
     """Class for annotation made for a text by one worker."""
@@ -74,6 +193,94 @@ class WorkerAnnotation:
     input_text: InputText
     # Id of the worker.
     worker_id: str
+    # Indicates whether intervals are known to be canonical, i.e., sorted,
+    # merged and within the text (see `canonicalize_annotation`). It is not
+    # compared, so canonical annotations equal the same annotations loaded
+    # without canonicalization.
+    canonical: bool = field(default=False, compare=False, repr=False)
+
+    def freeze(self) -> "FrozenWorkerAnnotation":
+        """Creates an immutable and hashable copy of the annotation.
+
+        Returns:
+            Frozen annotation with the same intervals, text and worker.
+        """
+        return FrozenWorkerAnnotation(
+            intervals=tuple(self.intervals),
+            input_text=self.input_text,
+            worker_id=self.worker_id,
+            canonical=self.canonical,
+        )
+
+
+@dataclass(frozen=True, init=False)
+class FrozenWorkerAnnotation(_Slotted):
+    """Class for immutable annotation made for a text by one worker.
+
+    Frozen annotations are hashable, so they can be put in sets or used as
+    keys of memoized measure values. They can be passed to measures in place
+    of worker annotations.
+    """
+
+    # The canonical flag is a slot but not a field, so it is neither compared
+    # nor hashed, in the same way as in worker annotations.
+    __slots__ = ("intervals", "input_text", "worker_id", "canonical")
+
+    # Tuple of selected intervals.
+    intervals: Tuple[Interval, ...]
+    # Text that is annotated.
+    input_text: InputText
+    # Id of the worker.
+    worker_id: str
+    if TYPE_CHECKING:
+        # Indicates whether intervals are known to be canonical.
+        canonical: bool
+
+    def __init__(
+        self,
+        intervals: Tuple[Interval, ...],
+        input_text: InputText,
+        worker_id: str,
+        canonical: bool = False,
+    ) -> None:
+        """Immutable annotation made for a text by one worker.
+
+        Args:
+            intervals: Tuple of selected intervals.
+            input_text: Text that is annotated.
+            worker_id: Id of the worker.
+            canonical (optional): Indicates whether intervals are known to be
+               canonical (see `WorkerAnnotation`). (Defaults to False.)
+        """
+        object.__setattr__(self, "intervals", intervals)
+        object.__setattr__(self, "input_text", input_text)
+        object.__setattr__(self, "worker_id", worker_id)
+        object.__setattr__(self, "canonical", canonical)
+
+    def thaw(self) -> WorkerAnnotation:
+        """Creates a mutable copy of the annotation.
+
+        Returns:
+            Worker annotation with the same intervals, text and worker.
+        """
+        return WorkerAnnotation(
+            intervals=list(self.intervals),
+            input_text=self.input_text,
+            worker_id=self.worker_id,
+            canonical=self.canonical,
+        )
+
+
+@dataclass
+class HITMetadata:
+    """Class for metadata of a HIT assignment done by one worker."""
+
+    # Id of the assignment.
+    assignment_id: str
+    # Status of the assignment (e.g., Submitted, Approved, Rejected).
+    assignment_status: str
+    # Time spent by the worker on the assignment, None if it is missing.
+    work_time_in_seconds: Optional[int]
 
 
 @dataclass
@@ -0,0 +1,328 @@
+"""Index of character positions selected by workers in annotated passages.
+
+For every passage, the start and end positions of all intervals split the
+passage into elementary segments, such that every character in a segment is
+selected by the same workers. Boundaries of segments are kept sorted, so the
+segment containing a position is found with binary search and stabbing queries
+take logarithmic time in the number of intervals. The union of intervals of
+every worker is kept sorted as well, so overlap queries take logarithmic time
+in the number of intervals for every worker who annotated the passage.
+
+Annotations can be added incrementally, e.g., as files are loaded, and the
+index of a passage is rebuilt only when it is queried after annotations for
+it were added.
+"""
+
+import bisect
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from snippet_annotation.annotation import (
+    Interval,
+    QueryPassage,
+    WorkerAnnotation,
+)
+from snippet_annotation.utilities.annotation_utilities import merge_intervals
+
+
+class _PassageIndex:
+    """Class for elementary segments of an annotated passage."""
+
+    def __init__(self, worker_intervals: List[Tuple[str, Interval]]) -> None:
+        """Elementary segments of intervals selected in a passage.
+
+        Args:
+            worker_intervals: Worker ids with intervals selected by them.
+        """
+        # Changes of the number of intervals of every worker covering a
+        # position compared to the previous position.
+        coverage_changes: Dict[int, Dict[str, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+        intervals_by_worker: Dict[str, List[Interval]] = defaultdict(list)
+        for worker_id, interval in worker_intervals:
+            if interval.start < interval.end:
+                coverage_changes[interval.start][worker_id] += 1
+                coverage_changes[interval.end][worker_id] -= 1
+                intervals_by_worker[worker_id].append(interval)
+
+        # Start and end positions of the union of intervals of every worker,
+        # the union is disjoint, so both lists are sorted.
+        self.worker_starts: Dict[str, List[int]] = {}
+        self.worker_ends: Dict[str, List[int]] = {}
+        for worker_id, intervals in intervals_by_worker.items():
+            intervals_union = merge_intervals(
+                sorted(intervals, key=lambda interval: interval.start)
+            )
+            self.worker_starts[worker_id] = [
+                interval.start for interval in intervals_union
+            ]
+            self.worker_ends[worker_id] = [
+                interval.end for interval in intervals_union
+            ]
+
+        # Characters from boundaries[i] to boundaries[i + 1] - 1 are selected
+        # by segment_workers[i].
+        self.boundaries = sorted(coverage_changes)
+        self.segment_workers: List[FrozenSet[str]] = []
+        coverage: Dict[str, int] = defaultdict(int)
+        for position in self.boundaries:
+            for worker_id, change in coverage_changes[position].items():
+                coverage[worker_id] += change
+                if coverage[worker_id] == 0:
+                    del coverage[worker_id]
+            self.segment_workers.append(frozenset(coverage))
+        self.max_votes = max(map(len, self.segment_workers), default=0)
+
+    def get_segment(self, position: int) -> int:
+        """Finds the elementary segment containing a position.
+
+        Args:
+            position: Character position.
+
+        Returns:
+            Position of the segment or -1 if the position is before the first
+            boundary.
+        """
+        return bisect.bisect_right(self.boundaries, position) - 1
+
+    def get_workers_at(self, position: int) -> FrozenSet[str]:
+        """Finds workers who selected the character at a position.
+
+        Args:
+            position: Character position.
+
+        Returns:
+            Ids of workers.
+        """
+        segment = self.get_segment(position)
+        if segment < 0:
+            return frozenset()
+        return self.segment_workers[segment]
+
+    def get_workers_overlapping(self, start: int, end: int) -> FrozenSet[str]:
+        """Finds workers who selected any character in a range.
+
+        Args:
+            start: First character position of the range.
+            end: Position after the last character of the range.
+
+        Returns:
+            Ids of workers.
+        """
+        if start >= end:
+            return frozenset()
+        workers = []
+        for worker_id, ends in self.worker_ends.items():
+            # Intervals of the worker are disjoint, so the range overlaps one
+            # of them only if it overlaps the first one ending after start.
+            i = bisect.bisect_right(ends, start)
+            if i < len(ends) and self.worker_starts[worker_id][i] < end:
+                workers.append(worker_id)
+        return frozenset(workers)
+
+    def get_spans_with_votes(self, k: int) -> List[Interval]:
+        """Finds spans of characters selected by at least k workers.
+
+        Args:
+            k: The minimum number of workers.
+
+        Returns:
+            List of maximal spans, where a span (1, 3) covers characters on
+            positions 1 and 2.
+        """
+        return merge_intervals(
+            Interval(start, end)
+            for start, end, workers in zip(
+                self.boundaries, self.boundaries[1:], self.segment_workers
+            )
+            if len(workers) >= max(k, 1)
+        )
+
+
+class AnnotationIndex:
+    """Class for the index of workers who selected characters of passages."""
+
+    def __init__(self) -> None:
+        """Index of workers who selected characters of annotated passages.
+
+        A character at position p is selected by a worker if p is covered by
+        an interval (start, end) of the worker, i.e., start <= p < end, and
+        the number of votes for a character is the number of distinct workers
+        who selected it.
+        """
+        self._worker_intervals: Dict[
+            QueryPassage, List[Tuple[str, Interval]]
+        ] = {}
+        self._passage_indexes: Dict[QueryPassage, _PassageIndex] = {}
+
+    @classmethod
+    def from_annotations(
+        cls, annotations: Dict[QueryPassage, List[WorkerAnnotation]]
+    ) -> "AnnotationIndex":
+        """Creates index of annotations.
+
+        Args:
+            annotations: Dictionary of annotations done by different workers
+               for each text indexed by (query_id, text_id) tuples, e.g.,
+               annotations of TaskAnnotations or TaskData.
+
+        Returns:
+            Index of annotations.
+        """
+        index = cls()
+        index.add_annotations(annotations)
+        return index
+
+    def add_annotations(
+        self, annotations: Dict[QueryPassage, List[WorkerAnnotation]]
+    ) -> None:
+        """Adds annotations to the index.
+
+        Annotations of passages that are already indexed are added to the
+        existing ones.
+
+        Args:
+            annotations: Dictionary of annotations done by different workers
+               for each text indexed by (query_id, text_id) tuples.
+        """
+        for key, workers_annotations in annotations.items():
+            worker_intervals = self._worker_intervals.setdefault(key, [])
+            for annotation in workers_annotations:
+                worker_intervals.extend(
+                    (annotation.worker_id, interval)
+                    for interval in annotation.intervals
+                )
+            self._passage_indexes.pop(key, None)
+
+    def __len__(self) -> int:
+        """Counts indexed passages.
+
+        Returns:
+            Number of passages.
+        """
+        return len(self._worker_intervals)
+
+    def __contains__(self, key: QueryPassage) -> bool:
+        """Checks whether a passage is indexed.
+
+        Args:
+            key: (query_id, text_id) tuple of the passage.
+
+        Returns:
+            True if annotations of the passage were added.
+        """
+        return key in self._worker_intervals
+
+    def _get_passage_index(self, key: QueryPassage) -> _PassageIndex:
+        """Gets the index of a passage, building it if needed.
+
+        Args:
+            key: (query_id, text_id) tuple of the passage.
+
+        Raises:
+            KeyError: If no annotations of the passage were added.
+
+        Returns:
+            Index of the passage.
+        """
+        passage_index = self._passage_indexes.get(key)
+        if passage_index is None:
+            if key not in self._worker_intervals:
+                raise KeyError(key)
+            passage_index = _PassageIndex(self._worker_intervals[key])
+            self._passage_indexes[key] = passage_index
+        return passage_index
+
+    def get_workers_at(self, key: QueryPassage, position: int) -> List[str]:
+        """Finds workers who selected the character at a position.
+
+        Args:
+            key: (query_id, text_id) tuple of the passage.
+            position: Character position.
+
+        Raises:
+            KeyError: If no annotations of the passage were added.
+
+        Returns:
+            Sorted ids of workers.
+        """
+        return sorted(self._get_passage_index(key).get_workers_at(position))
+
+    def get_votes_at(self, key: QueryPassage, position: int) -> int:
+        """Counts workers who selected the character at a position.
+
+        Args:
+            key: (query_id, text_id) tuple of the passage.
+            position: Character position.
+
+        Raises:
+            KeyError: If no annotations of the passage were added.
+
+        Returns:
+            Number of votes.
+        """
+        return len(self._get_passage_index(key).get_workers_at(position))
+
+    def get_workers_overlapping(
+        self, key: QueryPassage, start: int, end: int
+    ) -> List[str]:
+        """Finds workers who selected any character in a range.
+
+        Args:
+            key: (query_id, text_id) tuple of the passage.
+            start: First character position of the range.
+            end: Position after the last character of the range.
+
+        Raises:
+            KeyError: If no annotations of the passage were added.
+
+        Returns:
+            Sorted ids of workers.
+        """
+        return sorted(
+            self._get_passage_index(key).get_workers_overlapping(start, end)
+        )
+
+    def get_max_votes(self, key: QueryPassage) -> int:
+        """Counts votes for the characters of a passage selected most often.
+
+        Args:
+            key: (query_id, text_id) tuple of the passage.
+
+        Raises:
+            KeyError: If no annotations of the passage were added.
+
+        Returns:
+            The maximum number of votes.
+        """
+        return self._get_passage_index(key).max_votes
+
+    def get_spans_with_votes(self, key: QueryPassage, k: int) -> List[Interval]:
+        """Finds spans of characters selected by at least k workers.
+
+        Args:
+            key: (query_id, text_id) tuple of the passage.
+            k: The minimum number of workers.
+
+        Raises:
+            KeyError: If no annotations of the passage were added.
+
+        Returns:
+            List of maximal spans, where a span (1, 3) covers characters on
+            positions 1 and 2.
+        """
+        return self._get_passage_index(key).get_spans_with_votes(k)
+
+    def find_passages_with_votes(self, k: int) -> Iterable[QueryPassage]:
+        """Finds passages with a character selected by at least k workers.
+
+        Args:
+            k: The minimum number of workers.
+
+        Yields:
+            (query_id, text_id) tuples of passages.
+        """
+        for key in self._worker_intervals:
+            if self.get_max_votes(key) >= k:
+                yield key
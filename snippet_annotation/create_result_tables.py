@@ -1,10 +1,15 @@
 """Main methods for generating LaTeX tables with values of measures."""
 
+import argparse
+import logging
 import os
 import os.path
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
-import pandas as pd
+if TYPE_CHECKING:
+    # pandas is imported where it is used, so that importing the module does
+    # not load it.
+    import pandas as pd
 
 from snippet_annotation.annotation import (
     ConfidenceScore,
@@ -13,15 +18,21 @@ from snippet_annotation.annotation import (
     TaskVariant,
     WorkerType,
 )
-from snippet_annotation.measures.jaccard import Jaccard, JaccardLenient
-from snippet_annotation.measures.rouge import Rouge, RougeMeasure, RougeVariant
+from snippet_annotation.measures.jaccard import Jaccard, MultiThresholdJaccard
+from snippet_annotation.measures.rouge import (
+    FusedRouge,
+    Rouge,
+    RougeMeasure,
+    RougeVariant,
+)
+from snippet_annotation.utilities.cache import configure_default_cache
 from snippet_annotation.utilities.conversion import (
     AnnotationSource,
     convert_paragraph_task_annotation_to_sentence_based,
 )
-from snippet_annotation.utilities.data_loader import (
-    load_confidence_values_from_file,
-    load_worker_annotations_from_file,
+from snippet_annotation.utilities.data_loader import load_task_data_from_files
+from snippet_annotation.utilities.sentence_tokenizer import (
+    configure_default_segmentation_cache,
 )
 
 
@@ -40,18 +51,13 @@ def _get_jaccard_results(
         variant of the measure. Second element of the tuple is a dictionary with
         values of lenient variant of the measure for every k.
     """
-    jaccard = Jaccard()
-    jaccard_agreement = round(
-        jaccard.get_task_inter_annotator_agreement(task_annotations), 2
-    )
-    jaccard_k_agreements = {}
-    for k in k_values:
-        jaccard_n = JaccardLenient(k=k)
-        jaccard_k_agreements[k] = round(
-            jaccard_n.get_task_inter_annotator_agreement(task_annotations), 2
-        )
+    jaccard_agreement, jaccard_k_agreements = MultiThresholdJaccard(
+        k_values
+    ).get_task_inter_annotator_agreements(task_annotations)
 
-    return jaccard_agreement, jaccard_k_agreements
+    return round(jaccard_agreement, 2), {
+        k: round(agreement, 2) for k, agreement in jaccard_k_agreements.items()
+    }
 
 
 def _get_rouge_measures_results(
@@ -69,18 +75,13 @@ def _get_rouge_measures_results(
     Returns:
         Dictionary with values of Rouge measures.
     """
-    rouge_measures = {}
-    for rouge_measure in RougeMeasure:
-        rouge = Rouge(
-            rouge_measure=rouge_measure, rouge_variant=RougeVariant.MEAN
-        )
-        rouge_measures[rouge_measure] = round(
-            rouge.get_task_reference_annotator_agreement(
-                reference_task_annotations, worker_task_annotations
-            ),
-            2,
-        )
-    return rouge_measures
+    rouge_scores = FusedRouge(rouge_variant=RougeVariant.MEAN).get_task_scores(
+        reference_task_annotations, worker_task_annotations
+    )
+    return {
+        rouge_measure: round(rouge_scores.get_measure_value(rouge_measure), 2)
+        for rouge_measure in RougeMeasure
+    }
 
 
 def _get_rouge_variants_results(
@@ -119,27 +120,33 @@ def _aggregate_topics_annotations(
     topics_files_paths: List[str],
     worker_type: WorkerType,
     task_variant: TaskVariant,
+    num_workers: int = 1,
 ) -> TaskAnnotations:
     """Combines annotations for multiple topics in one dictionary.
 
+    Annotations are merged in the order of files, so for texts annotated in
+    several files the annotations from the last file are kept.
+
     Args:
         topics_files_paths: Paths to annotations files for different topics.
         worker_type: Type of the worker.
         task_variant: Variant of the task.
+        num_workers (optional): Number of processes parsing files. (Defaults
+           to 1.)
 
     Returns:
         One TaskAnnotations object with annotations aggregated from multiple
         topics.
     """
     topics_annotations = {}
-    for topic_file in topics_files_paths:
-        topic_annotations = load_worker_annotations_from_file(
-            topic_file,
-            AnnotationSource.PROLIFIC
-            if worker_type == WorkerType.PROLIFIC
-            else AnnotationSource.MTURK,
-        )
-        topics_annotations.update(topic_annotations)
+    for topic_data in load_task_data_from_files(
+        topics_files_paths,
+        AnnotationSource.PROLIFIC
+        if worker_type == WorkerType.PROLIFIC
+        else AnnotationSource.MTURK,
+        num_workers,
+    ):
+        topics_annotations.update(topic_data.annotations)
     return TaskAnnotations(
         annotations=topics_annotations,
         worker_type=worker_type,
@@ -148,8 +155,8 @@ def _aggregate_topics_annotations(
 
 
 def get_rouge_results_as_dataframes(
-    annotations_dir_path: str,
-) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    annotations_dir_path: str, num_workers: int = 1
+) -> Tuple["pd.DataFrame", "pd.DataFrame"]:
     """Creates two dataframes with values of Rouge measures.
 
     Measures are computed for all files in a given directory. Annotations for
@@ -157,6 +164,8 @@ def get_rouge_results_as_dataframes(
 
     Args:
         annotations_dir_path: Path with annotations files.
+        num_workers (optional): Number of processes parsing files. (Defaults
+           to 1.)
 
     Returns:
         A dataframe with values of Rouge measures for all types of annotation
@@ -174,17 +183,18 @@ def get_rouge_results_as_dataframes(
         and WorkerType.EXPERT.name.lower() in file
     ]
     paragraph_expert_annotations = _aggregate_topics_annotations(
-        paragraph_expert_topic_files, WorkerType.EXPERT, TaskVariant.PARAGRAPH
+        paragraph_expert_topic_files,
+        WorkerType.EXPERT,
+        TaskVariant.PARAGRAPH,
+        num_workers,
     )
     sentence_expert_topics_annotations = {}
-    for topic_file in paragraph_expert_topic_files:
-        paragraph_topic_annotations = load_worker_annotations_from_file(
-            topic_file,
-            AnnotationSource.MTURK,
-        )
+    for paragraph_topic_data in load_task_data_from_files(
+        paragraph_expert_topic_files, AnnotationSource.MTURK, num_workers
+    ):
         sentence_topic_annotations = (
             convert_paragraph_task_annotation_to_sentence_based(
-                paragraph_topic_annotations
+                paragraph_topic_data.annotations
             )
         )
         sentence_expert_topics_annotations.update(sentence_topic_annotations)
@@ -216,7 +226,7 @@ def get_rouge_results_as_dataframes(
 
             if len(topic_files) > 0:
                 workers_annotations = _aggregate_topics_annotations(
-                    topic_files, worker_type, task_variant
+                    topic_files, worker_type, task_variant, num_workers
                 )
                 rouge_measures = _get_rouge_measures_results(
                     expert_annotations, workers_annotations
@@ -245,6 +255,8 @@ def get_rouge_results_as_dataframes(
                     ]
                 )
 
+    import pandas as pd
+
     rouge_measures_values_pd = pd.DataFrame(rouge_measures_values)
     rouge_measures_values_pd.columns = [
         "Task variant",
@@ -266,32 +278,58 @@ def get_rouge_results_as_dataframes(
     return (rouge_measures_values_pd, rouge_variants_values_pd)
 
 
-def _aggregate_confidence_scores(
+def _aggregate_topics_annotations_and_confidence_scores(
     topics_files_paths: List[str],
-) -> Dict[QueryPassage, List[ConfidenceScore]]:
-    """Combines confidence scores for multiple topics in one dictionary.
+    worker_type: WorkerType,
+    task_variant: TaskVariant,
+    num_workers: int = 1,
+) -> Tuple[TaskAnnotations, Dict[QueryPassage, List[ConfidenceScore]]]:
+    """Combines annotations and confidence scores for multiple topics.
+
+    Every file is read only once.
 
     Args:
         topics_files_paths: Paths to annotations files for different topics.
+        worker_type: Type of the worker.
+        task_variant: Variant of the task.
+        num_workers (optional): Number of processes parsing files. (Defaults
+           to 1.)
 
     Returns:
-        Dictionary indexed by input text id with lists of confidence scores for
-        each passage and each worker in all topics files.
+        One TaskAnnotations object with annotations aggregated from multiple
+        topics and a dictionary indexed by input text id with lists of
+        confidence scores for each passage and each worker in all topics files.
     """
+    topics_annotations = {}
     confidence_scores = {}
-    for topic_file in topics_files_paths:
-        topic_confidence_scores = load_confidence_values_from_file(topic_file)
-        confidence_scores.update(topic_confidence_scores)
-    return confidence_scores
+    for topic_data in load_task_data_from_files(
+        topics_files_paths,
+        AnnotationSource.PROLIFIC
+        if worker_type == WorkerType.PROLIFIC
+        else AnnotationSource.MTURK,
+        num_workers,
+    ):
+        topics_annotations.update(topic_data.annotations)
+        confidence_scores.update(topic_data.confidence_scores)
+    return (
+        TaskAnnotations(
+            annotations=topics_annotations,
+            worker_type=worker_type,
+            sentence_based=task_variant == TaskVariant.SENTENCES,
+        ),
+        confidence_scores,
+    )
 
 
 def get_jaccard_and_confidence_score_results_as_dataframe(
-    annotations_dir_path: str,
-) -> pd.DataFrame:
+    annotations_dir_path: str, num_workers: int = 1
+) -> "pd.DataFrame":
     """Creates a dataframe with values of Jaccard similarity and confidence.
 
     Args:
         annotations_dir_path: Path with annotations files.
+        num_workers (optional): Number of processes parsing files. (Defaults
+           to 1.)
 
     Returns:
         Dataframe with values of Jaccard similarity and the average confidence
@@ -307,10 +345,15 @@ def get_jaccard_and_confidence_score_results_as_dataframe(
 
     topic_files = [file for file in annotations_filenames]
     if len(topic_files) > 0:
-        task_annotations = _aggregate_topics_annotations(
-            topic_files, WorkerType.MTURK_MASTER, TaskVariant.PARAGRAPH
+        (
+            task_annotations,
+            task_confidence_scores,
+        ) = _aggregate_topics_annotations_and_confidence_scores(
+            topic_files,
+            WorkerType.MTURK_MASTER,
+            TaskVariant.PARAGRAPH,
+            num_workers,
         )
-        task_confidence_scores = _aggregate_confidence_scores(topic_files)
 
         for query_passage, annotations in task_annotations.annotations.items():
             jaccard_values[
@@ -325,6 +368,8 @@ def get_jaccard_and_confidence_score_results_as_dataframe(
                 confidence_scores_values
             ) / len(confidence_scores_values)
 
+    import pandas as pd
+
     return pd.DataFrame(
         {
             "QueryPassage": jaccard_values.keys(),
@@ -335,8 +380,8 @@ def get_jaccard_and_confidence_score_results_as_dataframe(
 
 
 def get_jaccard_results_as_dataframes(
-    annotations_dir_path: str,
-) -> pd.DataFrame:
+    annotations_dir_path: str, num_workers: int = 1
+) -> "pd.DataFrame":
     """Creates dataframe with values of Jaccard measures.
 
     Measures are computed for all files in a given directory. Annotations for
@@ -344,6 +389,8 @@ def get_jaccard_results_as_dataframes(
 
     Args:
         annotations_dir_path: Path with annotations files.
+        num_workers (optional): Number of processes parsing files. (Defaults
+           to 1.)
 
     Returns:
         Dataframe with values of Jaccard measures for all types of
@@ -366,7 +413,7 @@ def get_jaccard_results_as_dataframes(
             ]
             if len(topic_files) > 0:
                 task_annotations = _aggregate_topics_annotations(
-                    topic_files, worker_type, task_variant
+                    topic_files, worker_type, task_variant, num_workers
                 )
                 jaccard, jaccard_k = _get_jaccard_results(
                     task_annotations, jaccard_lenient_k_values
@@ -382,6 +429,8 @@ def get_jaccard_results_as_dataframes(
                     ]
                 )
 
+    import pandas as pd
+
     jaccard_values_pd = pd.DataFrame(jaccard_values)
     jaccard_values_pd.columns = [
         "Task variant",
@@ -411,17 +460,67 @@ def _get_filenames_from_subdirectories(dir_path: str):
     return filenames
 
 
+def parse_args() -> argparse.Namespace:
+    """Parses command line arguments.
+
+    Returns:
+        Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="create_result_tables.py",
+        description="Generates LaTeX tables with values of measures.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse all annotation files instead of using cached data.",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Remove all cached data before generating tables.",
+    )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=1,
+        help="Number of processes parsing annotation files in parallel. "
+        "Files are parsed in the main process by default.",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Report loading time of every annotation file.",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    annotation_cache = configure_default_cache(enabled=not args.no_cache)
+    # Sentence spans of passages are reused in later runs.
+    segmentation_cache = configure_default_segmentation_cache(
+        cache_dir=None
+        if args.no_cache
+        else os.path.join(annotation_cache.cache_dir, "sentences")
+    )
+    if args.clear_cache:
+        annotation_cache.invalidate()
+        segmentation_cache.clear()
+
     print("*** Experimental results for two sample topics ***")
     jaccard_results = get_jaccard_results_as_dataframes(
-        "data/snippet_annotation"
+        "data/snippet_annotation", args.num_workers
     )
     print(jaccard_results.to_latex(index=False))
 
     (
         rouge_measures_results,
         rouge_variants_results,
-    ) = get_rouge_results_as_dataframes("data/snippet_annotation")
+    ) = get_rouge_results_as_dataframes(
+        "data/snippet_annotation", args.num_workers
+    )
 
     print(rouge_measures_results.to_latex(index=False))
     print(rouge_variants_results.to_latex(index=False))
@@ -429,14 +528,16 @@ if __name__ == "__main__":
     print("*** Results of large-scale data annotation on two sample topics ***")
 
     jaccard_results = get_jaccard_results_as_dataframes(
-        "data/large_scale/topics_1-2"
+        "data/large_scale/topics_1-2", args.num_workers
     )
     print(jaccard_results.to_latex(index=False))
 
     (
         rouge_measures_results,
         rouge_variants_results,
-    ) = get_rouge_results_as_dataframes("data/large_scale/topics_1-2")
+    ) = get_rouge_results_as_dataframes(
+        "data/large_scale/topics_1-2", args.num_workers
+    )
 
     print(rouge_measures_results.to_latex(index=False))
     print(rouge_variants_results.to_latex(index=False))
@@ -445,9 +546,11 @@ if __name__ == "__main__":
         "*** Results of large-scale data annotation on TREC CAsT'20 and '22 ***"
     )
 
-    jaccard_results = get_jaccard_results_as_dataframes("data/large_scale/all")
+    jaccard_results = get_jaccard_results_as_dataframes(
+        "data/large_scale/all", args.num_workers
+    )
     print(jaccard_results.to_latex(index=False))
 
     get_jaccard_and_confidence_score_results_as_dataframe(
-        "data/large_scale/all"
+        "data/large_scale/all", args.num_workers
     ).to_csv("data/large_scale/jaccard_confidence.csv")
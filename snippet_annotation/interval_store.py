@@ -0,0 +1,347 @@
+"""Compact array-backed storage of intervals for all annotations in a task.
+
+Intervals are stored in compressed sparse row (CSR) layout. Starts and ends of
+all intervals are kept in two flat integer arrays. Intervals of annotation `a`
+are at positions `annotation_offsets[a]:annotation_offsets[a + 1]` of these
+arrays and annotations of input text `t` are at positions
+`text_offsets[t]:text_offsets[t + 1]` of the annotations.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+from snippet_annotation.annotation import (
+    InputText,
+    Interval,
+    QueryPassage,
+    TaskAnnotations,
+    WorkerAnnotation,
+    WorkerType,
+)
+
+# Starts and ends of intervals.
+IntervalArrays = Tuple[np.ndarray, np.ndarray]
+
+
+class IntervalStore:
+    """Class for intervals of all annotations in a task in CSR layout."""
+
+    def __init__(
+        self,
+        keys: List[QueryPassage],
+        text_offsets: np.ndarray,
+        annotation_offsets: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        input_texts: List[InputText],
+        worker_ids: List[str],
+        worker_type: WorkerType,
+        sentence_based: bool = False,
+    ) -> None:
+        """Array-backed storage of intervals for all annotations in a task.
+
+        Args:
+            keys: (query_id, text_id) tuples of input texts.
+            text_offsets: Offsets of annotations of every input text, one more
+               than the number of input texts.
+            annotation_offsets: Offsets of intervals of every annotation, one
+               more than the number of annotations.
+            starts: Start positions of all intervals.
+            ends: End positions of all intervals.
+            input_texts: Annotated text of every annotation.
+            worker_ids: Id of the worker of every annotation.
+            worker_type: Type of workers working on the task.
+            sentence_based (optional): Indicates whether annotations are
+               sentence-based. (Defaults to False.)
+        """
+        self.keys = keys
+        self.text_offsets = text_offsets
+        self.annotation_offsets = annotation_offsets
+        self.starts = starts
+        self.ends = ends
+        self.input_texts = input_texts
+        self.worker_ids = worker_ids
+        self.worker_type = worker_type
+        self.sentence_based = sentence_based
+        self._key_indices = {key: index for index, key in enumerate(keys)}
+
+    @classmethod
+    def from_task_annotations(
+        cls, task_annotations: TaskAnnotations
+    ) -> "IntervalStore":
+        """Creates interval store from task annotations.
+
+        Args:
+            task_annotations: Annotations made by several workers for all texts
+               in a task.
+
+        Returns:
+            Interval store with the same annotations.
+        """
+        keys = list(task_annotations.annotations.keys())
+        text_sizes = []
+        annotation_sizes = []
+        starts: List[int] = []
+        ends: List[int] = []
+        input_texts = []
+        worker_ids = []
+        for annotations in task_annotations.annotations.values():
+            text_sizes.append(len(annotations))
+            for annotation in annotations:
+                annotation_sizes.append(len(annotation.intervals))
+                starts.extend(
+                    interval.start for interval in annotation.intervals
+                )
+                ends.extend(interval.end for interval in annotation.intervals)
+                input_texts.append(annotation.input_text)
+                worker_ids.append(annotation.worker_id)
+        return cls(
+            keys=keys,
+            text_offsets=_get_offsets(text_sizes),
+            annotation_offsets=_get_offsets(annotation_sizes),
+            starts=np.array(starts, dtype=np.int64),
+            ends=np.array(ends, dtype=np.int64),
+            input_texts=input_texts,
+            worker_ids=worker_ids,
+            worker_type=task_annotations.worker_type,
+            sentence_based=task_annotations.sentence_based,
+        )
+
+    def to_task_annotations(self) -> TaskAnnotations:
+        """Creates task annotations from the interval store.
+
+        Returns:
+            Task annotations with the same annotations.
+        """
+        return TaskAnnotations(
+            annotations={
+                key: self.get_worker_annotations(text_index)
+                for text_index, key in enumerate(self.keys)
+            },
+            worker_type=self.worker_type,
+            sentence_based=self.sentence_based,
+        )
+
+    def __len__(self) -> int:
+        """Counts input texts in the store.
+
+        Returns:
+            Number of input texts.
+        """
+        return len(self.keys)
+
+    def get_text_index(self, key: QueryPassage) -> int:
+        """Finds the position of an input text in the store.
+
+        Args:
+            key: (query_id, text_id) tuple of the input text.
+
+        Returns:
+            Position of the input text or -1 if it is not in the store.
+        """
+        return self._key_indices.get(key, -1)
+
+    def get_annotation_range(self, text_index: int) -> range:
+        """Gets positions of annotations made for an input text.
+
+        Args:
+            text_index: Position of the input text.
+
+        Returns:
+            Range of positions of annotations.
+        """
+        return range(
+            self.text_offsets[text_index], self.text_offsets[text_index + 1]
+        )
+
+    def get_annotation_intervals(self, annotation_index: int) -> IntervalArrays:
+        """Gets intervals of a single annotation without copying them.
+
+        Args:
+            annotation_index: Position of the annotation.
+
+        Returns:
+            Starts and ends of intervals.
+        """
+        interval_slice = slice(
+            self.annotation_offsets[annotation_index],
+            self.annotation_offsets[annotation_index + 1],
+        )
+        return self.starts[interval_slice], self.ends[interval_slice]
+
+    def get_text_intervals(self, text_index: int) -> IntervalArrays:
+        """Gets intervals of all annotations made for an input text.
+
+        Args:
+            text_index: Position of the input text.
+
+        Returns:
+            Starts and ends of intervals.
+        """
+        interval_slice = slice(
+            self.annotation_offsets[self.text_offsets[text_index]],
+            self.annotation_offsets[self.text_offsets[text_index + 1]],
+        )
+        return self.starts[interval_slice], self.ends[interval_slice]
+
+    def get_worker_annotations(self, text_index: int) -> List[WorkerAnnotation]:
+        """Creates worker annotations made for an input text.
+
+        Args:
+            text_index: Position of the input text.
+
+        Returns:
+            List of worker annotations.
+        """
+        worker_annotations = []
+        for annotation_index in self.get_annotation_range(text_index):
+            starts, ends = self.get_annotation_intervals(annotation_index)
+            worker_annotations.append(
+                WorkerAnnotation(
+                    intervals=[
+                        Interval(start, end)
+                        for start, end in zip(starts.tolist(), ends.tolist())
+                    ],
+                    input_text=self.input_texts[annotation_index],
+                    worker_id=self.worker_ids[annotation_index],
+                )
+            )
+        return worker_annotations
+
+
+def _get_offsets(sizes: List[int]) -> np.ndarray:
+    """Computes CSR offsets from sizes of consecutive rows.
+
+    Args:
+        sizes: Number of elements in every row.
+
+    Returns:
+        Offsets of rows, one more than the number of rows.
+    """
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return offsets
+
+
+def get_intervals_length(starts: np.ndarray, ends: np.ndarray) -> int:
+    """Counts the sum of the length of intervals (in terms of characters).
+
+    Args:
+        starts: Starts of intervals.
+        ends: Ends of intervals.
+
+    Returns:
+        The overall length of intervals.
+    """
+    return int(np.sum(ends - starts))
+
+
+def get_union_length(starts: np.ndarray, ends: np.ndarray) -> int:
+    """Counts the length of the union of intervals.
+
+    Intervals are merged in the same way as in `merge_annotations`.
+
+    Args:
+        starts: Starts of intervals.
+        ends: Ends of intervals.
+
+    Returns:
+        The overall length of merged intervals.
+    """
+    if len(starts) == 0:
+        return 0
+    order = np.argsort(starts, kind="stable")
+    sorted_starts = starts[order]
+    merged_ends = np.maximum.accumulate(ends[order])
+    is_merged_start = np.empty(len(starts), dtype=bool)
+    is_merged_start[0] = True
+    is_merged_start[1:] = sorted_starts[1:] > merged_ends[:-1]
+    merged_start_indices = np.flatnonzero(is_merged_start)
+    merged_end_indices = np.append(
+        merged_start_indices[1:] - 1, len(starts) - 1
+    )
+    return int(
+        np.sum(
+            merged_ends[merged_end_indices]
+            - sorted_starts[merged_start_indices]
+        )
+    )
+
+
+def get_intervals_chosen_by_n(
+    starts: np.ndarray, ends: np.ndarray, n: int
+) -> IntervalArrays:
+    """Finds the intervals covered by at least n intervals.
+
+    Positions are counted in the same way as in
+    `find_intervals_chosen_by_n_workers`, i.e., an interval covers positions
+    from its start to its end (inclusive).
+
+    Args:
+        starts: Starts of intervals chosen by a group of workers.
+        ends: Ends of intervals chosen by a group of workers.
+        n: The minimum number of intervals covering a position.
+
+    Returns:
+        Starts and ends of intervals covered by at least n intervals.
+    """
+    non_empty = starts <= ends
+    if not np.any(non_empty):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    if n <= 0:
+        # Every position from the beginning of the text is chosen.
+        return np.array([0]), np.array([np.max(ends[non_empty])])
+
+    positions, inverse = np.unique(
+        np.concatenate([starts[non_empty], ends[non_empty] + 1]),
+        return_inverse=True,
+    )
+    deltas = np.zeros(len(positions), dtype=np.int64)
+    np.add.at(
+        deltas,
+        inverse,
+        np.repeat([1, -1], np.count_nonzero(non_empty)),
+    )
+    # Positions from positions[i] to positions[i + 1] - 1 are covered by
+    # counts[i] intervals.
+    is_chosen = np.cumsum(deltas)[:-1] >= n
+    previous_chosen = np.concatenate([[False], is_chosen[:-1]])
+    next_chosen = np.concatenate([is_chosen[1:], [False]])
+    chosen_starts = positions[:-1][is_chosen & ~previous_chosen]
+    chosen_ends = positions[1:][is_chosen & ~next_chosen] - 1
+    return chosen_starts, chosen_ends
+
+
+def get_intersection_length(
+    starts_a: List[int],
+    ends_a: List[int],
+    starts_b: List[int],
+    ends_b: List[int],
+) -> int:
+    """Counts the length of the intersection of two lists of intervals.
+
+    Intervals are intersected in the same way as in
+    `get_intervals_intersection`.
+
+    Args:
+        starts_a: Starts of the first list of intervals.
+        ends_a: Ends of the first list of intervals.
+        starts_b: Starts of the second list of intervals.
+        ends_b: Ends of the second list of intervals.
+
+    Returns:
+        The overall length of the intersection.
+    """
+    length = 0
+    index_a = index_b = 0
+    while index_a < len(starts_a) and index_b < len(starts_b):
+        lower_bound = max(starts_a[index_a], starts_b[index_b])
+        upper_bound = min(ends_a[index_a], ends_b[index_b])
+        if lower_bound <= upper_bound:
+            length += upper_bound - lower_bound
+        if ends_a[index_a] < ends_b[index_b]:
+            index_a += 1
+        else:
+            index_b += 1
+    return length
@@ -1,10 +1,15 @@
 """Abstract class for similarity against reference annotations measures."""
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import TYPE_CHECKING, List
 
 from snippet_annotation.annotation import TaskAnnotations, WorkerAnnotation
 
+if TYPE_CHECKING:
+    # Interval stores are imported where they are used, so that importing the
+    # module does not load numpy.
+    from snippet_annotation.interval_store import IntervalStore
+
 
 class AnnotationMeasure(ABC):
     """Abstract class for similarity against reference annotations measures."""
@@ -59,3 +64,63 @@ class AnnotationMeasure(ABC):
                 )
 
         return sum(agreements) / len(agreements)
+
+    def get_store_text_reference_annotators_agreement(
+        self,
+        reference_store: "IntervalStore",
+        reference_text_index: int,
+        worker_store: "IntervalStore",
+        worker_text_index: int,
+    ) -> float:
+        """Computes the similarity against reference annotations in a store.
+
+        Measures that cannot work on arrays of intervals compute it on worker
+        annotations created from the stores.
+
+        Args:
+            reference_store: Interval store with reference annotations.
+            reference_text_index: Position of the input text in the reference
+               store.
+            worker_store: Interval store with workers' annotations.
+            worker_text_index: Position of the input text in the workers'
+               store.
+
+        Returns:
+            Similarity of workers' annotations against reference annotations for
+            the same input text.
+        """
+        return self.get_text_reference_annotators_agreement(
+            reference_store.get_worker_annotations(reference_text_index),
+            worker_store.get_worker_annotations(worker_text_index),
+        )
+
+    def get_store_reference_annotator_agreement(
+        self,
+        reference_store: "IntervalStore",
+        worker_store: "IntervalStore",
+    ) -> float:
+        """Computes reference annotators and workers agreement on task-level.
+
+        Args:
+            reference_store: Interval store with reference annotations made for
+               all texts in a task.
+            worker_store: Interval store with annotations made by other workers
+               for all texts in a task.
+
+        Returns:
+            Task-level agreement between reference annotators and workers.
+        """
+        agreements = []
+        for reference_text_index, key in enumerate(reference_store.keys):
+            worker_text_index = worker_store.get_text_index(key)
+            if worker_text_index != -1:
+                agreements.append(
+                    self.get_store_text_reference_annotators_agreement(
+                        reference_store,
+                        reference_text_index,
+                        worker_store,
+                        worker_text_index,
+                    )
+                )
+
+        return sum(agreements) / len(agreements)
@@ -1,9 +1,18 @@
 """Abstract class for annotation similarity measures."""
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import TYPE_CHECKING, Iterable, List, Tuple
 
-from snippet_annotation.annotation import TaskAnnotations, WorkerAnnotation
+from snippet_annotation.annotation import (
+    QueryPassage,
+    TaskAnnotations,
+    WorkerAnnotation,
+)
+
+if TYPE_CHECKING:
+    # Interval stores are imported where they are used, so that importing the
+    # module does not load numpy.
+    from snippet_annotation.interval_store import IntervalStore
 
 
 class WorkerAnnotationSimilarity(ABC):
@@ -42,3 +51,83 @@ class WorkerAnnotationSimilarity(ABC):
         ]
 
         return sum(similarities) / len(similarities)
+
+    def get_streamed_inter_annotator_agreement(
+        self,
+        text_annotations: Iterable[Tuple[QueryPassage, List[WorkerAnnotation]]],
+    ) -> float:
+        """Computes the inter-annotator agreement for streamed annotations.
+
+        Annotations of every text are released as soon as their similarity is
+        computed, so the task does not need to be kept in memory.
+
+        Args:
+            text_annotations: Input text ids with annotations made by several
+               workers for the text, e.g., as yielded by
+               iter_worker_annotations_from_file.
+
+        Returns:
+            Task-level inter-annotator agreement.
+        """
+        similarity_sum = 0.0
+        num_texts = 0
+        for _, workers_annotations in text_annotations:
+            similarity_sum += self.get_text_annotation_similarity(
+                workers_annotations
+            )
+            num_texts += 1
+
+        return similarity_sum / num_texts
+
+    def get_store_text_annotation_similarity(
+        self, store: "IntervalStore", text_index: int
+    ) -> float:
+        """Computes the similarity between annotations kept in interval store.
+
+        Measures that cannot work on arrays of intervals compute it on worker
+        annotations created from the store.
+
+        Args:
+            store: Interval store with annotations for all texts in a task.
+            text_index: Position of the input text in the store.
+
+        Returns:
+            Similarity measure between multiple annotations.
+        """
+        return self.get_text_annotation_similarity(
+            store.get_worker_annotations(text_index)
+        )
+
+    def get_store_text_annotation_similarities(
+        self, store: "IntervalStore"
+    ) -> List[float]:
+        """Computes the similarity between annotations for all texts in a store.
+
+        Measures that can process all texts at once override this method.
+
+        Args:
+            store: Interval store with annotations for all texts in a task.
+
+        Returns:
+            Similarity measure between multiple annotations for every text.
+        """
+        return [
+            self.get_store_text_annotation_similarity(store, text_index)
+            for text_index in range(len(store))
+        ]
+
+    def get_store_inter_annotator_agreement(
+        self, store: "IntervalStore"
+    ) -> float:
+        """Computes the inter-annotator agreement for annotations in a store.
+
+        Args:
+            store: Interval store with annotations made by several workers for
+               all texts in a task.
+
+        Returns:
+            Task-level inter-annotator agreement.
+        """
+        similarities = self.get_store_text_annotation_similarities(store)
+
+        return sum(similarities) / len(similarities)
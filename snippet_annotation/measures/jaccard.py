@@ -3,17 +3,32 @@
 They measure inter-annotator agreement for one task variant.
 """
 
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
-from snippet_annotation.annotation import WorkerAnnotation
+from snippet_annotation.annotation import TaskAnnotations, WorkerAnnotation
 from snippet_annotation.measures.annotation_similarity import (
     WorkerAnnotationSimilarity,
 )
 from snippet_annotation.utilities.annotation_utilities import (
     find_intervals_chosen_by_n_workers,
+    get_lengths_chosen_by_n_workers,
+    get_n_way_intersection,
     get_sum_of_intervals_length,
+    is_canonical_annotation,
     merge_annotations,
 )
+from snippet_annotation.utilities.bitset import (
+    fits_bitsets,
+    get_bitset_length,
+    get_bitsets_union,
+    get_chosen_length,
+    intervals_to_bitset,
+)
+
+if TYPE_CHECKING:
+    # Interval stores are imported where they are used, so that importing the
+    # module does not load numpy.
+    from snippet_annotation.interval_store import IntervalStore
 
 
 class Jaccard(WorkerAnnotationSimilarity):
@@ -35,16 +50,159 @@ class Jaccard(WorkerAnnotationSimilarity):
         Returns:
             Strict Jaccard inter-annotator agreement.
         """
-        intersection = find_intervals_chosen_by_n_workers(
-            annotations, len(annotations)
+        return self._get_similarity(annotations, len(annotations))
+
+    def _get_similarity(
+        self, annotations: List[WorkerAnnotation], n: int
+    ) -> float:
+        """Computes Jaccard agreement for intervals chosen by n annotators.
+
+        Annotations are checked to be canonical unless they were marked as
+        canonical when loaded. Annotations of short texts with canonical
+        intervals are compared using bitsets. Intervals chosen by all
+        annotators in longer texts are found by intersecting canonical
+        intervals directly.
+
+        Args:
+            annotations: Annotations done by several different workers in a
+               given group for a single input text.
+            n: The minimum amount of workers in the group that need to annotate
+               an interval.
+
+        Returns:
+            Jaccard inter-annotator agreement.
+        """
+        annotations_intervals = [
+            annotation.intervals for annotation in annotations
+        ]
+        canonical = all(
+            is_canonical_annotation(annotation) for annotation in annotations
         )
-        union = merge_annotations(annotations)
+        if canonical and fits_bitsets(annotations_intervals, canonical=True):
+            if not any(annotations_intervals):
+                return 1.0
+            return get_chosen_length(annotations_intervals, n) / (
+                get_bitset_length(
+                    get_bitsets_union(
+                        intervals_to_bitset(intervals)
+                        for intervals in annotations_intervals
+                    )
+                )
+            )
+
+        if canonical and n == len(annotations):
+            # Intervals chosen by all annotators are their intersection.
+            intersection, _ = get_n_way_intersection(annotations_intervals)
+        else:
+            intersection = find_intervals_chosen_by_n_workers(annotations, n)
+        union = merge_annotations(annotations, canonical=canonical)
         if len(union) == 0:
             return 1.0
         return get_sum_of_intervals_length(
             intersection
         ) / get_sum_of_intervals_length(union)
 
+    def get_store_text_annotation_similarity(
+        self, store: "IntervalStore", text_index: int
+    ) -> float:
+        """Computes Jaccard agreement for annotations kept in interval store.
+
+        Args:
+            store: Interval store with annotations for all texts in a task.
+            text_index: Position of the input text in the store.
+
+        Returns:
+            Jaccard inter-annotator agreement.
+        """
+        from snippet_annotation.interval_store import (
+            get_intervals_chosen_by_n,
+            get_intervals_length,
+            get_union_length,
+        )
+
+        starts, ends = store.get_text_intervals(text_index)
+        if len(starts) == 0:
+            return 1.0
+        chosen_starts, chosen_ends = get_intervals_chosen_by_n(
+            starts,
+            ends,
+            self._get_min_num_workers(
+                len(store.get_annotation_range(text_index))
+            ),
+        )
+        return get_intervals_length(
+            chosen_starts, chosen_ends
+        ) / get_union_length(starts, ends)
+
+    def get_store_text_annotation_similarities(
+        self, store: "IntervalStore"
+    ) -> List[float]:
+        """Computes Jaccard agreement for all texts in a store at once.
+
+        Coverage counts of all texts are computed in one pass with array
+        operations.
+
+        Args:
+            store: Interval store with annotations for all texts in a task.
+
+        Returns:
+            Jaccard inter-annotator agreement for every text.
+        """
+        import numpy as np
+
+        from snippet_annotation.task_coverage import TaskCoverage
+
+        coverage = TaskCoverage(store)
+        chosen_lengths = coverage.get_chosen_lengths(
+            np.array(
+                [
+                    self._get_min_num_workers(num_annotations)
+                    for num_annotations in coverage.num_annotations.tolist()
+                ],
+                dtype=np.int64,
+            )
+        )
+        return [
+            1.0 if num_intervals == 0 else chosen_length / union_length
+            for num_intervals, chosen_length, union_length in zip(
+                coverage.num_intervals.tolist(),
+                chosen_lengths.tolist(),
+                coverage.get_union_lengths().tolist(),
+            )
+        ]
+
+    def get_task_inter_annotator_agreement(
+        self, task_annotations: TaskAnnotations
+    ) -> float:
+        """Computes the inter-annotator agreement for an entire task.
+
+        Annotations are copied to an interval store and all texts are
+        processed at once.
+
+        Args:
+            task_annotations: Annotations made by several workers for all texts
+               in a task.
+
+        Returns:
+            Task-level inter-annotator agreement.
+        """
+        from snippet_annotation.interval_store import IntervalStore
+
+        return self.get_store_inter_annotator_agreement(
+            IntervalStore.from_task_annotations(task_annotations)
+        )
+
+    def _get_min_num_workers(self, num_annotations: int) -> int:
+        """Gets the number of annotators needed for an interval to count.
+
+        Args:
+            num_annotations: Number of annotations made for an input text.
+
+        Returns:
+            Minimal number of annotators choosing an interval.
+        """
+        return num_annotations
+
 
 class JaccardLenient(Jaccard):
     """Class for lenient Jaccard inter-annotator agreement measure."""
@@ -74,10 +232,112 @@ class JaccardLenient(Jaccard):
         Returns:
             Lenient Jaccard inter-annotator agreement.
         """
-        intersection = find_intervals_chosen_by_n_workers(annotations, self.k)
-        union = merge_annotations(annotations)
-        if len(union) == 0:
-            return 1.0
-        return get_sum_of_intervals_length(
-            intersection
-        ) / get_sum_of_intervals_length(union)
+        return self._get_similarity(annotations, self.k)
+
+    def _get_min_num_workers(self, num_annotations: int) -> int:
+        """Gets the number of annotators needed for an interval to count.
+
+        Args:
+            num_annotations: Number of annotations made for an input text.
+
+        Returns:
+            Minimal number of annotators choosing an interval.
+        """
+        return self.k
+
+
+class MultiThresholdJaccard:
+    """Class for strict and lenient Jaccard agreement computed together."""
+
+    def __init__(self, k_values: List[int]) -> None:
+        """Strict and lenient Jaccard measures for several values of k.
+
+        Coverage of annotations is computed once and shared by all measures,
+        values are the same as of Jaccard and JaccardLenient(k) for every k.
+
+        Args:
+            k_values: Values of k for lenient variant of Jaccard agreement.
+        """
+        self.k_values = k_values
+
+    def get_text_annotation_similarities(
+        self, annotations: List[WorkerAnnotation]
+    ) -> Tuple[float, Dict[int, float]]:
+        """Computes strict and lenient Jaccard agreement for an input text.
+
+        Args:
+            annotations: Annotations done by several different workers in a
+               given group for a single input text.
+
+        Returns:
+            Value of strict variant of the measure and a dictionary with
+            values of lenient variant of the measure for every k.
+        """
+        canonical = all(
+            is_canonical_annotation(annotation) for annotation in annotations
+        )
+        union_length = get_sum_of_intervals_length(
+            merge_annotations(annotations, canonical=canonical)
+        )
+        chosen_lengths = get_lengths_chosen_by_n_workers(
+            annotations, [len(annotations)] + self.k_values
+        )
+        if not any(annotation.intervals for annotation in annotations):
+            similarities = [1.0] * len(chosen_lengths)
+        else:
+            similarities = [
+                chosen_length / union_length for chosen_length in chosen_lengths
+            ]
+        return similarities[0], dict(zip(self.k_values, similarities[1:]))
+
+    def get_store_inter_annotator_agreements(
+        self, store: "IntervalStore"
+    ) -> Tuple[float, Dict[int, float]]:
+        """Computes strict and lenient Jaccard agreement for a whole store.
+
+        Args:
+            store: Interval store with annotations made by several workers for
+               all texts in a task.
+
+        Returns:
+            Task-level value of strict variant of the measure and a dictionary
+            with task-level values of lenient variant of the measure for every
+            k.
+        """
+        from snippet_annotation.task_coverage import TaskCoverage
+
+        coverage = TaskCoverage(store)
+        union_lengths = coverage.get_union_lengths().tolist()
+        has_intervals = (coverage.num_intervals > 0).tolist()
+        agreements = []
+        for min_counts in [coverage.num_annotations] + self.k_values:
+            similarities = [
+                chosen_length / union_length if has_interval else 1.0
+                for has_interval, chosen_length, union_length in zip(
+                    has_intervals,
+                    coverage.get_chosen_lengths(min_counts).tolist(),
+                    union_lengths,
+                )
+            ]
+            agreements.append(sum(similarities) / len(similarities))
+        return agreements[0], dict(zip(self.k_values, agreements[1:]))
+
+    def get_task_inter_annotator_agreements(
+        self, task_annotations: TaskAnnotations
+    ) -> Tuple[float, Dict[int, float]]:
+        """Computes strict and lenient Jaccard agreement for an entire task.
+
+        Args:
+            task_annotations: Annotations made by several workers for all texts
+               in a task.
+
+        Returns:
+            Task-level value of strict variant of the measure and a dictionary
+            with task-level values of lenient variant of the measure for every
+            k.
+        """
+        from snippet_annotation.interval_store import IntervalStore
+
+        return self.get_store_inter_annotator_agreements(
+            IntervalStore.from_task_annotations(task_annotations)
+        )
@@ -4,17 +4,38 @@ Task variants include different type of annotator, different platform,
 different level of annotations.
 """
 
+import functools
+from dataclasses import dataclass
 from enum import Enum
-from typing import List
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
-from snippet_annotation.annotation import Interval, WorkerAnnotation
+from snippet_annotation.annotation import (
+    Interval,
+    TaskAnnotations,
+    WorkerAnnotation,
+)
 from snippet_annotation.measures.annotation_measure import AnnotationMeasure
 from snippet_annotation.utilities.annotation_utilities import (
     find_intervals_chosen_by_n_workers,
     get_intervals_intersection,
     get_sum_of_intervals_length,
+    is_canonical,
+)
+from snippet_annotation.utilities.bitset import (
+    fits_bitsets,
+    get_bitset_length,
+    intervals_to_bitset,
 )
 
+if TYPE_CHECKING:
+    # Interval stores are imported where they are used, so that importing the
+    # module does not load numpy.
+    from snippet_annotation.interval_store import IntervalStore
+
+
+# Number of passages with cached pairwise F1 matrices.
+PAIRWISE_F1_CACHE_SIZE = 1024
+
 
 class RougeVariant(Enum):
     """Class for ROUGE measure variants."""
@@ -39,6 +60,51 @@ class RougeMeasure(Enum):
     F1 = 3
 
 
+@dataclass
+class RougeScores:
+    """Class for all ROUGE measures computed for the same annotations."""
+
+    # ROUGE precision.
+    precision: float
+    # ROUGE recall.
+    recall: float
+    # ROUGE F1.
+    f1: float
+
+    def get_measure_value(self, rouge_measure: RougeMeasure) -> float:
+        """Gets the value of a ROUGE measure.
+
+        Args:
+            rouge_measure: ROUGE measure (precision, recall, or F1).
+
+        Returns:
+            Value of the measure.
+        """
+        if rouge_measure == RougeMeasure.PRECISION:
+            return self.precision
+        if rouge_measure == RougeMeasure.RECALL:
+            return self.recall
+        return self.f1
+
+
+@dataclass
+class RougePairScores:
+    """Class for ROUGE measures of one reference and worker intervals pair."""
+
+    # Id of the reference annotator.
+    reference_worker_id: str
+    # Id of the worker, None for intervals chosen by a majority of workers.
+    worker_id: Optional[str]
+    # Length of the intersection of reference and worker's intervals.
+    intersection_length: int
+    # Length of reference intervals.
+    reference_length: int
+    # Length of worker's intervals.
+    worker_length: int
+    # Values of ROUGE measures.
+    scores: RougeScores
+
+
 class Rouge(AnnotationMeasure):
     """Class for ROUGE measures."""
 
@@ -79,27 +145,15 @@ class Rouge(AnnotationMeasure):
             Similarity of workers' annotations against reference annotations for
             the same input text.
         """
-        worker_intervals_to_compare = []
-        if self.rouge_variant == RougeVariant.MEAN:
-            worker_intervals_to_compare = [
-                worker_annotation.intervals
-                for worker_annotation in worker_annotations
-            ]
-        elif self.rouge_variant == RougeVariant.MAJORITY:
-            worker_intervals_to_compare = [
-                find_intervals_chosen_by_n_workers(worker_annotations, self.n)
-            ]
-        elif self.rouge_variant == RougeVariant.SIMILARITY:
-            most_similar_annotation = self._find_most_similar_annotation(
-                worker_annotations
-            )
-            if most_similar_annotation is None:
-                return 0
-            worker_intervals_to_compare = [most_similar_annotation.intervals]
+        worker_intervals_to_compare = self._get_worker_intervals_to_compare(
+            worker_annotations
+        )
+        if worker_intervals_to_compare is None:
+            return 0
 
         measure_values = []
         for reference_annotation in reference_annotations:
-            for worker_intervals in worker_intervals_to_compare:
+            for _, worker_intervals in worker_intervals_to_compare:
                 measure_values.append(
                     self._get_reference_annotator_agreement(
                         reference_annotation.intervals, worker_intervals
@@ -107,6 +161,46 @@ class Rouge(AnnotationMeasure):
                 )
         return sum(measure_values) / len(measure_values)
 
+    def _get_worker_intervals_to_compare(
+        self, worker_annotations: List[WorkerAnnotation]
+    ) -> Optional[List[Tuple[Optional[str], List[Interval]]]]:
+        """Selects workers' intervals compared with reference annotations.
+
+        Args:
+            worker_annotations: Workers' annotations made for the same input
+               text.
+
+        Returns:
+            Ids of workers with lists of their intervals depending on the
+            ROUGE variant or None if no annotation is most similar to the
+            others. Intervals chosen by the majority of workers have no id.
+        """
+        if self.rouge_variant == RougeVariant.MAJORITY:
+            return [
+                (
+                    None,
+                    find_intervals_chosen_by_n_workers(
+                        worker_annotations, self.n
+                    ),
+                )
+            ]
+        if self.rouge_variant == RougeVariant.SIMILARITY:
+            most_similar_annotation = self._find_most_similar_annotation(
+                worker_annotations
+            )
+            if most_similar_annotation is None:
+                return None
+            return [
+                (
+                    most_similar_annotation.worker_id,
+                    most_similar_annotation.intervals,
+                )
+            ]
+        return [
+            (worker_annotation.worker_id, worker_annotation.intervals)
+            for worker_annotation in worker_annotations
+        ]
+
     def _get_reference_annotator_agreement(
         self,
         reference_intervals: List[Interval],
@@ -122,16 +216,34 @@ class Rouge(AnnotationMeasure):
             ROUGE similarity of worker's annotation against reference
             annotation for the same input text.
         """
-        intersection = get_intervals_intersection(
-            reference_intervals, worker_intervals
+        return self._get_measure_value(
+            *_get_lengths(reference_intervals, worker_intervals)
         )
-        nominator = get_sum_of_intervals_length(intersection)
-        if nominator == 0:
+
+    def _get_measure_value(
+        self,
+        intersection_length: int,
+        reference_length: int,
+        worker_length: int,
+    ) -> float:
+        """Computes ROUGE measure from lengths of intervals.
+
+        Args:
+            intersection_length: Length of the intersection of reference and
+               worker's intervals.
+            reference_length: Length of reference intervals.
+            worker_length: Length of worker's intervals.
+
+        Returns:
+            ROUGE similarity of worker's annotation against reference
+            annotation.
+        """
+        if intersection_length == 0:
             return 0.0
-        precision = nominator / get_sum_of_intervals_length(worker_intervals)
+        precision = intersection_length / worker_length
         if self.rouge_measure == RougeMeasure.PRECISION:
             return precision
-        recall = nominator / get_sum_of_intervals_length(reference_intervals)
+        recall = intersection_length / reference_length
         if self.rouge_measure == RougeMeasure.RECALL:
             return recall
         f1 = 2 * (precision * recall) / (precision + recall)
@@ -145,7 +257,8 @@ class Rouge(AnnotationMeasure):
     ) -> WorkerAnnotation:
         """Finds the annotation that is most similar to others in a group.
 
-        Annotations are compared in terms of F1 measure.
+        Annotations are compared in terms of F1 measure, read from the
+        pairwise F1 matrix of the group.
 
         Args:
             annotations: List of annotations done for the same text by a group
@@ -156,27 +269,383 @@ class Rouge(AnnotationMeasure):
         """
         most_similar_f1 = -1.0
         most_similar_annotation = None
-        rouge_f1 = Rouge(
-            rouge_measure=RougeMeasure.F1, rouge_variant=RougeVariant.MEAN
+        f1_matrix = get_pairwise_f1_matrix(
+            tuple(tuple(annotation.intervals) for annotation in annotations)
         )
-        for worker_annotation in annotations:
-            remaining_annotations = [
-                annotation
-                for annotation in annotations
+        for index, worker_annotation in enumerate(annotations):
+            remaining_indices = [
+                remaining_index
+                for remaining_index, annotation in enumerate(annotations)
                 if annotation is not worker_annotation
             ]
-            if len(remaining_annotations) == 0:
+            if len(remaining_indices) == 0:
                 return None
             current_f1 = sum(
                 [
-                    rouge_f1.get_text_reference_annotators_agreement(
-                        [worker_annotation], [remaining_annotation]
-                    )
-                    for remaining_annotation in remaining_annotations
+                    f1_matrix[index][remaining_index]
+                    for remaining_index in remaining_indices
                 ]
-            ) / len(remaining_annotations)
+            ) / len(remaining_indices)
             if current_f1 > most_similar_f1:
                 most_similar_f1 = current_f1
                 most_similar_annotation = worker_annotation
 
         return most_similar_annotation
+
+    def get_store_text_reference_annotators_agreement(
+        self,
+        reference_store: "IntervalStore",
+        reference_text_index: int,
+        worker_store: "IntervalStore",
+        worker_text_index: int,
+    ) -> float:
+        """Computes ROUGE similarity against reference annotations in a store.
+
+        Intervals are read directly from the stores without creating worker
+        annotations.
+
+        Args:
+            reference_store: Interval store with reference annotations.
+            reference_text_index: Position of the input text in the reference
+               store.
+            worker_store: Interval store with workers' annotations.
+            worker_text_index: Position of the input text in the workers'
+               store.
+
+        Returns:
+            Similarity of workers' annotations against reference annotations for
+            the same input text.
+        """
+        from snippet_annotation.interval_store import (
+            get_intersection_length,
+            get_intervals_chosen_by_n,
+        )
+
+        worker_intervals_to_compare = []
+        if self.rouge_variant == RougeVariant.MEAN:
+            worker_intervals_to_compare = _get_annotations_intervals(
+                worker_store, worker_text_index
+            )
+        elif self.rouge_variant == RougeVariant.MAJORITY:
+            starts, ends = get_intervals_chosen_by_n(
+                *worker_store.get_text_intervals(worker_text_index), self.n
+            )
+            worker_intervals_to_compare = [(starts.tolist(), ends.tolist())]
+        elif self.rouge_variant == RougeVariant.SIMILARITY:
+            most_similar_intervals = self._find_most_similar_intervals(
+                _get_annotations_intervals(worker_store, worker_text_index)
+            )
+            if most_similar_intervals is None:
+                return 0
+            worker_intervals_to_compare = [most_similar_intervals]
+
+        measure_values = []
+        for reference_intervals in _get_annotations_intervals(
+            reference_store, reference_text_index
+        ):
+            for worker_intervals in worker_intervals_to_compare:
+                measure_values.append(
+                    self._get_measure_value(
+                        get_intersection_length(
+                            *reference_intervals, *worker_intervals
+                        ),
+                        _get_length(*reference_intervals),
+                        _get_length(*worker_intervals),
+                    )
+                )
+        return sum(measure_values) / len(measure_values)
+
+    def _find_most_similar_intervals(
+        self, annotations_intervals: List[Tuple[List[int], List[int]]]
+    ) -> Optional[Tuple[List[int], List[int]]]:
+        """Finds the intervals that are most similar to others in a group.
+
+        Intervals are compared in terms of F1 measure in the same way as in
+        `_find_most_similar_annotation`.
+
+        Args:
+            annotations_intervals: Starts and ends of intervals of annotations
+               done for the same text by a group of workers.
+
+        Returns:
+            Starts and ends of intervals most similar to the others in a group.
+        """
+        if len(annotations_intervals) < 2:
+            return None
+        from snippet_annotation.interval_store import get_intersection_length
+
+        rouge_f1 = Rouge(
+            rouge_measure=RougeMeasure.F1, rouge_variant=RougeVariant.MEAN
+        )
+        most_similar_f1 = -1.0
+        most_similar_intervals = None
+        for index, intervals in enumerate(annotations_intervals):
+            current_f1 = sum(
+                rouge_f1._get_measure_value(
+                    get_intersection_length(*intervals, *remaining_intervals),
+                    _get_length(*intervals),
+                    _get_length(*remaining_intervals),
+                )
+                for remaining_index, remaining_intervals in enumerate(
+                    annotations_intervals
+                )
+                if remaining_index != index
+            ) / (len(annotations_intervals) - 1)
+            if current_f1 > most_similar_f1:
+                most_similar_f1 = current_f1
+                most_similar_intervals = intervals
+
+        return most_similar_intervals
+
+
+class FusedRouge:
+    """Class for ROUGE precision, recall and F1 computed together."""
+
+    def __init__(self, rouge_variant: RougeVariant, n: int = None) -> None:
+        """ROUGE measures computed from one intersection per pair.
+
+        Values are the same as of Rouge with every ROUGE measure and the same
+        variant.
+
+        Args:
+            rouge_variant: Variant of ROUGE measure.
+            n: The minimum amount of workers in the group that need to annotate
+               an interval for majority ROUGE measure variant.
+        """
+        self.rouge_variant = rouge_variant
+        self.n = n
+        self._rouge = Rouge(
+            rouge_measure=RougeMeasure.F1, rouge_variant=rouge_variant, n=n
+        )
+
+    def get_text_pair_scores(
+        self,
+        reference_annotations: List[WorkerAnnotation],
+        worker_annotations: List[WorkerAnnotation],
+    ) -> Optional[List[RougePairScores]]:
+        """Computes ROUGE measures for every reference and worker pair.
+
+        Args:
+            reference_annotations: Reference annotations.
+            worker_annotations: Workers' annotations made for the same input
+               text.
+
+        Returns:
+            Measures for every pair of reference and workers' intervals
+            compared in the ROUGE variant or None if no annotation is most
+            similar to the others.
+        """
+        workers_intervals = self._rouge._get_worker_intervals_to_compare(
+            worker_annotations
+        )
+        if workers_intervals is None:
+            return None
+
+        pair_scores = []
+        for reference_annotation in reference_annotations:
+            for worker_id, worker_intervals in workers_intervals:
+                lengths = _get_lengths(
+                    reference_annotation.intervals, worker_intervals
+                )
+                pair_scores.append(
+                    RougePairScores(
+                        reference_annotation.worker_id,
+                        worker_id,
+                        *lengths,
+                        scores=get_rouge_scores(*lengths),
+                    )
+                )
+        return pair_scores
+
+    def get_text_scores(
+        self,
+        reference_annotations: List[WorkerAnnotation],
+        worker_annotations: List[WorkerAnnotation],
+    ) -> RougeScores:
+        """Computes ROUGE measures against reference annotations.
+
+        Args:
+            reference_annotations: Reference annotations.
+            worker_annotations: Workers' annotations made for the same input
+               text.
+
+        Returns:
+            Averages of measures for all pairs of reference and workers'
+            intervals.
+        """
+        pair_scores = self.get_text_pair_scores(
+            reference_annotations, worker_annotations
+        )
+        if pair_scores is None:
+            return RougeScores(0, 0, 0)
+        return _get_mean_scores([pair.scores for pair in pair_scores])
+
+    def get_task_scores(
+        self,
+        reference_task_annotations: TaskAnnotations,
+        worker_task_annotations: TaskAnnotations,
+    ) -> RougeScores:
+        """Computes ROUGE measures against reference annotations for a task.
+
+        Args:
+            reference_task_annotations: Reference annotations made for all texts
+               in a task.
+            worker_task_annotations: Annotations made by other workers for all
+               texts in a task.
+
+        Returns:
+            Task-level averages of measures.
+        """
+        return _get_mean_scores(
+            [
+                self.get_text_scores(
+                    text_reference_annotations,
+                    worker_task_annotations.annotations[key],
+                )
+                for key, text_reference_annotations in (
+                    reference_task_annotations.annotations.items()
+                )
+                if key in worker_task_annotations.annotations
+            ]
+        )
+
+
+@functools.lru_cache(maxsize=PAIRWISE_F1_CACHE_SIZE)
+def get_pairwise_f1_matrix(
+    annotations_intervals: Tuple[Tuple[Interval, ...], ...]
+) -> Tuple[Tuple[float, ...], ...]:
+    """Computes ROUGE F1 between every pair of annotations of a passage.
+
+    F1 is symmetric for canonical intervals, so for pairs of canonical
+    annotations only the upper triangle is computed and mirrored. Matrices
+    are cached, so they are shared by ROUGE variants and measures comparing
+    the same annotations.
+
+    Args:
+        annotations_intervals: Intervals of annotations done for the same text
+           by a group of workers.
+
+    Returns:
+        Matrix with F1 of the annotation in the column against the annotation
+        in the row used as reference. Values on the diagonal are 0.
+    """
+    num_annotations = len(annotations_intervals)
+    intervals_lists = [list(intervals) for intervals in annotations_intervals]
+    canonical = [is_canonical(intervals) for intervals in intervals_lists]
+    f1_matrix = [[0.0] * num_annotations for _ in range(num_annotations)]
+    for row in range(num_annotations):
+        for column in range(row + 1, num_annotations):
+            f1_matrix[row][column] = get_rouge_scores(
+                *_get_lengths(intervals_lists[row], intervals_lists[column])
+            ).f1
+            f1_matrix[column][row] = (
+                f1_matrix[row][column]
+                if canonical[row] and canonical[column]
+                else get_rouge_scores(
+                    *_get_lengths(intervals_lists[column], intervals_lists[row])
+                ).f1
+            )
+    return tuple(tuple(f1_row) for f1_row in f1_matrix)
+
+
+def get_rouge_scores(
+    intersection_length: int, reference_length: int, worker_length: int
+) -> RougeScores:
+    """Computes all ROUGE measures from lengths of intervals.
+
+    Args:
+        intersection_length: Length of the intersection of reference and
+           worker's intervals.
+        reference_length: Length of reference intervals.
+        worker_length: Length of worker's intervals.
+
+    Returns:
+        ROUGE precision, recall and F1.
+    """
+    if intersection_length == 0:
+        return RougeScores(0.0, 0.0, 0.0)
+    precision = intersection_length / worker_length
+    recall = intersection_length / reference_length
+    return RougeScores(
+        precision, recall, 2 * (precision * recall) / (precision + recall)
+    )
+
+
+def _get_mean_scores(scores: List[RougeScores]) -> RougeScores:
+    """Averages values of ROUGE measures.
+
+    Args:
+        scores: Values of ROUGE measures.
+
+    Returns:
+        Average value of every measure.
+    """
+    return RougeScores(
+        sum([score.precision for score in scores]) / len(scores),
+        sum([score.recall for score in scores]) / len(scores),
+        sum([score.f1 for score in scores]) / len(scores),
+    )
+
+
+def _get_lengths(
+    reference_intervals: List[Interval], worker_intervals: List[Interval]
+) -> Tuple[int, int, int]:
+    """Counts lengths of intervals compared by ROUGE measures.
+
+    Canonical intervals of short texts are compared using bitsets.
+
+    Args:
+        reference_intervals: Reference intervals.
+        worker_intervals: Worker's intervals chosen for the same input text.
+
+    Returns:
+        Lengths of the intersection, of reference intervals and of worker's
+        intervals.
+    """
+    if fits_bitsets([reference_intervals, worker_intervals]):
+        reference_bitset = intervals_to_bitset(reference_intervals)
+        worker_bitset = intervals_to_bitset(worker_intervals)
+        return (
+            get_bitset_length(reference_bitset & worker_bitset),
+            get_bitset_length(reference_bitset),
+            get_bitset_length(worker_bitset),
+        )
+    return (
+        get_sum_of_intervals_length(
+            get_intervals_intersection(reference_intervals, worker_intervals)
+        ),
+        get_sum_of_intervals_length(reference_intervals),
+        get_sum_of_intervals_length(worker_intervals),
+    )
+
+
+def _get_annotations_intervals(
+    store: "IntervalStore", text_index: int
+) -> List[Tuple[List[int], List[int]]]:
+    """Gets starts and ends of intervals of annotations made for a text.
+
+    Args:
+        store: Interval store.
+        text_index: Position of the input text in the store.
+
+    Returns:
+        Starts and ends of intervals of every annotation as lists of integers.
+    """
+    annotations_intervals = []
+    for annotation_index in store.get_annotation_range(text_index):
+        starts, ends = store.get_annotation_intervals(annotation_index)
+        annotations_intervals.append((starts.tolist(), ends.tolist()))
+    return annotations_intervals
+
+
+def _get_length(starts: List[int], ends: List[int]) -> int:
+    """Counts the sum of the length of intervals.
+
+    Args:
+        starts: Starts of intervals.
+        ends: Ends of intervals.
+
+    Returns:
+        The overall length of intervals.
+    """
+    return sum(ends) - sum(starts)
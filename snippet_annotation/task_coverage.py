@@ -0,0 +1,214 @@
+"""Coverage counts of all texts in a task computed at once.
+
+Coverage counts only change at starts and ends of intervals, so they are kept
+for these boundaries instead of every character. Boundaries of all texts are
+sorted together, ordered by text and position, and the number of intervals
+covering every stretch between two boundaries is computed with a single
+cumulative sum over a difference array. Unions and regions chosen by workers
+are derived from the counts with array operations.
+"""
+
+from typing import Tuple, Union
+
+import numpy as np
+
+from snippet_annotation.interval_store import IntervalStore
+
+# Text positions, starts and ends of regions.
+Regions = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class TaskCoverage:
+    """Class for coverage counts of all texts in a task."""
+
+    def __init__(self, store: IntervalStore) -> None:
+        """Coverage counts of annotations in an interval store.
+
+        Positions are counted in the same way as in
+        `find_intervals_chosen_by_n_workers`, i.e., an interval covers
+        positions from its start to its end (inclusive), and lengths in the
+        same way as in `merge_annotations`. Positions before the beginning of
+        the text and intervals ending before they start are ignored.
+
+        Args:
+            store: Interval store with annotations for all texts in a task.
+        """
+        num_texts = len(store)
+        # Number of annotations and intervals of every text.
+        self.num_annotations = np.diff(store.text_offsets)
+        self.num_intervals = np.diff(
+            store.annotation_offsets[store.text_offsets]
+        )
+        interval_texts = np.repeat(np.arange(num_texts), self.num_intervals)
+        starts = np.maximum(store.starts, 0)
+        ends = store.ends
+        is_valid = starts <= ends
+        interval_texts = interval_texts[is_valid]
+        starts = starts[is_valid]
+        ends = ends[is_valid]
+
+        # Last covered position of every text, -1 if no position is covered.
+        self.last_positions = np.full(num_texts, -1, dtype=np.int64)
+        np.maximum.at(self.last_positions, interval_texts, ends)
+
+        # Boundaries are sorted by keys combining the text and the position.
+        stride = int(self.last_positions.max(initial=-1)) + 2
+        text_keys = interval_texts * stride
+        keys, inverse = np.unique(
+            np.concatenate(
+                [text_keys + starts, text_keys + ends, text_keys + ends + 1]
+            ),
+            return_inverse=True,
+        )
+        start_ids, end_ids, after_end_ids = np.split(inverse.ravel(), 3)
+        # Text and position of every boundary.
+        self.boundary_texts = keys // stride
+        self.boundary_positions = keys % stride
+        # Number of positions from a boundary to the next one.
+        self.widths = np.diff(self.boundary_positions, append=0)
+        # Number of intervals covering positions from a boundary to the next
+        # one (ends inclusive).
+        self.counts = np.cumsum(
+            _count_ids(start_ids, len(keys))
+            - _count_ids(after_end_ids, len(keys))
+        )
+        # Number of intervals covering characters from a boundary to the next
+        # one, used for the lengths of unions.
+        self.span_counts = np.cumsum(
+            _count_ids(start_ids, len(keys)) - _count_ids(end_ids, len(keys))
+        )
+
+    def __len__(self) -> int:
+        """Counts input texts.
+
+        Returns:
+            Number of input texts.
+        """
+        return len(self.num_annotations)
+
+    def get_union_lengths(self) -> np.ndarray:
+        """Counts the length of the union of intervals of every text.
+
+        Returns:
+            Lengths of merged intervals, one per text.
+        """
+        is_covered = self.span_counts > 0
+        return _sum_per_text(
+            self.boundary_texts[is_covered], self.widths[is_covered], len(self)
+        )
+
+    def _get_chosen_boundaries(
+        self, min_counts: Union[int, np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Finds boundaries followed by positions chosen by enough workers.
+
+        Args:
+            min_counts: The minimum number of intervals covering a position
+               (positive), either for all texts or for every text.
+
+        Returns:
+            Boolean arrays, True for boundaries followed by chosen positions,
+            for the first of them in every region and for the last of them in
+            every region. The last boundary of a text is covered by no
+            intervals, so regions do not span several texts.
+        """
+        min_counts = np.broadcast_to(min_counts, (len(self),))
+        is_chosen = self.counts >= min_counts[self.boundary_texts]
+        previous_chosen = np.concatenate([[False], is_chosen[:-1]])
+        next_chosen = np.concatenate([is_chosen[1:], [False]])
+        return (
+            is_chosen,
+            is_chosen & ~previous_chosen,
+            is_chosen & ~next_chosen,
+        )
+
+    def get_chosen_regions(self, min_counts: Union[int, np.ndarray]) -> Regions:
+        """Finds regions covered by at least a given number of intervals.
+
+        Regions are the same as returned by
+        `find_intervals_chosen_by_n_workers` for every text.
+
+        Args:
+            min_counts: The minimum number of intervals covering a position,
+               either for all texts or for every text.
+
+        Returns:
+            Positions of texts and starts and ends of regions in these texts,
+            ordered by text and start.
+        """
+        non_positive = np.broadcast_to(min_counts, (len(self),)) <= 0
+        _, is_first, is_last = self._get_chosen_boundaries(
+            np.where(non_positive, 1, min_counts)
+        )
+        texts = self.boundary_texts[is_first]
+        starts = self.boundary_positions[is_first]
+        ends = self.boundary_positions[is_last] + self.widths[is_last] - 1
+        # Every position from the beginning of the text is chosen.
+        is_whole_text = non_positive[texts]
+        whole_texts = np.unique(texts[is_whole_text])
+        keep = ~is_whole_text
+        texts = np.concatenate([texts[keep], whole_texts])
+        starts = np.concatenate([starts[keep], np.zeros_like(whole_texts)])
+        ends = np.concatenate([ends[keep], self.last_positions[whole_texts]])
+        order = np.lexsort((starts, texts))
+        return texts[order], starts[order], ends[order]
+
+    def get_chosen_lengths(
+        self, min_counts: Union[int, np.ndarray]
+    ) -> np.ndarray:
+        """Counts the length of regions covered by at least a given number.
+
+        Lengths are the same as the sum of lengths of intervals returned by
+        `find_intervals_chosen_by_n_workers` for every text.
+
+        Args:
+            min_counts: The minimum number of intervals covering a position,
+               either for all texts or for every text.
+
+        Returns:
+            Lengths of chosen regions, one per text.
+        """
+        non_positive = np.broadcast_to(min_counts, (len(self),)) <= 0
+        is_chosen, is_first, _ = self._get_chosen_boundaries(
+            np.where(non_positive, 1, min_counts)
+        )
+        # Every region from its first to its last position is one shorter
+        # than the number of its positions.
+        lengths = _sum_per_text(
+            self.boundary_texts[is_chosen], self.widths[is_chosen], len(self)
+        ) - np.bincount(self.boundary_texts[is_first], minlength=len(self))
+        # Every position from the beginning of the text is chosen.
+        return np.where(
+            non_positive, np.maximum(self.last_positions, 0), lengths
+        )
+
+
+def _count_ids(ids: np.ndarray, size: int) -> np.ndarray:
+    """Counts occurrences of every id.
+
+    Args:
+        ids: Ids from 0 to size - 1.
+        size: Number of ids.
+
+    Returns:
+        Number of occurrences of every id.
+    """
+    return np.bincount(ids, minlength=size)
+
+
+def _sum_per_text(
+    texts: np.ndarray, values: np.ndarray, num_texts: int
+) -> np.ndarray:
+    """Sums integer values belonging to every text.
+
+    Args:
+        texts: Position of the text of every value.
+        values: Values to sum.
+        num_texts: Number of texts.
+
+    Returns:
+        Sum of values of every text.
+    """
+    sums = np.zeros(num_texts, dtype=np.int64)
+    np.add.at(sums, texts, values)
+    return sums
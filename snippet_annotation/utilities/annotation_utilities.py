@@ -1,8 +1,10 @@
 """Utility functions for working with annotations."""
 
+import bisect
+import heapq
 import itertools
 from collections import defaultdict
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple
 
 from snippet_annotation.annotation import Interval, WorkerAnnotation
 
@@ -40,6 +42,254 @@ def get_intervals_intersection(
     return intersection
 
 
+def project_intervals_onto_spans(
+    intervals: List[Interval], spans: List[Tuple[int, int]]
+) -> List[List[Interval]]:
+    """Finds intersections of intervals with every span, e.g., a sentence.
+
+    The intersections with a span (start, end) are the same as returned by
+    `get_intervals_intersection(intervals, [Interval(start, end - 1)])`,
+    shifted by the start of the span. If the starts and the ends of intervals
+    are both sorted, intervals intersecting a span are found with binary
+    search, otherwise every span is intersected with intervals separately.
+
+    Args:
+        intervals: List of intervals.
+        spans: Start and end positions of spans, where a span (1, 3) covers
+           characters on positions 1 and 2.
+
+    Returns:
+        For every span, list of intersecting intervals with positions relative
+        to the start of the span.
+    """
+    starts = [interval.start for interval in intervals]
+    ends = [interval.end for interval in intervals]
+    if starts != sorted(starts) or ends != sorted(ends):
+        return [
+            [
+                Interval(interval.start - start, interval.end - start)
+                for interval in get_intervals_intersection(
+                    intervals, [Interval(start, end - 1)]
+                )
+            ]
+            for start, end in spans
+        ]
+
+    projections = []
+    for start, end in spans:
+        last = end - 1
+        # Intervals are intersected up to the first one ending at or after
+        # the span, the ones ending before the span start are skipped.
+        first_id = bisect.bisect_left(ends, start)
+        last_id = min(bisect.bisect_left(ends, last), len(intervals) - 1)
+        last_id = bisect.bisect_right(starts, last, first_id, last_id + 1)
+        projections.append(
+            [
+                Interval(
+                    max(interval.start, start) - start,
+                    min(interval.end, last) - start,
+                )
+                for interval in intervals[first_id:last_id]
+                if interval.start <= interval.end
+            ]
+        )
+    return projections
+
+
+def is_canonical(intervals: List[Interval]) -> bool:
+    """Checks whether intervals are canonical.
+
+    Canonical intervals have non-negative starts, are sorted by their start
+    positions and are separated by at least one position, so every position
+    is covered by at most one interval, including interval ends.
+
+    Args:
+        intervals: List of intervals.
+
+    Returns:
+        True if intervals are canonical.
+    """
+    previous_end = -1
+    for interval in intervals:
+        if not previous_end < interval.start <= interval.end:
+            return False
+        previous_end = interval.end
+    return True
+
+
+def is_canonical_annotation(annotation: WorkerAnnotation) -> bool:
+    """Checks whether intervals of an annotation are canonical.
+
+    Annotations marked as canonical when they were loaded are not checked
+    again.
+
+    Args:
+        annotation: Annotation made by a worker.
+
+    Returns:
+        True if intervals of the annotation are canonical.
+    """
+    return getattr(annotation, "canonical", False) or is_canonical(
+        annotation.intervals
+    )
+
+
+def canonicalize_intervals(
+    intervals: List[Interval], text_length: int = None
+) -> List[Interval]:
+    """Creates canonical intervals covering the same characters.
+
+    Intervals are clamped to the text, empty intervals are dropped and the
+    remaining ones are sorted and merged, so the result is canonical.
+
+    Args:
+        intervals: List of intervals selected by a worker.
+        text_length (optional): Length of the annotated text. If None,
+           intervals are not clamped at the end of the text.
+
+    Returns:
+        Canonical list of intervals.
+    """
+    clamped_intervals = []
+    for interval in intervals:
+        start = max(interval.start, 0)
+        end = (
+            interval.end
+            if text_length is None
+            else min(interval.end, text_length)
+        )
+        if start < end:
+            clamped_intervals.append(
+                interval
+                if start == interval.start and end == interval.end
+                else Interval(start, end)
+            )
+    return merge_intervals(sorted(clamped_intervals, key=_get_start))
+
+
+def canonicalize_annotation(annotation: WorkerAnnotation) -> WorkerAnnotation:
+    """Creates annotation with canonical intervals.
+
+    Args:
+        annotation: Annotation made by a worker.
+
+    Returns:
+        Annotation with intervals clamped to the annotated text, sorted and
+        merged, which is marked as canonical.
+    """
+    if getattr(annotation, "canonical", False):
+        return annotation
+    return WorkerAnnotation(
+        intervals=canonicalize_intervals(
+            annotation.intervals,
+            len(annotation.input_text.text)
+            if annotation.input_text is not None
+            else None,
+        ),
+        input_text=annotation.input_text,
+        worker_id=annotation.worker_id,
+        canonical=True,
+    )
+
+
+def _append_interval(
+    intervals: List[Interval],
+    boundary_counts: List[Tuple[int, int]],
+    interval: Interval,
+    interval_boundary_counts: Tuple[int, int],
+) -> None:
+    """Appends an interval to sorted intervals, joining adjacent ones.
+
+    Args:
+        intervals: Sorted intervals covering positions from their start to
+           their end (inclusive).
+        boundary_counts: Counts of annotations with intervals starting and
+           ending at boundaries of every interval.
+        interval: Interval after the last one.
+        interval_boundary_counts: Counts for the appended interval.
+    """
+    if intervals and intervals[-1].end + 1 == interval.start:
+        # Adjacent positions are a single interval.
+        intervals[-1] = Interval(intervals[-1].start, interval.end)
+        boundary_counts[-1] = (
+            boundary_counts[-1][0],
+            interval_boundary_counts[1],
+        )
+    else:
+        intervals.append(interval)
+        boundary_counts.append(interval_boundary_counts)
+
+
+def get_n_way_intersection(
+    intervals_lists: List[List[Interval]],
+) -> Tuple[List[Interval], List[Tuple[int, int]]]:
+    """Finds the intersection of intervals in multiple annotations.
+
+    All lists are walked at once, the list whose current interval ends first
+    is kept at the top of a heap, so the cost is O(m log n) for m intervals in
+    n lists. Positions are counted in the same way as in
+    `find_intervals_chosen_by_n_workers`, i.e., an interval covers positions
+    from its start to its end (inclusive), so for canonical intervals the
+    result is the same as of `find_intervals_chosen_by_n_workers` with n
+    equal to the number of lists.
+
+    Args:
+        intervals_lists: Canonical intervals of every annotation.
+
+    Returns:
+        List of intervals covered by all annotations and, for every interval,
+        the number of annotations with an interval starting at its start and
+        the number of annotations with an interval ending at its end.
+    """
+    intersection: List[Interval] = []
+    boundary_counts: List[Tuple[int, int]] = []
+    if len(intervals_lists) == 0 or not all(intervals_lists):
+        return intersection, boundary_counts
+
+    # Ends of current intervals of every list with positions of the lists.
+    current_ends = [
+        (intervals[0].end, list_id)
+        for list_id, intervals in enumerate(intervals_lists)
+    ]
+    heapq.heapify(current_ends)
+    interval_ids = [0] * len(intervals_lists)
+    # Starts of current intervals only increase, so their maximum is kept
+    # together with the number of lists with a current interval starting at
+    # it.
+    max_start = max(intervals[0].start for intervals in intervals_lists)
+    num_max_starts = sum(
+        intervals[0].start == max_start for intervals in intervals_lists
+    )
+    while True:
+        min_end = current_ends[0][0]
+        ending_list_ids = []
+        while current_ends and current_ends[0][0] == min_end:
+            ending_list_ids.append(heapq.heappop(current_ends)[1])
+
+        if max_start <= min_end:
+            _append_interval(
+                intersection,
+                boundary_counts,
+                Interval(max_start, min_end),
+                (num_max_starts, len(ending_list_ids)),
+            )
+
+        for list_id in ending_list_ids:
+            intervals = intervals_lists[list_id]
+            if intervals[interval_ids[list_id]].start == max_start:
+                num_max_starts -= 1
+            interval_ids[list_id] += 1
+            if interval_ids[list_id] == len(intervals):
+                return intersection, boundary_counts
+            interval = intervals[interval_ids[list_id]]
+            if interval.start > max_start:
+                max_start = interval.start
+                num_max_starts = 1
+            elif interval.start == max_start:
+                num_max_starts += 1
+            heapq.heappush(current_ends, (interval.end, list_id))
+
+
 def get_sum_of_intervals_length(intervals: List[Interval]) -> int:
     """Counts the sum of the length of intervals (in terms of characters).
 
@@ -52,7 +302,50 @@ def get_sum_of_intervals_length(intervals: List[Interval]) -> int:
     return sum([interval.end - interval.start for interval in intervals])
 
 
-def merge_annotations(annotations: List[WorkerAnnotation]) -> List[Interval]:
+def _get_start(interval: Interval) -> int:
+    """Gets the start position of an interval, used as sort key.
+
+    Args:
+        interval: Interval.
+
+    Returns:
+        The start character position.
+    """
+    return interval.start
+
+
+def merge_intervals(sorted_intervals: Iterable[Interval]) -> List[Interval]:
+    """Creates union of intervals sorted by their start positions.
+
+    Intervals are merged in a single pass, every interval either extends the
+    last interval of the union or is appended to it.
+
+    Args:
+        sorted_intervals: Intervals sorted by their start positions.
+
+    Returns:
+        Union of intervals.
+    """
+    intervals_union: List[Interval] = []
+    for interval in sorted_intervals:
+        if (
+            intervals_union
+            and intervals_union[-1].start
+            <= interval.start
+            <= intervals_union[-1].end
+        ):
+            if interval.end > intervals_union[-1].end:
+                intervals_union[-1] = Interval(
+                    intervals_union[-1].start, interval.end
+                )
+        else:
+            intervals_union.append(interval)
+    return intervals_union
+
+
+def merge_annotations(
+    annotations: List[WorkerAnnotation], canonical: bool = False
+) -> List[Interval]:
     """Creates union of intervals chosen by multiple annotators.
 
     For example having the following intervals chosen by three different workers
@@ -65,37 +358,34 @@ def merge_annotations(annotations: List[WorkerAnnotation]) -> List[Interval]:
     The merged intervals are the union of them:
     [(1, 5), (6, 8)]
 
+    Intervals of canonical annotations are already sorted, so the k
+    annotations are combined with a k-way merge in O(m log k). Otherwise,
+    intervals of all annotations are sorted together.
+
     Args:
         annotations: List of annotations made by different workers.
+        canonical (optional): If True, intervals of all annotations are known
+           to be canonical and are merged without sorting. (Defaults to
+           False.)
 
     Returns:
         Union of lists of intervals.
     """
-    intervals: List[Interval] = list(
-        itertools.chain.from_iterable(
-            [annotation.intervals for annotation in annotations]
+    if canonical:
+        return merge_intervals(
+            heapq.merge(
+                *[annotation.intervals for annotation in annotations],
+                key=_get_start,
+            )
+        )
+    return merge_intervals(
+        sorted(
+            itertools.chain.from_iterable(
+                [annotation.intervals for annotation in annotations]
+            ),
+            key=_get_start,
         )
     )
-    intervals = sorted(intervals, key=lambda interval: interval.start)
-    if len(intervals) == 0:
-        return []
-    intervals_union = [intervals[0]]
-    for interval in intervals[1:]:
-        if (
-            intervals_union[-1].start
-            <= interval.start
-            <= intervals_union[-1].end
-        ):
-            last_interval = intervals_union[-1]
-            intervals_union.remove(last_interval)
-            intervals_union.append(
-                Interval(
-                    last_interval.start, max(last_interval.end, interval.end)
-                )
-            )
-        else:
-            intervals_union.append(interval)
-    return intervals_union
 
 
 def find_intervals_chosen_by_n_workers(
@@ -103,6 +393,16 @@ def find_intervals_chosen_by_n_workers(
 ) -> List[Interval]:
     """Finds the intervals annotated by at least n workers in a group.
 
+    An interval covers character positions from its start to its end
+    (inclusive), and every interval is counted separately, so overlapping
+    intervals of one worker count twice. Returned intervals are maximal runs
+    of positions covered at least n times, from the first to the last position
+    of the run. Positions before the beginning of the text are ignored.
+
+    Start and end boundaries of intervals are swept in sorted order, so the
+    cost depends on the number of intervals rather than the length of the
+    text.
+
     Args:
         annotations: List of annotations made by a group of workers.
         n: The minimum amount of workers in the group that need to annotate an
@@ -111,43 +411,88 @@ def find_intervals_chosen_by_n_workers(
     Returns:
         List of intervals chosen by at least n workers in a group.
     """
-    intervals_chosen_by_n = []
-    intervals: List[Interval] = list(
-        itertools.chain.from_iterable(
-            [annotation.intervals for annotation in annotations]
-        )
-    )
-    num_workers_per_position: Dict[int, int] = defaultdict(int)
-    for interval in intervals:
-        for position in range(interval.start, interval.end + 1):
-            num_workers_per_position[position] += 1
+    # Change of the number of intervals covering a position compared to the
+    # previous position.
+    coverage_changes: Dict[int, int] = defaultdict(int)
+    last_position = -1
+    for annotation in annotations:
+        for interval in annotation.intervals:
+            start = max(interval.start, 0)
+            if start <= interval.end:
+                coverage_changes[start] += 1
+                coverage_changes[interval.end + 1] -= 1
+                last_position = max(last_position, interval.end)
 
-    current_position = 0
+    if n <= 0:
+        # Every position from the beginning of the text is chosen.
+        return [Interval(0, last_position)] if last_position >= 0 else []
+
+    intervals_chosen_by_n = []
+    coverage = 0
     current_interval_start = -1
-    while current_position < len(num_workers_per_position):
-        if (
-            num_workers_per_position[current_position] < n
-            and current_interval_start != -1
-        ):
+    for position in sorted(coverage_changes):
+        coverage += coverage_changes[position]
+        if coverage >= n and current_interval_start == -1:
+            current_interval_start = position
+        elif coverage < n and current_interval_start != -1:
             intervals_chosen_by_n.append(
-                Interval(
-                    current_interval_start,
-                    current_position - 1,
-                )
+                Interval(current_interval_start, position - 1)
             )
             current_interval_start = -1
-        elif (
-            num_workers_per_position[current_position] >= n
-            and current_interval_start == -1
-        ):
-            current_interval_start = current_position
 
-        current_position += 1
+    return intervals_chosen_by_n
+
 
-    # Closing the interval that ends at the end of the text.
-    if current_interval_start != -1:
-        intervals_chosen_by_n.append(
-            Interval(current_interval_start, current_position - 1)
-        )
+def get_lengths_chosen_by_n_workers(
+    annotations: List[WorkerAnnotation], n_values: List[int]
+) -> List[int]:
+    """Counts the length of intervals chosen by n workers for several n.
 
-    return intervals_chosen_by_n
+    Lengths are the same as the sum of lengths of intervals returned by
+    `find_intervals_chosen_by_n_workers` for every n, but boundaries of
+    intervals are swept only once for all values of n.
+
+    Args:
+        annotations: List of annotations made by a group of workers.
+        n_values: The minimum amounts of workers in the group that need to
+           annotate an interval.
+
+    Returns:
+        The overall length of intervals chosen by at least n workers, one per
+        value of n.
+    """
+    # Change of the number of intervals covering a position compared to the
+    # previous position.
+    coverage_changes: Dict[int, int] = defaultdict(int)
+    last_position = -1
+    for annotation in annotations:
+        for interval in annotation.intervals:
+            start = max(interval.start, 0)
+            if start <= interval.end:
+                coverage_changes[start] += 1
+                coverage_changes[interval.end + 1] -= 1
+                last_position = max(last_position, interval.end)
+
+    # Number of chosen positions and of intervals formed by them for every n.
+    num_positions = [0] * len(n_values)
+    num_intervals = [0] * len(n_values)
+    coverage = 0
+    previous_position = previous_coverage = 0
+    for position in sorted(coverage_changes):
+        for i, n in enumerate(n_values):
+            if previous_coverage >= n:
+                num_positions[i] += position - previous_position
+        coverage += coverage_changes[position]
+        for i, n in enumerate(n_values):
+            if coverage >= n > previous_coverage:
+                num_intervals[i] += 1
+        previous_position, previous_coverage = position, coverage
+
+    # Every interval spans from its first to its last position, and for
+    # n <= 0 every position from the beginning of the text is chosen.
+    return [
+        max(last_position, 0) if n <= 0 else positions - intervals
+        for n, positions, intervals in zip(
+            n_values, num_positions, num_intervals
+        )
+    ]
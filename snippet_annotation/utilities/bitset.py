@@ -0,0 +1,180 @@
+"""Bitset representation of intervals in annotations of short texts.
+
+A list of intervals is represented as a Python integer with the bit at every
+covered character position set, so intersections and unions of annotations
+are computed with bitwise operations and lengths by counting set bits.
+
+Bitsets give the same results as functions in `annotation_utilities` only for
+canonical intervals (see `is_canonical`), other intervals are handled by the
+functions in `annotation_utilities`.
+"""
+
+from typing import Callable, Iterable, List
+
+from snippet_annotation.annotation import Interval
+from snippet_annotation.utilities.annotation_utilities import is_canonical
+
+# The maximum end position of intervals represented with bitsets.
+MAX_BITSET_LENGTH = 4096
+
+
+# Counts set bits of a non-negative integer, Python 3.10+ counts them without
+# creating a string.
+_count_bits: Callable[[int], int] = (
+    getattr(int, "bit_count")
+    if hasattr(int, "bit_count")
+    else lambda bitset: bin(bitset).count("1")
+)
+
+
+def fits_bitsets(
+    intervals_lists: Iterable[List[Interval]],
+    max_length: int = MAX_BITSET_LENGTH,
+    canonical: bool = False,
+) -> bool:
+    """Checks whether lists of intervals can be represented with bitsets.
+
+    Args:
+        intervals_lists: Lists of intervals, e.g., of annotations of a text.
+        max_length (optional): The maximum end position of intervals.
+           (Defaults to MAX_BITSET_LENGTH.)
+        canonical (optional): If True, intervals are known to be canonical
+           and only their ends are checked. (Defaults to False.)
+
+    Returns:
+        True if all lists of intervals are canonical and end before the
+        maximum length.
+    """
+    return all(
+        (canonical or is_canonical(intervals))
+        and (len(intervals) == 0 or intervals[-1].end <= max_length)
+        for intervals in intervals_lists
+    )
+
+
+def intervals_to_bitset(
+    intervals: List[Interval], inclusive: bool = False
+) -> int:
+    """Creates a bitset with positions covered by intervals.
+
+    Args:
+        intervals: List of intervals.
+        inclusive (optional): If True, end positions of intervals are covered,
+           as in `find_intervals_chosen_by_n_workers`. Otherwise, an interval
+           (1, 3) covers characters on positions 1 and 2. (Defaults to False.)
+
+    Returns:
+        Bitset with covered positions.
+    """
+    bitset = 0
+    for interval in intervals:
+        bitset |= ((1 << (interval.end - interval.start + inclusive)) - 1) << (
+            interval.start
+        )
+    return bitset
+
+
+def bitset_to_intervals(bitset: int) -> List[Interval]:
+    """Creates intervals covering positions in a bitset.
+
+    Args:
+        bitset: Bitset with covered positions.
+
+    Returns:
+        List of intervals, where an interval (1, 3) covers characters on
+        positions 1 and 2.
+    """
+    intervals = []
+    while bitset:
+        start = (bitset & -bitset).bit_length() - 1
+        # Adding the lowest set bit clears the lowest run of set bits.
+        end = ((bitset + (1 << start)) & ~bitset).bit_length() - 1
+        intervals.append(Interval(start, end))
+        bitset &= ~((1 << end) - 1)
+    return intervals
+
+
+def get_bitset_length(bitset: int) -> int:
+    """Counts positions covered by a bitset (in terms of characters).
+
+    Args:
+        bitset: Bitset with covered positions.
+
+    Returns:
+        The number of covered positions.
+    """
+    return _count_bits(bitset)
+
+
+def get_bitsets_union(bitsets: Iterable[int]) -> int:
+    """Finds positions covered by any of the bitsets.
+
+    Args:
+        bitsets: Bitsets with covered positions.
+
+    Returns:
+        Bitset with positions covered by any of the bitsets.
+    """
+    union = 0
+    for bitset in bitsets:
+        union |= bitset
+    return union
+
+
+def get_bitsets_chosen_by_n(bitsets: List[int], n: int) -> int:
+    """Finds positions covered by at least n bitsets.
+
+    Args:
+        bitsets: Bitsets with covered positions, one per annotation.
+        n: The minimum number of bitsets covering a position (positive).
+
+    Returns:
+        Bitset with positions covered by at least n bitsets.
+    """
+    if n == len(bitsets):
+        # Positions covered by all bitsets.
+        chosen = -1
+        for bitset in bitsets:
+            chosen &= bitset
+        return chosen
+    # chosen_by[i] holds positions covered by at least i + 1 of the bitsets
+    # processed so far.
+    chosen_by = [0] * n
+    for bitset in bitsets:
+        for i in range(n - 1, 0, -1):
+            chosen_by[i] |= chosen_by[i - 1] & bitset
+        chosen_by[0] |= bitset
+    return chosen_by[-1]
+
+
+def get_chosen_length(
+    annotations_intervals: List[List[Interval]], n: int
+) -> int:
+    """Counts the length of intervals annotated by at least n workers.
+
+    The length is the same as the sum of lengths of intervals returned by
+    `find_intervals_chosen_by_n_workers` for canonical intervals. Every
+    returned interval spans from the first to the last chosen position of a
+    run, so it is one shorter than the number of positions in the run.
+
+    Args:
+        annotations_intervals: Canonical intervals of every annotation made
+           by a group of workers.
+        n: The minimum amount of workers in the group that need to annotate an
+           interval.
+
+    Returns:
+        The overall length of intervals chosen by at least n workers.
+    """
+    bitsets = [
+        intervals_to_bitset(intervals, inclusive=True)
+        for intervals in annotations_intervals
+    ]
+    if n <= 0:
+        # Every position from the beginning of the text is chosen.
+        return max(get_bitsets_union(bitsets).bit_length() - 1, 0)
+    if n > len(bitsets):
+        return 0
+    chosen = get_bitsets_chosen_by_n(bitsets, n)
+    num_runs = _count_bits(chosen & ~(chosen << 1))
+    return _count_bits(chosen) - num_runs
@@ -0,0 +1,251 @@
+"""Persistent on-disk cache of data loaded from annotation files.
+
+Entries are stored as compressed pickles in a cache directory. An entry is
+identified by the path, size, modification time and content hash of the
+annotation file it was loaded from, so changed files are never served from
+the cache. The least recently used entries are evicted when the size of the
+cache exceeds a limit.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import zlib
+from typing import Callable, List, TypeVar
+
+# Environment variable with the directory of the default cache.
+CACHE_DIR_ENV_VARIABLE = "SNIPPET_ANNOTATION_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "snippet_annotation"
+)
+DEFAULT_MAX_SIZE_BYTES = 256 * 1024 * 1024
+# Bumped whenever the format of cached data changes.
+CACHE_FORMAT_VERSION = 2
+
+_ENTRY_SUFFIX = ".bin"
+
+T = TypeVar("T")
+
+
+class AnnotationCache:
+    """Class for the on-disk cache of data loaded from annotation files."""
+
+    def __init__(
+        self,
+        cache_dir: str = None,
+        max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+        enabled: bool = True,
+    ) -> None:
+        """On-disk cache of data loaded from annotation files.
+
+        Args:
+            cache_dir (optional): Directory with cache entries. Defaults to the
+               value of SNIPPET_ANNOTATION_CACHE_DIR environment variable or
+               DEFAULT_CACHE_DIR.
+            max_size_bytes (optional): Maximum size of all entries. (Defaults
+               to 256MB.)
+            enabled (optional): If False, data is always loaded from files.
+               (Defaults to True.)
+        """
+        self.cache_dir = cache_dir or os.environ.get(
+            CACHE_DIR_ENV_VARIABLE, DEFAULT_CACHE_DIR
+        )
+        self.max_size_bytes = max_size_bytes
+        self.enabled = enabled
+
+    def get_or_load(
+        self, path: str, namespace: str, load: Callable[[], T]
+    ) -> T:
+        """Gets data loaded from a file from cache or loads and caches it.
+
+        Args:
+            path: Path to the annotation file.
+            namespace: Identifies the loader and its arguments, so that data
+               loaded from the same file in different ways is kept apart.
+            load: Function loading data from the file.
+
+        Returns:
+            Data loaded from the file.
+        """
+        if not self.enabled:
+            return load()
+
+        entry_path = self._get_entry_path(path, namespace)
+        try:
+            with open(entry_path, "rb") as entry_file:
+                data = pickle.loads(zlib.decompress(entry_file.read()))
+            # Modification time of entries is used for LRU eviction.
+            os.utime(entry_path)
+            return data
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # Corrupted or incompatible entry, it is replaced below.
+            self._remove(entry_path)
+
+        data = load()
+        self._store(entry_path, data)
+        return data
+
+    def invalidate(self, path: str = None) -> None:
+        """Removes entries for a file or all entries from the cache.
+
+        Args:
+            path (optional): Path to the annotation file. If None, the whole
+               cache is cleared.
+        """
+        prefix = self._get_path_hash(path) if path is not None else ""
+        for entry_path in self._get_entries():
+            if os.path.basename(entry_path).startswith(prefix):
+                self._remove(entry_path)
+
+    def get_size(self) -> int:
+        """Counts the size of all entries in the cache.
+
+        Returns:
+            Size of the cache in bytes.
+        """
+        return sum(
+            os.path.getsize(entry_path) for entry_path in self._get_entries()
+        )
+
+    def _get_path_hash(self, path: str) -> str:
+        """Hashes the absolute path of an annotation file.
+
+        Args:
+            path: Path to the annotation file.
+
+        Returns:
+            Hex digest of the path.
+        """
+        return hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+
+    def _get_entry_path(self, path: str, namespace: str) -> str:
+        """Gets the path of the cache entry for an annotation file.
+
+        Args:
+            path: Path to the annotation file.
+            namespace: Identifies the loader and its arguments.
+
+        Returns:
+            Path to the cache entry.
+        """
+        stat = os.stat(path)
+        content_hash = hashlib.sha256()
+        with open(path, "rb") as annotation_file:
+            for chunk in iter(lambda: annotation_file.read(1 << 20), b""):
+                content_hash.update(chunk)
+        key = hashlib.sha256(
+            "{}|{}|{}|{}|{}|{}".format(
+                os.path.abspath(path),
+                stat.st_size,
+                stat.st_mtime_ns,
+                content_hash.hexdigest(),
+                namespace,
+                CACHE_FORMAT_VERSION,
+            ).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(
+            self.cache_dir,
+            "{}-{}{}".format(self._get_path_hash(path), key, _ENTRY_SUFFIX),
+        )
+
+    def _get_entries(self) -> List[str]:
+        """Lists paths of all entries in the cache.
+
+        Returns:
+            Paths to cache entries.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [
+            os.path.join(self.cache_dir, filename)
+            for filename in os.listdir(self.cache_dir)
+            if filename.endswith(_ENTRY_SUFFIX)
+        ]
+
+    def _store(self, entry_path: str, data: T) -> None:
+        """Stores data in the cache and evicts old entries if needed.
+
+        Args:
+            entry_path: Path to the cache entry.
+            data: Data to store.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        payload = zlib.compress(
+            pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL), 1
+        )
+        if len(payload) > self.max_size_bytes:
+            return
+        # Entries are written to a temporary file first so that concurrent
+        # readers never see partially written entries.
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(file_descriptor, "wb") as entry_file:
+            entry_file.write(payload)
+        os.replace(temporary_path, entry_path)
+        self._evict(keep=entry_path)
+
+    def _evict(self, keep: str) -> None:
+        """Removes least recently used entries until the cache fits its limit.
+
+        Args:
+            keep: Path to the entry that is not removed.
+        """
+        entries = []
+        for entry_path in self._get_entries():
+            try:
+                stat = os.stat(entry_path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, entry_path in sorted(entries):
+            if size <= self.max_size_bytes:
+                break
+            if entry_path != keep:
+                self._remove(entry_path)
+                size -= entry_size
+
+    def _remove(self, entry_path: str) -> None:
+        """Removes an entry from the cache if it exists.
+
+        Args:
+            entry_path: Path to the cache entry.
+        """
+        try:
+            os.remove(entry_path)
+        except FileNotFoundError:
+            pass
+
+
+_default_cache = AnnotationCache()
+
+
+def get_default_cache() -> AnnotationCache:
+    """Gets the cache used by data loaders.
+
+    Returns:
+        The default cache.
+    """
+    return _default_cache
+
+
+def configure_default_cache(
+    cache_dir: str = None,
+    max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+    enabled: bool = True,
+) -> AnnotationCache:
+    """Replaces the cache used by data loaders.
+
+    Args:
+        cache_dir (optional): Directory with cache entries.
+        max_size_bytes (optional): Maximum size of all entries.
+        enabled (optional): If False, data is always loaded from files.
+
+    Returns:
+        The new default cache.
+    """
+    global _default_cache
+    _default_cache = AnnotationCache(cache_dir, max_size_bytes, enabled)
+    return _default_cache
@@ -1,29 +1,35 @@
 """Methods for converting annotations between task variants."""
 
-import ast
 from collections import defaultdict
+from dataclasses import dataclass
 from enum import Enum
 from typing import Dict, List, Tuple
 
-import nltk
-
 from snippet_annotation.annotation import (
     InputText,
     Interval,
     QueryPassage,
+    TextStore,
     WorkerAnnotation,
 )
 from snippet_annotation.utilities.annotation_utilities import (
-    get_intervals_intersection,
+    project_intervals_onto_spans,
 )
-
-nltk.download("punkt")
+from snippet_annotation.utilities.sentence_tokenizer import (
+    span_tokenize_sentences,
+)
+from snippet_annotation.utilities.task_answers import parse_task_answers
 
 MTURK_SENTENCE_ANNOTATION_NAME = "relevant-text-spans-sentence"
 MTURK_PARAGRAPH_ANNOTATION_NAME = (
     "relevant-text-spans-single-passage-annotation"
 )
 PROLIFIC_PARAGRAPH_ANNOTATION_NAME = "relevant-text-spans-prolific-annotation"
+# Separates the query id, the paragraph id and the position of a sentence in
+# sentence ids.
+SENTENCE_ID_SEPARATOR = "--"
+# Separates sentences in paragraphs rebuilt from sentences.
+SENTENCE_SEPARATOR = " "
 
 
 class AnnotationSource(Enum):
@@ -33,45 +39,163 @@ class AnnotationSource(Enum):
     PROLIFIC = 2
 
 
-def convert_worker_annotation_to_intervals(
-    worker_annotation: str,
+@dataclass
+class SentenceOffsets:
+    """Class for positions of sentences in a paragraph."""
+
+    # Input text of the paragraph.
+    input_text: InputText
+    # Start positions of sentences in the paragraph indexed by the position of
+    # sentences.
+    starts: Dict[int, int]
+
+
+def get_sentence_id(query_id: str, text_id: str, position: int) -> str:
+    """Gets the id of a sentence in a paragraph.
+
+    Args:
+        query_id: Id of the query.
+        text_id: Id of the paragraph.
+        position: Position of the sentence in the paragraph.
+
+    Returns:
+        Id of the sentence.
+    """
+    return SENTENCE_ID_SEPARATOR.join([query_id, text_id, str(position)])
+
+
+def parse_sentence_id(query_id: str, sentence_id: str) -> Tuple[str, int]:
+    """Gets the paragraph id and the position of a sentence from its id.
+
+    Args:
+        query_id: Id of the query.
+        sentence_id: Id of the sentence.
+
+    Raises:
+        ValueError: If the sentence id is not created for the query with
+           `get_sentence_id`.
+
+    Returns:
+        Id of the paragraph and position of the sentence in it.
+    """
+    prefix = query_id + SENTENCE_ID_SEPARATOR
+    paragraph_id, separator, position = sentence_id.rpartition(
+        SENTENCE_ID_SEPARATOR
+    )
+    if not separator or not paragraph_id.startswith(prefix):
+        raise ValueError(
+            "Sentence id {} does not belong to query {}.".format(
+                sentence_id, query_id
+            )
+        )
+    return paragraph_id[len(prefix) :], int(position)
+
+
+def get_annotation_name(
     sentence_based: bool = False,
     source: AnnotationSource = AnnotationSource.MTURK,
-) -> List[Interval]:
-    """Converts worker annotation to a list of intervals.
+) -> str:
+    """Gets the name under which selected intervals are stored in answers.
 
     Args:
-        worker_annotation: Worker annotation as raw text in MTurk format.
         sentence_based (optional): Indicates whether the annotation is
            sentence-based. (Defaults to False.)
         source (optional): Source of the annotation. (Defaults to MTURK.)
 
     Returns:
-        List of intervals.
+        Name of the annotation in raw task answers.
     """
-    annotation_name = (
+    return (
         PROLIFIC_PARAGRAPH_ANNOTATION_NAME
         if source == AnnotationSource.PROLIFIC
         else MTURK_SENTENCE_ANNOTATION_NAME
         if sentence_based
         else MTURK_PARAGRAPH_ANNOTATION_NAME
     )
-    intervals = ast.literal_eval(worker_annotation)[0][annotation_name][
-        "entities"
+
+
+def convert_worker_annotation_to_intervals(
+    worker_annotation: str,
+    sentence_based: bool = False,
+    source: AnnotationSource = AnnotationSource.MTURK,
+) -> List[Interval]:
+    """Converts worker annotation to a list of intervals.
+
+    Args:
+        worker_annotation: Worker annotation as raw text in MTurk format.
+        sentence_based (optional): Indicates whether the annotation is
+           sentence-based. (Defaults to False.)
+        source (optional): Source of the annotation. (Defaults to MTURK.)
+
+    Raises:
+        MalformedTaskAnswersError: If the annotation cannot be parsed.
+
+    Returns:
+        List of intervals.
+    """
+    return parse_task_answers(
+        worker_annotation, get_annotation_name(sentence_based, source)
+    ).intervals
+
+
+def _get_sentence_input_texts(
+    paragraph_input_text: InputText,
+    sentences: List[Tuple[str, str]],
+    text_store: TextStore,
+) -> List[InputText]:
+    """Gets input texts of sentences of a paragraph.
+
+    Args:
+        paragraph_input_text: Input text of the paragraph.
+        sentences: List of (sentence, sentence_id) tuples.
+        text_store: Store with shared queries and texts.
+
+    Returns:
+        Input texts of sentences.
+    """
+    return [
+        text_store.get_input_text(
+            query=paragraph_input_text.query,
+            query_id=paragraph_input_text.query_id,
+            text=sentence,
+            text_id=sentence_id,
+        )
+        for sentence, sentence_id in sentences
     ]
-    return list(
-        map(
-            lambda interval: Interval(
-                int(interval["startOffset"]),
-                int(interval["endOffset"]),
-            ),
-            intervals,
+
+
+def _project_paragraph_annotation(
+    annotation: WorkerAnnotation,
+    sentence_input_texts: List[InputText],
+    spans: List[Tuple[int, int]],
+) -> List[WorkerAnnotation]:
+    """Projects paragraph-based annotation onto sentences.
+
+    Args:
+        annotation: Paragraph-based annotation.
+        sentence_input_texts: Input texts of sentences of the paragraph.
+        spans: Start and end positions of sentences in the paragraph.
+
+    Returns:
+        List of sentence-based annotations.
+    """
+    return [
+        WorkerAnnotation(
+            intervals=sentence_intervals,
+            input_text=sentence_input_text,
+            worker_id=annotation.worker_id,
         )
-    )
+        for sentence_input_text, sentence_intervals in zip(
+            sentence_input_texts,
+            project_intervals_onto_spans(annotation.intervals, spans),
+        )
+    ]
 
 
 def convert_paragraph_annotation_to_sentence_based(
-    annotation: WorkerAnnotation, sentences: List[Tuple[str, str]]
+    annotation: WorkerAnnotation,
+    sentences: List[Tuple[str, str]],
+    text_store: TextStore = None,
 ) -> List[WorkerAnnotation]:
     """Converts paragraph-based annotation to sentence level.
 
@@ -81,38 +205,29 @@ def convert_paragraph_annotation_to_sentence_based(
     Args:
         annotation: Paragraph-based annotation.
         sentences: List of (sentence, sentence_id) tuples corresponding to the
-           paragraph that is annotated.
+           paragraph that is annotated, in the order they appear in it.
+        text_store (optional): Store with shared queries and texts. Sentence
+           input texts are shared between annotations converted with the same
+           store. Defaults to a new store.
 
     Returns:
         List of sentence-based annotations extracted from paragraph-based
         annotation.
     """
-    sentence_annotations = []
-    for sentence in sentences:
-        start = annotation.input_text.text.index(sentence[0])
-        end = start + len(sentence[0]) - 1
-        intersecting_intervals = get_intervals_intersection(
-            annotation.intervals, [Interval(start, end)]
-        )
-        sentence_intervals = [
-            Interval(i.start - start, i.end - start)
-            for i in intersecting_intervals
-        ]
-        sentence_input_text = InputText(
-            query=annotation.input_text.query,
-            query_id=annotation.input_text.query_id,
-            text=sentence[0],
-            text_id=sentence[1],
-        )
-        sentence_annotations.append(
-            WorkerAnnotation(
-                intervals=sentence_intervals,
-                input_text=sentence_input_text,
-                worker_id=annotation.worker_id,
-            )
-        )
-
-    return sentence_annotations
+    if text_store is None:
+        text_store = TextStore()
+    spans = []
+    end = 0
+    for sentence, _ in sentences:
+        # Repeated sentences are found after the previous sentence.
+        start = annotation.input_text.text.index(sentence, end)
+        end = start + len(sentence)
+        spans.append((start, end))
+    return _project_paragraph_annotation(
+        annotation,
+        _get_sentence_input_texts(annotation.input_text, sentences, text_store),
+        spans,
+    )
 
 
 def convert_paragraph_task_annotation_to_sentence_based(
@@ -120,6 +235,9 @@ def convert_paragraph_task_annotation_to_sentence_based(
 ) -> Dict[QueryPassage, List[WorkerAnnotation]]:
     """Converts paragraph-level task annotations to sentence-level.
 
+    Every paragraph is split into sentences once and intervals of all workers
+    are projected onto the same sentence spans.
+
     Args:
         paragraph_task_annotations: Paragraph-based annotations for entire task.
 
@@ -128,26 +246,33 @@ def convert_paragraph_task_annotation_to_sentence_based(
         for entire task.
     """
     sentence_annotations = defaultdict(list)
+    text_store = TextStore()
+    # Sentence input texts and spans of every paragraph.
+    paragraphs_sentences: Dict[
+        InputText, Tuple[List[InputText], List[Tuple[int, int]]]
+    ] = {}
     for paragraph_annotations in paragraph_task_annotations.values():
         for paragraph_annotation in paragraph_annotations:
-            paragraph_sentences = nltk.sent_tokenize(
-                paragraph_annotation.input_text.text
-            )
-            sentences = [
-                (
-                    paragraph_sentence,
-                    "{}--{}--{}".format(
-                        paragraph_annotation.input_text.query_id,
-                        paragraph_annotation.input_text.text_id,
-                        id,
+            input_text = paragraph_annotation.input_text
+            if input_text not in paragraphs_sentences:
+                spans = span_tokenize_sentences(input_text.text)
+                sentences = [
+                    (
+                        input_text.text[start:end],
+                        get_sentence_id(
+                            input_text.query_id, input_text.text_id, id
+                        ),
+                    )
+                    for id, (start, end) in enumerate(spans)
+                ]
+                paragraphs_sentences[input_text] = (
+                    _get_sentence_input_texts(
+                        input_text, sentences, text_store
                     ),
+                    spans,
                 )
-                for id, paragraph_sentence in enumerate(paragraph_sentences)
-            ]
-            sentence_worker_annotations = (
-                convert_paragraph_annotation_to_sentence_based(
-                    paragraph_annotation, sentences
-                )
+            sentence_worker_annotations = _project_paragraph_annotation(
+                paragraph_annotation, *paragraphs_sentences[input_text]
             )
             for sentence_worker_annotation in sentence_worker_annotations:
                 sentence_annotations[
@@ -158,3 +283,142 @@ def convert_paragraph_task_annotation_to_sentence_based(
                 ].append(sentence_worker_annotation)
 
     return sentence_annotations
+
+
+def get_sentence_offsets(
+    sentence_task_annotations: Dict[QueryPassage, List[WorkerAnnotation]],
+    paragraph_input_texts: Dict[QueryPassage, InputText] = None,
+) -> Dict[QueryPassage, SentenceOffsets]:
+    """Finds positions of annotated sentences in their paragraphs.
+
+    Sentences of a paragraph are searched for in its text in the order of
+    their positions. If the text of the paragraph is not given or a sentence
+    is not found in it, e.g., because its whitespace differs, the paragraph is
+    rebuilt by joining its annotated sentences with SENTENCE_SEPARATOR.
+
+    Args:
+        sentence_task_annotations: Sentence-based annotations for entire task
+           with sentence ids created by `get_sentence_id`.
+        paragraph_input_texts (optional): Input texts of paragraphs indexed by
+           (query_id, text_id) tuples. Defaults to paragraphs rebuilt from
+           sentences.
+
+    Returns:
+        Positions of sentences indexed by (query_id, text_id) tuples of
+        paragraphs.
+    """
+    paragraphs_sentences: Dict[
+        QueryPassage, Dict[int, InputText]
+    ] = defaultdict(dict)
+    for key, annotations in sentence_task_annotations.items():
+        query_id, sentence_id = key
+        if annotations:
+            text_id, position = parse_sentence_id(query_id, sentence_id)
+            sentences = paragraphs_sentences[(query_id, text_id)]
+            sentences[position] = annotations[0].input_text
+
+    sentence_offsets = {}
+    for key, sentences in paragraphs_sentences.items():
+        positions = sorted(sentences)
+        paragraph_input_text = (paragraph_input_texts or {}).get(key)
+        starts = {}
+        if paragraph_input_text is not None:
+            end = 0
+            for position in positions:
+                start = paragraph_input_text.text.find(
+                    sentences[position].text, end
+                )
+                if start < 0:
+                    break
+                starts[position] = start
+                end = start + len(sentences[position].text)
+        if len(starts) < len(positions):
+            starts = {}
+            start = 0
+            for position in positions:
+                starts[position] = start
+                start += len(sentences[position].text) + len(SENTENCE_SEPARATOR)
+            paragraph_input_text = InputText(
+                query=sentences[positions[0]].query,
+                query_id=key[0],
+                text=SENTENCE_SEPARATOR.join(
+                    sentences[position].text for position in positions
+                ),
+                text_id=key[1],
+            )
+        sentence_offsets[key] = SentenceOffsets(paragraph_input_text, starts)
+    return sentence_offsets
+
+
+def convert_sentence_task_annotation_to_paragraph_based(
+    sentence_task_annotations: Dict[QueryPassage, List[WorkerAnnotation]],
+    sentence_offsets: Dict[QueryPassage, SentenceOffsets] = None,
+) -> Dict[QueryPassage, List[WorkerAnnotation]]:
+    """Converts sentence-level task annotations to paragraph-level.
+
+    Intervals selected by a worker in all sentences of a paragraph are
+    shifted by the positions of the sentences and joined into one
+    paragraph-based annotation of the worker.
+
+    Args:
+        sentence_task_annotations: Sentence-based annotations for entire task
+           with sentence ids created by `get_sentence_id`.
+        sentence_offsets (optional): Positions of sentences in paragraphs,
+           e.g., found with `get_sentence_offsets` using texts of paragraphs.
+           Defaults to positions in paragraphs rebuilt from sentences.
+
+    Returns:
+        Paragraph-based annotations for entire task indexed by (query_id,
+        text_id) tuples of paragraphs.
+    """
+    if sentence_offsets is None:
+        sentence_offsets = get_sentence_offsets(sentence_task_annotations)
+
+    # Positions of sentences with intervals shifted to the paragraph indexed
+    # by paragraphs and (worker_id, occurrence) tuples, where occurrence
+    # tells apart repeated annotations of a paragraph by the same worker.
+    workers_sentences: Dict[
+        QueryPassage, Dict[Tuple[str, int], List[Tuple[int, List[Interval]]]]
+    ] = defaultdict(lambda: defaultdict(list))
+    for key, annotations in sentence_task_annotations.items():
+        if not annotations:
+            # Sentences without annotations have no input text, so they are
+            # not positioned in the paragraph.
+            continue
+        query_id, sentence_id = key
+        text_id, position = parse_sentence_id(query_id, sentence_id)
+        start = sentence_offsets[(query_id, text_id)].starts[position]
+        occurrences: Dict[str, int] = defaultdict(int)
+        for annotation in annotations:
+            worker_key = (
+                annotation.worker_id,
+                occurrences[annotation.worker_id],
+            )
+            occurrences[annotation.worker_id] += 1
+            workers_sentences[(query_id, text_id)][worker_key].append(
+                (
+                    position,
+                    [
+                        Interval(interval.start + start, interval.end + start)
+                        for interval in annotation.intervals
+                    ],
+                )
+            )
+
+    paragraph_annotations = {}
+    for key, worker_sentences in workers_sentences.items():
+        paragraph_annotations[key] = [
+            WorkerAnnotation(
+                intervals=[
+                    interval
+                    for _, intervals in sorted(
+                        sentences, key=lambda sentence: sentence[0]
+                    )
+                    for interval in intervals
+                ],
+                input_text=sentence_offsets[key].input_text,
+                worker_id=worker_id,
+            )
+            for (worker_id, _), sentences in worker_sentences.items()
+        ]
+    return paragraph_annotations
@@ -1,71 +1,893 @@
 """Utility functions for loading annotation data from files."""
 
-import ast
-from collections import defaultdict
-from typing import Dict, List
+import csv
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import repeat
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Collection,
+    Counter,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+)
 
-import pandas as pd
+if TYPE_CHECKING:
+    # pandas is imported where it is used, so that importing the module does
+    # not load it.
+    import pandas as pd
 
 from snippet_annotation.annotation import (
     ConfidenceScore,
-    InputText,
+    HITMetadata,
     QueryPassage,
+    TextStore,
     WorkerAnnotation,
 )
+from snippet_annotation.utilities.annotation_utilities import (
+    canonicalize_annotation,
+)
+from snippet_annotation.utilities.cache import (
+    AnnotationCache,
+    get_default_cache,
+)
 from snippet_annotation.utilities.conversion import (
     AnnotationSource,
-    convert_worker_annotation_to_intervals,
+    get_annotation_name,
+)
+from snippet_annotation.utilities.task_answers import (
+    MalformedTaskAnswersError,
+    TaskAnswers,
+    parse_task_answers_column,
 )
 
+# Columns of the table returned by load_annotations_table. The first two
+# columns form the (query_id, text_id) key of an input text.
+ANNOTATIONS_TABLE_COLUMNS = [
+    "query_id",
+    "text_id",
+    "query",
+    "text",
+    "worker_id",
+    "intervals",
+    "confidence",
+    "assignment_id",
+    "assignment_status",
+    "work_time_in_seconds",
+]
+
+# Columns of exported HITs with metadata of assignments mapped to the names of
+# columns in annotations tables.
+HIT_METADATA_COLUMNS = {
+    "AssignmentId": "assignment_id",
+    "AssignmentStatus": "assignment_status",
+    "WorkTimeInSeconds": "work_time_in_seconds",
+}
+
+# Types of columns read from exported files. Columns not listed are read as
+# text without type inference. Integer columns are nullable, so empty cells
+# are read as missing values.
+COLUMN_DTYPES = {"WorkTimeInSeconds": "Int64"}
+
+logger = logging.getLogger(__name__)
+
+# Number of rows read at once when annotations are streamed from file or
+# filtered while reading.
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class RowFilter:
+    """Class for a condition on rows of an exported file.
+
+    Rows are filtered while the file is read, before their task answers are
+    parsed.
+    """
+
+    # Column of the exported file, e.g., AssignmentStatus or WorkerId.
+    column: str
+    # Values of the column the condition checks.
+    values: Tuple[Any, ...]
+    # If True, rows with the values are dropped, otherwise only rows with the
+    # values are kept.
+    exclude: bool = False
+
+    def __post_init__(self) -> None:
+        """Stores values in a fixed order, so that equal filters match."""
+        object.__setattr__(
+            self, "values", tuple(sorted(set(self.values), key=str))
+        )
+
+    def get_mask(self, annotations: "pd.DataFrame") -> "pd.Series":
+        """Checks which rows satisfy the condition.
+
+        Args:
+            annotations: Raw annotations read from file.
+
+        Returns:
+            Boolean series, True for rows that are kept.
+        """
+        return annotations[self.column].isin(self.values) != self.exclude
+
+
+# Drops assignments rejected by the requester.
+REJECTED_ASSIGNMENTS_FILTER = RowFilter(
+    "AssignmentStatus", ("Rejected",), exclude=True
+)
+
+
+@dataclass
+class TaskData:
+    """Class for all data loaded from a single task file.
+
+    Lists of confidence scores and HIT metadata follow the order of worker
+    annotations for the same input text.
+    """
+
+    # Dictionary of annotations done by different workers for each text in the
+    # task indexed by (query_id, text_id) tuples.
+    annotations: Dict[QueryPassage, List[WorkerAnnotation]]
+    # Confidence scores of workers for each text (None if not given).
+    confidence_scores: Dict[QueryPassage, List[ConfidenceScore]]
+    # Metadata of HIT assignments done by workers for each text.
+    hit_metadata: Dict[QueryPassage, List[HITMetadata]]
 
-def load_worker_annotations_from_file(
-    task_data_path: str, source: AnnotationSource
-) -> Dict[QueryPassage, List[WorkerAnnotation]]:
-    """Loads all snippets annotations for a given task from file.
+
+def _parse_task_answers(
+    annotations: "pd.DataFrame", annotation_name: str, task_data_path: str
+) -> List[TaskAnswers]:
+    """Parses task answers in all rows of an annotations file.
+
+    Malformed rows are reported with their row number in the file, which is
+    the index of raw annotations.
+
+    Args:
+        annotations: Raw annotations read from file.
+        annotation_name: Name of the annotation with selected intervals.
+        task_data_path: Path to the file with annotations, used for error
+            reporting.
+
+    Raises:
+        MalformedTaskAnswersError: If answers in any row cannot be parsed.
+
+    Returns:
+        List of parsed task answers, one per row.
+    """
+    try:
+        return parse_task_answers_column(
+            annotations["Answer.taskAnswers"], annotation_name
+        )
+    except MalformedTaskAnswersError as e:
+        raise MalformedTaskAnswersError(
+            {
+                annotations.index[row]: reason
+                for row, reason in e.reasons.items()
+            },
+            task_data_path,
+        )
+
+
+def _is_sentence_based(columns: Iterable[str]) -> bool:
+    """Checks whether an annotations file holds sentence-based annotations.
+
+    Args:
+        columns: Columns of the annotations file.
+
+    Returns:
+        True if annotated texts are sentences.
+    """
+    return "Input.sentence_id" in columns
+
+
+def _get_text_ids(
+    annotations: "pd.DataFrame", source: AnnotationSource, sentence_based: bool
+) -> "pd.Series":
+    """Extracts ids of annotated texts from raw annotations.
+
+    Args:
+        annotations: Raw annotations read from file.
+        source: Source of the annotation.
+        sentence_based: Indicates whether annotated texts are sentences.
+
+    Returns:
+        Series with text ids, one per row.
+    """
+    if source == AnnotationSource.PROLIFIC:
+        # Prolific passage ids are stored as one-element list literals.
+        return annotations["Input.passage_id"].str.extract(
+            r"^\[\s*(['\"])(.*?)\1", expand=True
+        )[1]
+    if sentence_based:
+        return annotations["Input.sentence_id"]
+    return annotations["Input.passage_id"]
+
+
+def _get_read_columns(
+    columns: Sequence[str],
+    source: AnnotationSource,
+    row_filters: Sequence[RowFilter],
+) -> List[str]:
+    """Selects columns of an exported file that are used by the loaders.
+
+    Args:
+        columns: All columns of the exported file.
+        source: Source of the annotation.
+        row_filters: Conditions on rows applied while reading.
+
+    Raises:
+        ValueError: If a column used by a row filter is not in the file.
+
+    Returns:
+        Names of columns to read.
+    """
+    sentence_based = _is_sentence_based(columns)
+    read_columns = [
+        "Input.turn_id",
+        "Input.query",
+        "WorkerId",
+        "Answer.taskAnswers",
+    ]
+    if sentence_based:
+        read_columns.append("Input.sentence_id")
+    if not sentence_based or source == AnnotationSource.PROLIFIC:
+        read_columns.append("Input.passage_id")
+    read_columns.append("Input.sentence" if sentence_based else "Input.passage")
+    read_columns.extend(
+        column for column in HIT_METADATA_COLUMNS if column in columns
+    )
+    for row_filter in row_filters:
+        if row_filter.column not in columns:
+            raise ValueError(
+                "Column {} used by a row filter is missing".format(
+                    row_filter.column
+                )
+            )
+        if row_filter.column not in read_columns:
+            read_columns.append(row_filter.column)
+    return read_columns
+
+
+def _read_annotations(
+    task_data_path: str,
+    source: AnnotationSource,
+    row_filters: Sequence[RowFilter] = (),
+    chunk_size: int = None,
+    columns: Collection[str] = None,
+) -> Iterator["pd.DataFrame"]:
+    """Reads raw annotations from file keeping only rows that pass filters.
+
+    Only the used columns are read and their types are not inferred. The
+    index of raw annotations is the row number in the file.
 
     Args:
         task_data_path: Path to the file with annotations for a task
             variant.
         source: Source of the annotation.
+        row_filters (optional): Conditions on rows applied to every chunk of
+            rows as it is read. (Defaults to no filters.)
+        chunk_size (optional): Number of rows read at once. If None, the file
+            is read at once.
+        columns (optional): Columns to read besides the ones used by row
+            filters. Defaults to all columns used by the loaders.
+
+    Raises:
+        ValueError: If a column used by a row filter is not in the file.
+
+    Yields:
+        Chunks of raw annotations.
+    """
+    with open(task_data_path, encoding="utf-8-sig", newline="") as task_file:
+        # The header is parsed with the csv module, which is much cheaper
+        # than a separate pd.read_csv call.
+        header = next(csv.reader(task_file))
+    read_columns = _get_read_columns(header, source, row_filters)
+    if columns is not None:
+        filter_columns = {row_filter.column for row_filter in row_filters}
+        read_columns = [
+            column
+            for column in read_columns
+            if column in columns or column in filter_columns
+        ]
+    import pandas as pd
+
+    chunks = pd.read_csv(
+        task_data_path,
+        sep=",",
+        encoding="utf-8",
+        usecols=read_columns,
+        dtype={
+            column: COLUMN_DTYPES.get(column, str) for column in read_columns
+        },
+        chunksize=chunk_size,
+    )
+    for chunk in [chunks] if chunk_size is None else chunks:
+        for row_filter in row_filters:
+            chunk = chunk[row_filter.get_mask(chunk)]
+        yield chunk
+
+
+def _create_annotations_table(
+    annotations: "pd.DataFrame", source: AnnotationSource, task_data_path: str
+) -> "pd.DataFrame":
+    """Creates a columnar annotations table from raw annotations.
+
+    Args:
+        annotations: Raw annotations read from file or a chunk of them.
+        source: Source of the annotation.
+        task_data_path: Path to the file with annotations, used for error
+            reporting.
+
+    Raises:
+        MalformedTaskAnswersError: If answers in any row cannot be parsed.
+
+    Returns:
+        Dataframe with columns listed in ANNOTATIONS_TABLE_COLUMNS.
+    """
+    sentence_based = _is_sentence_based(annotations.columns)
+    task_answers = _parse_task_answers(
+        annotations,
+        get_annotation_name(sentence_based, source),
+        task_data_path,
+    )
+    hit_metadata = {
+        table_column: annotations[column]
+        if column in annotations.columns
+        else None
+        for column, table_column in HIT_METADATA_COLUMNS.items()
+    }
+
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            "query_id": annotations["Input.turn_id"],
+            "text_id": _get_text_ids(annotations, source, sentence_based),
+            "query": annotations["Input.query"],
+            "text": annotations[
+                "Input.sentence" if sentence_based else "Input.passage"
+            ],
+            "worker_id": annotations["WorkerId"],
+            "intervals": [answers.intervals for answers in task_answers],
+            "confidence": [answers.confidence for answers in task_answers],
+            **hit_metadata,
+        },
+        columns=ANNOTATIONS_TABLE_COLUMNS,
+    )
+
+
+def load_annotations_table(
+    task_data_path: str,
+    source: AnnotationSource,
+    row_filters: Sequence[RowFilter] = (),
+) -> "pd.DataFrame":
+    """Loads all snippets annotations for a given task as a columnar table.
+
+    Every column is processed as a whole, there is one row per worker
+    annotation and no WorkerAnnotation objects are created.
+
+    Args:
+        task_data_path: Path to the file with annotations for a task
+            variant.
+        source: Source of the annotation.
+        row_filters (optional): Conditions on rows applied while the file is
+            read in chunks. (Defaults to no filters.)
+
+    Returns:
+        Dataframe with columns listed in ANNOTATIONS_TABLE_COLUMNS and the
+        row number in the file as index. The intervals column holds lists of
+        intervals chosen by each worker and the confidence column holds their
+        confidence scores (None if not given). Metadata of HIT assignments is
+        None for files without it.
+
+    Raises:
+        MalformedTaskAnswersError: If answers in any row cannot be parsed.
+        ValueError: If a column used by a row filter is not in the file.
+    """
+    chunks = list(
+        _read_annotations(
+            task_data_path,
+            source,
+            row_filters,
+            DEFAULT_CHUNK_SIZE if len(row_filters) > 0 else None,
+        )
+    )
+    import pandas as pd
+
+    annotations = chunks[0] if len(chunks) == 1 else pd.concat(chunks)
+    return _create_annotations_table(annotations, source, task_data_path)
+
+
+def _group_table_rows(
+    annotations_table: "pd.DataFrame",
+) -> Tuple[List[QueryPassage], List[int]]:
+    """Assigns rows of a columnar annotations table to input texts.
+
+    Args:
+        annotations_table: Table with worker annotations as returned by
+            load_annotations_table.
+
+    Returns:
+        Keys of input texts in order of first appearance and the position of
+        the key of every row in that list.
+    """
+    key_columns = ANNOTATIONS_TABLE_COLUMNS[:2]
+    # Groups are numbered in order of first appearance, the same order in
+    # which drop_duplicates returns the keys.
+    group_ids = annotations_table.groupby(
+        key_columns, sort=False, dropna=False
+    ).ngroup()
+    keys = list(
+        annotations_table[key_columns]
+        .drop_duplicates()
+        .itertuples(index=False, name=None)
+    )
+    return keys, group_ids.tolist()
+
+
+def _group_values(
+    keys: List[QueryPassage], group_ids: List[int], values: List[Any]
+) -> Dict[QueryPassage, List[Any]]:
+    """Groups values of table rows by input text.
+
+    Args:
+        keys: Keys of input texts.
+        group_ids: Position of the key of every row.
+        values: Values for every row.
+
+    Returns:
+        Dictionary indexed by input text id with lists of values.
+    """
+    groups: List[List[Any]] = [[] for _ in keys]
+    for group_id, value in zip(group_ids, values):
+        groups[group_id].append(value)
+    return dict(zip(keys, groups))
+
+
+def _create_worker_annotations(
+    annotations_table: "pd.DataFrame", text_store: TextStore = None
+) -> List[WorkerAnnotation]:
+    """Creates worker annotations for all rows of an annotations table.
+
+    Args:
+        annotations_table: Table with worker annotations as returned by
+            load_annotations_table.
+        text_store (optional): Store with shared queries and texts. Defaults
+            to a new store, so that annotations of the same text share the
+            input text.
+
+    Returns:
+        List of worker annotations, one per row.
+    """
+    if text_store is None:
+        text_store = TextStore()
+    return [
+        WorkerAnnotation(
+            intervals=intervals,
+            input_text=text_store.get_input_text(
+                query=query,
+                query_id=query_id,
+                text=text,
+                text_id=text_id,
+            ),
+            worker_id=worker_id,
+        )
+        for query_id, text_id, query, text, worker_id, intervals in zip(
+            *[
+                annotations_table[column].tolist()
+                for column in ANNOTATIONS_TABLE_COLUMNS[:6]
+            ],
+        )
+    ]
+
+
+def group_annotations_table(
+    annotations_table: "pd.DataFrame",
+) -> Dict[QueryPassage, List[WorkerAnnotation]]:
+    """Groups a columnar annotations table by input text.
+
+    Args:
+        annotations_table: Table with worker annotations as returned by
+            load_annotations_table.
 
     Returns:
         Dictionary indexed by input text id with lists of worker annotations for
-        each passage/sentence and each worker.
+        each passage/sentence and each worker. Input texts and workers follow
+        the order of rows in the table.
     """
-    annotations = pd.read_csv(task_data_path, sep=",", encoding="utf-8")
-    sentence_based = "Input.sentence_id" in annotations.columns
-    snippet_annotations = defaultdict(list)
-    for _, annotation in annotations.iterrows():
-        intervals = convert_worker_annotation_to_intervals(
-            annotation["Answer.taskAnswers"], sentence_based, source
+    keys, group_ids = _group_table_rows(annotations_table)
+    return _group_values(
+        keys, group_ids, _create_worker_annotations(annotations_table)
+    )
+
+
+def _canonicalize_annotations(
+    annotations: Dict[QueryPassage, List[WorkerAnnotation]]
+) -> Dict[QueryPassage, List[WorkerAnnotation]]:
+    """Makes intervals of all annotations canonical.
+
+    Args:
+        annotations: Dictionary indexed by input text id with lists of worker
+            annotations.
+
+    Returns:
+        Dictionary with canonical annotations.
+    """
+    return {
+        key: [
+            canonicalize_annotation(annotation)
+            for annotation in workers_annotations
+        ]
+        for key, workers_annotations in annotations.items()
+    }
+
+
+def _load_task_data(
+    task_data_path: str,
+    source: AnnotationSource,
+    row_filters: Sequence[RowFilter] = (),
+) -> TaskData:
+    """Loads annotations, confidence scores and HIT metadata from file.
+
+    Args:
+        task_data_path: Path to the file with annotations for a task
+            variant.
+        source: Source of the annotation.
+        row_filters (optional): Conditions on rows applied while the file is
+            read. (Defaults to no filters.)
+
+    Returns:
+        All data loaded from the file indexed by input text id.
+    """
+    annotations_table = load_annotations_table(
+        task_data_path, source, row_filters
+    )
+    keys, group_ids = _group_table_rows(annotations_table)
+    import pandas as pd
+
+    hit_metadata = [
+        HITMetadata(
+            assignment_id=assignment_id,
+            assignment_status=assignment_status,
+            work_time_in_seconds=None
+            if pd.isna(work_time_in_seconds)
+            else work_time_in_seconds,
         )
-        turn_id = annotation["Input.turn_id"]
-        text = (
-            annotation["Input.sentence"]
-            if sentence_based
-            else annotation["Input.passage"]
+        for assignment_id, assignment_status, work_time_in_seconds in zip(
+            *[
+                annotations_table[column].tolist()
+                for column in HIT_METADATA_COLUMNS.values()
+            ]
         )
-        text_id = (
-            ast.literal_eval(annotation["Input.passage_id"])[0]
-            if source == AnnotationSource.PROLIFIC
-            else annotation["Input.sentence_id"]
-            if sentence_based
-            else annotation["Input.passage_id"]
+    ]
+    return TaskData(
+        annotations=_group_values(
+            keys, group_ids, _create_worker_annotations(annotations_table)
+        ),
+        confidence_scores=_group_values(
+            keys, group_ids, annotations_table["confidence"].tolist()
+        ),
+        hit_metadata=_group_values(keys, group_ids, hit_metadata),
+    )
+
+
+def _get_or_load_task_data(
+    task_data_path: str,
+    source: AnnotationSource,
+    cache: AnnotationCache,
+    row_filters: Sequence[RowFilter] = (),
+    canonicalize: bool = False,
+) -> TaskData:
+    """Loads data from file or gets it from a cache.
+
+    The cache always holds annotations as they are in the file, they are
+    canonicalized after they are loaded.
+
+    Args:
+        task_data_path: Path to the file with annotations for a task
+            variant.
+        source: Source of the annotation.
+        cache: Cache with loaded data. If None, data is always loaded from
+            file.
+        row_filters (optional): Conditions on rows applied while the file is
+            read. (Defaults to no filters.)
+        canonicalize (optional): If True, intervals of annotations are made
+            canonical. (Defaults to False.)
+
+    Returns:
+        All data loaded from the file indexed by input text id.
+    """
+    if cache is None:
+        task_data = _load_task_data(task_data_path, source, row_filters)
+    else:
+        task_data = cache.get_or_load(
+            task_data_path,
+            "task_data-{}{}".format(
+                source.name,
+                "".join(
+                    "-{!r}".format(row_filter) for row_filter in row_filters
+                ),
+            ),
+            lambda: _load_task_data(task_data_path, source, row_filters),
         )
-        input_text = InputText(
-            query=annotation["Input.query"],
-            query_id=turn_id,
-            text=text,
-            text_id=text_id,
+    if canonicalize:
+        task_data = replace(
+            task_data,
+            annotations=_canonicalize_annotations(task_data.annotations),
         )
-        worker_annotation = WorkerAnnotation(
-            intervals=intervals,
-            input_text=input_text,
-            worker_id=annotation["WorkerId"],
+    return task_data
+
+
+def _load_timed_task_data(
+    task_data_path: str,
+    source: AnnotationSource,
+    cache: AnnotationCache,
+    row_filters: Sequence[RowFilter] = (),
+    canonicalize: bool = False,
+) -> Tuple[TaskData, float]:
+    """Loads data from file and measures the time it took.
+
+    The cache is passed explicitly so that worker processes use the same
+    cache as the process that started them.
+
+    Args:
+        task_data_path: Path to the file with annotations for a task
+            variant.
+        source: Source of the annotation.
+        cache: Cache with loaded data. If None, data is always loaded from
+            file.
+        row_filters (optional): Conditions on rows applied while the file is
+            read. (Defaults to no filters.)
+        canonicalize (optional): If True, intervals of annotations are made
+            canonical. (Defaults to False.)
+
+    Returns:
+        All data loaded from the file and loading time in seconds.
+    """
+    start_time = time.perf_counter()
+    task_data = _get_or_load_task_data(
+        task_data_path, source, cache, row_filters, canonicalize
+    )
+    return task_data, time.perf_counter() - start_time
+
+
+def load_task_data_from_file(
+    task_data_path: str,
+    source: AnnotationSource,
+    use_cache: bool = True,
+    row_filters: Sequence[RowFilter] = (),
+    canonicalize: bool = False,
+) -> TaskData:
+    """Loads annotations, confidence scores and HIT metadata from file.
+
+    The file is read and its task answers are parsed only once. Loaded data is
+    kept in the default on-disk cache, so unchanged files are not parsed
+    again.
+
+    Args:
+        task_data_path: Path to the file with annotations for a task
+            variant.
+        source: Source of the annotation.
+        use_cache (optional): If False, the cache is bypassed. (Defaults to
+            True.)
+        row_filters (optional): Conditions on rows applied while the file is
+            read. (Defaults to no filters.)
+        canonicalize (optional): If True, intervals of every annotation are
+            clamped to the annotated text, sorted and merged, and annotations
+            are marked as canonical. (Defaults to False.)
+
+    Raises:
+        MalformedTaskAnswersError: If answers in any row cannot be parsed.
+        ValueError: If a column used by a row filter is not in the file.
+
+    Returns:
+        All data loaded from the file indexed by input text id.
+    """
+    return _get_or_load_task_data(
+        task_data_path,
+        source,
+        get_default_cache() if use_cache else None,
+        row_filters,
+        canonicalize,
+    )
+
+
+def load_task_data_from_files(
+    task_data_paths: List[str],
+    source: AnnotationSource,
+    num_workers: int = 1,
+    use_cache: bool = True,
+    row_filters: Sequence[RowFilter] = (),
+    canonicalize: bool = False,
+) -> List[TaskData]:
+    """Loads data from multiple files, possibly in parallel.
+
+    Files are parsed in a pool of processes if more than one worker is
+    requested. Results always follow the order of paths, regardless of the
+    order in which files finish loading. Loading time of every file is logged
+    at INFO level.
+
+    Args:
+        task_data_paths: Paths to the files with annotations.
+        source: Source of the annotation.
+        num_workers (optional): Number of processes parsing files. (Defaults
+            to 1.)
+        use_cache (optional): If False, the cache is bypassed. (Defaults to
+            True.)
+        row_filters (optional): Conditions on rows applied while the file is
+            read. (Defaults to no filters.)
+        canonicalize (optional): If True, intervals of every annotation are
+            clamped to the annotated text, sorted and merged, and annotations
+            are marked as canonical. (Defaults to False.)
+
+    Raises:
+        MalformedTaskAnswersError: If answers in any row cannot be parsed.
+        ValueError: If a column used by a row filter is not in a file.
+
+    Returns:
+        List with data loaded from every file.
+    """
+    cache = get_default_cache() if use_cache else None
+    if num_workers > 1 and len(task_data_paths) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(num_workers, len(task_data_paths))
+        ) as executor:
+            results = list(
+                executor.map(
+                    _load_timed_task_data,
+                    task_data_paths,
+                    repeat(source),
+                    repeat(cache),
+                    repeat(row_filters),
+                    repeat(canonicalize),
+                )
+            )
+    else:
+        results = [
+            _load_timed_task_data(
+                task_data_path, source, cache, row_filters, canonicalize
+            )
+            for task_data_path in task_data_paths
+        ]
+
+    for task_data_path, (_, loading_time) in zip(task_data_paths, results):
+        logger.info("Loaded %s in %.3fs", task_data_path, loading_time)
+    return [task_data for task_data, _ in results]
+
+
+def load_worker_annotations_from_file(
+    task_data_path: str,
+    source: AnnotationSource,
+    use_cache: bool = True,
+    row_filters: Sequence[RowFilter] = (),
+    canonicalize: bool = False,
+) -> Dict[QueryPassage, List[WorkerAnnotation]]:
+    """Loads all snippets annotations for a given task from file.
+
+    Args:
+        task_data_path: Path to the file with annotations for a task
+            variant.
+        source: Source of the annotation.
+        use_cache (optional): If False, the cache is bypassed. (Defaults to
+            True.)
+        row_filters (optional): Conditions on rows applied while the file is
+            read. (Defaults to no filters.)
+        canonicalize (optional): If True, intervals of every annotation are
+            clamped to the annotated text, sorted and merged, and annotations
+            are marked as canonical. (Defaults to False.)
+
+    Returns:
+        Dictionary indexed by input text id with lists of worker annotations for
+        each passage/sentence and each worker.
+    """
+    return load_task_data_from_file(
+        task_data_path, source, use_cache, row_filters, canonicalize
+    ).annotations
+
+
+def _count_rows_per_text(
+    task_data_path: str,
+    source: AnnotationSource,
+    chunk_size: int,
+    row_filters: Sequence[RowFilter] = (),
+) -> Counter[QueryPassage]:
+    """Counts rows of every input text without loading the whole file.
+
+    Only the columns forming the (query_id, text_id) key and the columns used
+    by row filters are read.
+
+    Args:
+        task_data_path: Path to the file with annotations for a task
+            variant.
+        source: Source of the annotation.
+        chunk_size: Number of rows read at once.
+        row_filters (optional): Conditions on rows applied while the file is
+            read. (Defaults to no filters.)
+
+    Returns:
+        Number of rows indexed by input text id.
+    """
+    rows_per_text: Counter[QueryPassage] = Counter()
+    for chunk in _read_annotations(
+        task_data_path,
+        source,
+        row_filters,
+        chunk_size,
+        columns={"Input.turn_id", "Input.passage_id", "Input.sentence_id"},
+    ):
+        rows_per_text.update(
+            zip(
+                chunk["Input.turn_id"].tolist(),
+                _get_text_ids(
+                    chunk, source, _is_sentence_based(chunk.columns)
+                ).tolist(),
+            )
         )
-        snippet_annotations[(turn_id, text_id)].append(worker_annotation)
+    return rows_per_text
 
-    return snippet_annotations
+
+def iter_worker_annotations_from_file(
+    task_data_path: str,
+    source: AnnotationSource,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    row_filters: Sequence[RowFilter] = (),
+    canonicalize: bool = False,
+) -> Iterator[Tuple[QueryPassage, List[WorkerAnnotation]]]:
+    """Streams snippets annotations for a given task from file.
+
+    The file is read in chunks of rows. Annotations of an input text are
+    yielded as soon as all rows for that text have been read, so only the
+    current chunk and annotations of incomplete texts are kept in memory.
+    Number of rows per text is counted beforehand from the key columns alone,
+    hence texts do not need to be in consecutive rows.
+
+    Args:
+        task_data_path: Path to the file with annotations for a task
+            variant.
+        source: Source of the annotation.
+        chunk_size (optional): Number of rows read at once. (Defaults to
+            1000.)
+        row_filters (optional): Conditions on rows applied to every chunk.
+            (Defaults to no filters.)
+        canonicalize (optional): If True, intervals of every annotation are
+            clamped to the annotated text, sorted and merged, and annotations
+            are marked as canonical. (Defaults to False.)
+
+    Raises:
+        MalformedTaskAnswersError: If answers in any row of a chunk cannot be
+            parsed.
+        ValueError: If a column used by a row filter is not in the file.
+
+    Yields:
+        Input text id with a list of worker annotations for the text. Texts
+        are yielded in the order in which their last row appears in the file
+        and workers follow the order of rows.
+    """
+    remaining_rows = _count_rows_per_text(
+        task_data_path, source, chunk_size, row_filters
+    )
+    incomplete_annotations: Dict[QueryPassage, List[WorkerAnnotation]] = {}
+    for chunk in _read_annotations(
+        task_data_path, source, row_filters, chunk_size
+    ):
+        annotations_table = _create_annotations_table(
+            chunk, source, task_data_path
+        )
+        grouped_annotations = group_annotations_table(annotations_table)
+        if canonicalize:
+            grouped_annotations = _canonicalize_annotations(grouped_annotations)
+        for key, annotations in grouped_annotations.items():
+            incomplete_annotations.setdefault(key, []).extend(annotations)
+            remaining_rows[key] -= len(annotations)
+            if remaining_rows[key] == 0:
+                del remaining_rows[key]
+                yield key, incomplete_annotations.pop(key)
 
 
 def load_confidence_values_from_file(
@@ -77,20 +899,28 @@ def load_confidence_values_from_file(
         task_data_path: Path to the file with annotations for a task
             variant.
 
+    Raises:
+        MalformedTaskAnswersError: If answers in any row cannot be parsed or
+            do not contain a confidence score.
+
     Returns:
         Dictionary indexed by input text id with lists of confidence scores for
         each passage and each worker.
     """
-    annotations = pd.read_csv(task_data_path, sep=",", encoding="utf-8")
-    confidence_scores = defaultdict(list)
-    for _, annotation in annotations.iterrows():
-        turn_id = annotation["Input.turn_id"]
-        text_id = annotation["Input.passage_id"]
-        answer_confidence = ast.literal_eval(annotation["Answer.taskAnswers"])[
-            0
-        ]["answer_confidence"]
-        confidence_score_str = [k for k, v in answer_confidence.items() if v][0]
-        confidence_score_str = ConfidenceScore[confidence_score_str.upper()]
-        confidence_scores[(turn_id, text_id)].append(confidence_score_str)
-
-    return confidence_scores
+    annotations_table = load_annotations_table(
+        task_data_path, AnnotationSource.MTURK
+    )
+    confidence_scores = annotations_table["confidence"].tolist()
+    missing_confidence_scores = {
+        row: "no confidence score"
+        for row, confidence_score in zip(
+            annotations_table.index, confidence_scores
+        )
+        if confidence_score is None
+    }
+    if len(missing_confidence_scores) > 0:
+        raise MalformedTaskAnswersError(
+            missing_confidence_scores, task_data_path
+        )
+    keys, group_ids = _group_table_rows(annotations_table)
+    return _group_values(keys, group_ids, confidence_scores)
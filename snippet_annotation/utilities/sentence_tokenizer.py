@@ -0,0 +1,390 @@
+"""Sentence tokenizer loaded lazily without network access.
+
+The Punkt model of NLTK is loaded from local NLTK data (e.g., installed with
+`python -m nltk.downloader punkt_tab` or pointed to by the NLTK_DATA
+environment variable) the first time sentences are split. It is never
+downloaded. If the model is not available, a pure-Python splitter is used
+instead, which splits after sentence-final punctuation followed by
+whitespace and a word that does not start with a lowercase letter.
+
+Sentence spans are kept in a segmentation cache indexed by the hash of the
+text, so a passage annotated by several workers is split only once. The cache
+holds the least recently used entries in memory and can also keep them on
+disk, so that spans are reused in later runs.
+"""
+
+import array
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SEGMENTATION_ENTRIES = 65536
+
+_SPANS_SUFFIX = ".spans"
+
+# Words ending with a period that do not end sentences.
+ABBREVIATIONS = frozenset(
+    [
+        "dr",
+        "e.g",
+        "etc",
+        "i.e",
+        "jr",
+        "mr",
+        "mrs",
+        "ms",
+        "no",
+        "prof",
+        "sr",
+        "st",
+        "u.s",
+        "vs",
+    ]
+)
+
+# Sentence-final punctuation with closing quotes and brackets, followed by
+# whitespace.
+_SENTENCE_END_PATTERN = re.compile(r"[.!?]+[\"')\]]*(?=\s)")
+_LAST_WORD_PATTERN = re.compile(r"(\S+?)[.!?]*[\"')\]]*$")
+_NEXT_WORD_PATTERN = re.compile(r"\s+[\"'(\[]*(\S)")
+
+Span = Tuple[int, int]
+
+
+class SentenceTokenizer(ABC):
+    """Abstract class for sentence tokenizers.
+
+    Punkt tokenizers of NLTK do not derive from it, but provide the same
+    method.
+    """
+
+    @abstractmethod
+    def span_tokenize(self, text: str) -> List[Span]:
+        """Finds sentences in a text.
+
+        Args:
+            text: Text to split.
+
+        Returns:
+            Start and end positions of sentences.
+        """
+        raise NotImplementedError
+
+
+class RegexSentenceTokenizer(SentenceTokenizer):
+    """Class for pure-Python sentence tokenizer used without NLTK data."""
+
+    def span_tokenize(self, text: str) -> List[Span]:
+        """Finds sentences in a text.
+
+        Whitespace around sentences is not part of them.
+
+        Args:
+            text: Text to split.
+
+        Returns:
+            Start and end positions of sentences.
+        """
+        spans = []
+        start = 0
+        for match in _SENTENCE_END_PATTERN.finditer(text):
+            if self._is_sentence_end(text, start, match.start(), match.end()):
+                spans.append((start, match.end()))
+                start = match.end()
+        spans.append((start, len(text)))
+        stripped_spans = [_strip(text, span) for span in spans]
+        return [(start, end) for start, end in stripped_spans if start < end]
+
+    def _is_sentence_end(
+        self, text: str, start: int, punctuation_start: int, end: int
+    ) -> bool:
+        """Checks whether punctuation ends a sentence.
+
+        Args:
+            text: Text to split.
+            start: Start position of the current sentence.
+            punctuation_start: Position of sentence-final punctuation.
+            end: Position after sentence-final punctuation.
+
+        Returns:
+            True if a new sentence starts after the punctuation.
+        """
+        next_word = _NEXT_WORD_PATTERN.match(text, end)
+        if next_word is not None and next_word.group(1).islower():
+            return False
+        if text[punctuation_start] != ".":
+            return True
+        last_word = _LAST_WORD_PATTERN.search(
+            text, start, punctuation_start + 1
+        )
+        if last_word is None:
+            return True
+        word = last_word.group(1).lower()
+        # Single letters are initials.
+        return word not in ABBREVIATIONS and not (
+            len(word) == 1 and word.isalpha()
+        )
+
+
+def _strip(text: str, span: Span) -> Span:
+    """Removes whitespace from both ends of a span.
+
+    Args:
+        text: Text with the span.
+        span: Start and end positions.
+
+    Returns:
+        Start and end positions without surrounding whitespace.
+    """
+    start, end = span
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _load_punkt_tokenizer(language: str) -> Optional[SentenceTokenizer]:
+    """Loads Punkt tokenizer from local NLTK data.
+
+    Args:
+        language: Language of the model.
+
+    Returns:
+        Punkt tokenizer or None if NLTK or its data is not available.
+    """
+    try:
+        import nltk.data
+    except ImportError:
+        return None
+    try:
+        try:
+            from nltk.tokenize.punkt import PunktTokenizer
+
+            return PunktTokenizer(language)
+        except ImportError:
+            # NLTK before 3.8.2 stores models as pickles.
+            return nltk.data.load("tokenizers/punkt/{}.pickle".format(language))
+    except LookupError:
+        return None
+
+
+# Loaded tokenizers indexed by language.
+_tokenizers: Dict[str, SentenceTokenizer] = {}
+
+
+def get_sentence_tokenizer(language: str = "english") -> SentenceTokenizer:
+    """Gets sentence tokenizer, loading it on first use.
+
+    Args:
+        language (optional): Language of sentences. (Defaults to english.)
+
+    Returns:
+        Punkt tokenizer of NLTK if its data is available locally, otherwise
+        pure-Python tokenizer.
+    """
+    tokenizer = _tokenizers.get(language)
+    if tokenizer is None:
+        tokenizer = _load_punkt_tokenizer(language)
+        if tokenizer is None:
+            logger.warning(
+                "NLTK Punkt data for %s not found, sentences are split with "
+                "a regular expression.",
+                language,
+            )
+            tokenizer = RegexSentenceTokenizer()
+        _tokenizers[language] = tokenizer
+    return tokenizer
+
+
+class SegmentationCache:
+    """Class for the cache of sentence spans of texts."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_SEGMENTATION_ENTRIES,
+        cache_dir: str = None,
+    ) -> None:
+        """Cache of sentence spans indexed by the hash of texts.
+
+        Args:
+            max_entries (optional): Maximum number of texts with spans kept in
+               memory. (Defaults to DEFAULT_MAX_SEGMENTATION_ENTRIES.)
+            cache_dir (optional): Directory where spans are also stored. If
+               None, spans are kept only in memory.
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._spans: "OrderedDict[str, Tuple[Span, ...]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        """Counts texts with spans kept in memory.
+
+        Returns:
+            Number of entries.
+        """
+        return len(self._spans)
+
+    def get_spans(self, text: str, language: str = "english") -> List[Span]:
+        """Gets sentence spans of a text, splitting it if not cached.
+
+        Args:
+            text: Text to split.
+            language (optional): Language of sentences. (Defaults to
+               english.)
+
+        Returns:
+            Start and end positions of sentences.
+        """
+        tokenizer = get_sentence_tokenizer(language)
+        # Tokenizers may split texts differently, so spans are kept apart.
+        key = hashlib.sha1(
+            "{}|{}|{}".format(type(tokenizer).__name__, language, text).encode(
+                "utf-8"
+            )
+        ).hexdigest()
+        spans = self._spans.get(key)
+        if spans is not None:
+            self._spans.move_to_end(key)
+            return list(spans)
+
+        spans = self._load(key)
+        if spans is None:
+            spans = tuple(tokenizer.span_tokenize(text))
+            self._store(key, spans)
+        self._spans[key] = spans
+        if len(self._spans) > self.max_entries:
+            self._spans.popitem(last=False)
+        return list(spans)
+
+    def clear(self) -> None:
+        """Removes all entries from memory and disk."""
+        self._spans.clear()
+        if self.cache_dir is None or not os.path.isdir(self.cache_dir):
+            return
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(_SPANS_SUFFIX):
+                try:
+                    os.remove(os.path.join(self.cache_dir, filename))
+                except FileNotFoundError:
+                    pass
+
+    def _get_entry_path(self, key: str) -> str:
+        """Gets the path of the file with spans of a text.
+
+        Args:
+            key: Hash of the text.
+
+        Returns:
+            Path to the file.
+        """
+        return os.path.join(self.cache_dir, key + _SPANS_SUFFIX)
+
+    def _load(self, key: str) -> Optional[Tuple[Span, ...]]:
+        """Loads spans of a text from disk.
+
+        Args:
+            key: Hash of the text.
+
+        Returns:
+            Spans or None if they are not stored.
+        """
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._get_entry_path(key), "rb") as entry_file:
+                positions = array.array("q")
+                positions.frombytes(entry_file.read())
+        except (FileNotFoundError, ValueError):
+            return None
+        return tuple(zip(positions[::2], positions[1::2]))
+
+    def _store(self, key: str, spans: Tuple[Span, ...]) -> None:
+        """Stores spans of a text on disk.
+
+        Args:
+            key: Hash of the text.
+            spans: Start and end positions of sentences.
+        """
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        positions = array.array(
+            "q", [position for span in spans for position in span]
+        )
+        # Spans are written to a temporary file first so that concurrent
+        # readers never see partially written entries.
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(file_descriptor, "wb") as entry_file:
+            entry_file.write(positions.tobytes())
+        os.replace(temporary_path, self._get_entry_path(key))
+
+
+_default_segmentation_cache = SegmentationCache()
+
+
+def get_default_segmentation_cache() -> SegmentationCache:
+    """Gets the cache used for splitting texts into sentences.
+
+    Returns:
+        The default segmentation cache.
+    """
+    return _default_segmentation_cache
+
+
+def configure_default_segmentation_cache(
+    max_entries: int = DEFAULT_MAX_SEGMENTATION_ENTRIES,
+    cache_dir: str = None,
+) -> SegmentationCache:
+    """Replaces the cache used for splitting texts into sentences.
+
+    Args:
+        max_entries (optional): Maximum number of texts with spans kept in
+           memory.
+        cache_dir (optional): Directory where spans are also stored.
+
+    Returns:
+        The new default segmentation cache.
+    """
+    global _default_segmentation_cache
+    _default_segmentation_cache = SegmentationCache(max_entries, cache_dir)
+    return _default_segmentation_cache
+
+
+def span_tokenize_sentences(text: str, language: str = "english") -> List[Span]:
+    """Finds sentences in a text.
+
+    Spans are taken from the default segmentation cache if the text was
+    already split.
+
+    Args:
+        text: Text to split.
+        language (optional): Language of sentences. (Defaults to english.)
+
+    Returns:
+        Start and end positions of sentences.
+    """
+    return _default_segmentation_cache.get_spans(text, language)
+
+
+def tokenize_sentences(text: str, language: str = "english") -> List[str]:
+    """Splits a text into sentences.
+
+    Args:
+        text: Text to split.
+        language (optional): Language of sentences. (Defaults to english.)
+
+    Returns:
+        List of sentences.
+    """
+    return [
+        text[start:end]
+        for start, end in span_tokenize_sentences(text, language)
+    ]
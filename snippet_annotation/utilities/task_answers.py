@@ -0,0 +1,292 @@
+"""Parser for worker answers exported from MTurk and Prolific.
+
+The `Answer.taskAnswers` cell of an export holds a one-element list with a
+dictionary of answers given by a worker. MTurk writes it as JSON with Python
+booleans (True/False) and Prolific writes it as a Python literal with single
+quotes. Both shapes are translated to JSON, which is decoded much faster than
+Python source parsed with `ast.literal_eval`.
+"""
+
+import ast
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from snippet_annotation.annotation import ConfidenceScore, Interval
+
+ANSWER_CONFIDENCE_NAME = "answer_confidence"
+
+# Python literals that may appear in payloads with their JSON counterparts.
+_PYTHON_TO_JSON_LITERALS = [
+    ("True", "true"),
+    ("False", "false"),
+    ("None", "null"),
+]
+# JSON literals followed by a line break, which is whitespace between JSON
+# values but is not allowed in JSON strings.
+_PYTHON_TO_SEPARATED_JSON_LITERALS = [
+    (python_literal, json_literal + "\n")
+    for python_literal, json_literal in _PYTHON_TO_JSON_LITERALS
+]
+# Splits payloads into double-quoted strings and the text between them.
+_STRING_PATTERN = re.compile(r'("[^"\\]*(?:\\.[^"\\]*)*")')
+
+
+@dataclass
+class TaskAnswers:
+    """Class for answers given by one worker for one input text."""
+
+    # List of selected intervals.
+    intervals: List[Interval]
+    # Confidence of the worker, None if it was not asked for or not given.
+    confidence: Optional[ConfidenceScore] = None
+
+
+class MalformedTaskAnswersError(ValueError):
+    """Error raised when task answers do not have the expected shape."""
+
+    def __init__(self, reasons: Dict[int, str], path: str = None) -> None:
+        """Error for one or more malformed task answers.
+
+        Args:
+            reasons: Dictionary indexed by row number with the reason why the
+               answers in that row were rejected.
+            path (optional): Path to the file with task answers.
+        """
+        self.reasons = reasons
+        self.path = path
+        super().__init__(
+            "Malformed task answers{} in {} row(s): {}".format(
+                " in {}".format(path) if path is not None else "",
+                len(reasons),
+                "; ".join(
+                    "row {}: {}".format(row, reason)
+                    for row, reason in reasons.items()
+                ),
+            )
+        )
+
+    def __reduce__(self) -> Tuple[type, Tuple[Dict[int, str], str]]:
+        """Recreates the error from its arguments when it is unpickled.
+
+        Errors raised in worker processes are pickled to be re-raised in the
+        parent process.
+
+        Returns:
+            The class and arguments of the error.
+        """
+        return self.__class__, (self.reasons, self.path)
+
+
+def _decode_payload(payload: str) -> Any:
+    """Decodes raw task answers to Python objects.
+
+    Python literals are first replaced in the whole payload, which is much
+    faster than replacing them only outside of strings. Replaced literals are
+    followed by a line break, so payloads with literals in strings are
+    rejected by the JSON decoder and decoded again.
+
+    Args:
+        payload: Task answers as raw text.
+
+    Raises:
+        ValueError: If the payload cannot be decoded.
+
+    Returns:
+        Decoded task answers.
+    """
+    if "'" in payload:
+        if '"' in payload or "\\" in payload:
+            # Quotes cannot be swapped safely when both kinds or escapes are
+            # used.
+            return _literal_eval(payload)
+        payload = payload.replace("'", '"')
+    try:
+        return json.loads(_replace_all_python_literals(payload))
+    except ValueError:
+        pass
+    try:
+        return json.loads(_replace_python_literals(payload))
+    except ValueError:
+        # Python literals that are not valid JSON, e.g., with Python-only
+        # escapes.
+        return _literal_eval(payload)
+
+
+def _replace_all_python_literals(payload: str) -> str:
+    """Replaces Python literals with JSON literals followed by a line break.
+
+    Args:
+        payload: Task answers with double-quoted strings.
+
+    Returns:
+        Task answers with all occurrences of True, False and None replaced.
+    """
+    for python_literal, json_literal in _PYTHON_TO_SEPARATED_JSON_LITERALS:
+        payload = payload.replace(python_literal, json_literal)
+    return payload
+
+
+def _replace_python_literals(payload: str) -> str:
+    """Replaces Python literals outside of strings with JSON literals.
+
+    Args:
+        payload: Task answers with double-quoted strings.
+
+    Returns:
+        Task answers with True, False and None outside of strings replaced.
+    """
+    parts = _STRING_PATTERN.split(payload)
+    # Strings are at odd positions and are kept as they are.
+    for i in range(0, len(parts), 2):
+        for python_literal, json_literal in _PYTHON_TO_JSON_LITERALS:
+            parts[i] = parts[i].replace(python_literal, json_literal)
+    return "".join(parts)
+
+
+def _literal_eval(payload: str) -> Any:
+    """Decodes raw task answers written as a Python literal.
+
+    Args:
+        payload: Task answers as raw text.
+
+    Raises:
+        ValueError: If the payload cannot be decoded.
+
+    Returns:
+        Decoded task answers.
+    """
+    try:
+        return ast.literal_eval(payload)
+    except SyntaxError as e:
+        raise ValueError(str(e))
+
+
+def _get_intervals(
+    answers: Dict[str, Any], annotation_name: str
+) -> List[Interval]:
+    """Extracts intervals selected in annotation with a given name.
+
+    Args:
+        answers: Decoded answers of a worker.
+        annotation_name: Name of the annotation with selected intervals.
+
+    Raises:
+        ValueError: If the annotation is missing or has invalid entities.
+
+    Returns:
+        List of intervals.
+    """
+    annotation = answers.get(annotation_name)
+    if not isinstance(annotation, dict) or not isinstance(
+        annotation.get("entities"), list
+    ):
+        raise ValueError("no entities for {}".format(annotation_name))
+    try:
+        return [
+            Interval(int(entity["startOffset"]), int(entity["endOffset"]))
+            for entity in annotation["entities"]
+        ]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("invalid entity in {}".format(annotation_name))
+
+
+def _get_confidence(answers: Dict[str, Any]) -> Optional[ConfidenceScore]:
+    """Extracts confidence score selected by a worker.
+
+    Args:
+        answers: Decoded answers of a worker.
+
+    Raises:
+        ValueError: If the selected confidence score is unknown.
+
+    Returns:
+        The first selected confidence score or None if none is selected.
+    """
+    answer_confidence = answers.get(ANSWER_CONFIDENCE_NAME)
+    if answer_confidence is None:
+        return None
+    if not isinstance(answer_confidence, dict):
+        raise ValueError("invalid {}".format(ANSWER_CONFIDENCE_NAME))
+    for confidence_score, selected in answer_confidence.items():
+        if selected:
+            try:
+                return ConfidenceScore[confidence_score.upper()]
+            except KeyError:
+                raise ValueError(
+                    "unknown confidence score {}".format(confidence_score)
+                )
+    return None
+
+
+def parse_task_answers(
+    payload: str, annotation_name: Optional[str], row: int = 0
+) -> TaskAnswers:
+    """Parses intervals and confidence score from raw task answers.
+
+    Args:
+        payload: Task answers as raw text in MTurk or Prolific format.
+        annotation_name: Name of the annotation with selected intervals. If
+           None, intervals are not extracted.
+        row (optional): Row number reported for malformed answers. (Defaults
+           to 0.)
+
+    Raises:
+        MalformedTaskAnswersError: If the answers do not have expected shape.
+
+    Returns:
+        Intervals and confidence score given by a worker.
+    """
+    try:
+        if not isinstance(payload, str):
+            raise ValueError("expected text, got {!r}".format(payload))
+        answers = _decode_payload(payload)
+        if (
+            not isinstance(answers, list)
+            or len(answers) == 0
+            or not isinstance(answers[0], dict)
+        ):
+            raise ValueError("expected a list with a dictionary of answers")
+        return TaskAnswers(
+            intervals=_get_intervals(answers[0], annotation_name)
+            if annotation_name is not None
+            else [],
+            confidence=_get_confidence(answers[0]),
+        )
+    except ValueError as e:
+        raise MalformedTaskAnswersError({row: str(e)})
+
+
+def parse_task_answers_column(
+    payloads: Iterable[str], annotation_name: Optional[str]
+) -> List[TaskAnswers]:
+    """Parses task answers of all workers in a task.
+
+    All rows are parsed before an error is raised so that every malformed row
+    is reported at once.
+
+    Args:
+        payloads: Task answers as raw text, one per row.
+        annotation_name: Name of the annotation with selected intervals. If
+           None, intervals are not extracted.
+
+    Raises:
+        MalformedTaskAnswersError: If answers in any row do not have expected
+           shape. Rows are numbered from 0.
+
+    Returns:
+        List of parsed task answers, one per row.
+    """
+    parsed_answers = []
+    reasons: Dict[int, str] = {}
+    for row, payload in enumerate(payloads):
+        try:
+            parsed_answers.append(
+                parse_task_answers(payload, annotation_name, row)
+            )
+        except MalformedTaskAnswersError as e:
+            reasons.update(e.reasons)
+    if len(reasons) > 0:
+        raise MalformedTaskAnswersError(reasons)
+    return parsed_answers
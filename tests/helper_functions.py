@@ -1,6 +1,7 @@
 """Helper functions for tests."""
 
-from typing import List
+import random
+from typing import Any, Callable, List, Tuple
 
 from snippet_annotation.annotation import (
     InputText,
@@ -59,3 +60,112 @@ def create_task_annotations_from_intervals(
         },
         worker_type=worker_type,
     )
+
+
+def create_random_intervals(
+    rng: random.Random,
+    num_intervals: Tuple[int, int],
+    max_start: int,
+    lengths: Tuple[int, int],
+) -> List[Interval]:
+    """Creates random intervals chosen by a worker.
+
+    Intervals may be unsorted, overlapping, touching, empty or, for negative
+    lengths, have the end before the start.
+
+    Args:
+        rng: Random number generator.
+        num_intervals: The minimum and maximum number of intervals.
+        max_start: The maximum start position of an interval.
+        lengths: The minimum and maximum length of an interval.
+
+    Returns:
+        List of intervals.
+    """
+    intervals = []
+    for _ in range(rng.randint(*num_intervals)):
+        start = rng.randint(0, max_start)
+        intervals.append(Interval(start, start + rng.randint(*lengths)))
+    return intervals
+
+
+def create_random_disjoint_intervals(
+    rng: random.Random,
+    num_intervals: Tuple[int, int],
+    gaps: Tuple[int, int],
+    lengths: Tuple[int, int],
+) -> List[Interval]:
+    """Creates random sorted intervals that neither overlap nor touch.
+
+    Args:
+        rng: Random number generator.
+        num_intervals: The minimum and maximum number of intervals.
+        gaps: The minimum and maximum distance between the end of an interval
+           and the start of the next one, increased by one.
+        lengths: The minimum and maximum length of an interval.
+
+    Returns:
+        List of intervals.
+    """
+    intervals = []
+    end = -1
+    for _ in range(rng.randint(*num_intervals)):
+        start = end + rng.randint(*gaps)
+        end = start + rng.randint(*lengths)
+        intervals.append(Interval(start, end))
+    return intervals
+
+
+def assert_matches_reference_on_random_intervals(
+    implementation: Callable[[List[List[List[Interval]]]], Any],
+    reference: Callable[[List[List[List[Interval]]]], Any],
+    num_seeds: int = 20,
+    num_texts: Tuple[int, int] = (1, 1),
+    num_workers: Tuple[int, int] = (1, 6),
+    num_intervals: Tuple[int, int] = (0, 5),
+    max_start: int = 60,
+    lengths: Tuple[int, int] = (-1, 15),
+    disjoint: bool = False,
+) -> None:
+    """Checks that an implementation matches a reference on random intervals.
+
+    Both functions get intervals chosen by workers for every input text and
+    their results are compared for every seed of the random number generator.
+
+    Args:
+        implementation: Function under test.
+        reference: Function computing the expected result.
+        num_seeds (optional): Number of seeds. (Defaults to 20.)
+        num_texts (optional): The minimum and maximum number of input texts.
+           (Defaults to (1, 1).)
+        num_workers (optional): The minimum and maximum number of workers
+           annotating a text. (Defaults to (1, 6).)
+        num_intervals (optional): The minimum and maximum number of intervals
+           chosen by a worker. (Defaults to (0, 5).)
+        max_start (optional): The maximum start position of an interval.
+           (Defaults to 60.)
+        lengths (optional): The minimum and maximum length of an interval.
+           (Defaults to (-1, 15).)
+        disjoint (optional): If True, intervals of every worker are sorted
+           and neither overlap nor touch. (Defaults to False.)
+    """
+    for seed in range(num_seeds):
+        rng = random.Random(seed)
+        texts_intervals = []
+        for _ in range(rng.randint(*num_texts)):
+            workers_intervals = []
+            for _ in range(rng.randint(*num_workers)):
+                if disjoint:
+                    intervals = create_random_disjoint_intervals(
+                        rng, num_intervals, gaps=(1, 10), lengths=lengths
+                    )
+                else:
+                    intervals = create_random_intervals(
+                        rng, num_intervals, max_start, lengths
+                    )
+                workers_intervals.append(intervals)
+            texts_intervals.append(workers_intervals)
+
+        assert implementation(texts_intervals) == reference(
+            texts_intervals
+        ), "seed {}".format(seed)
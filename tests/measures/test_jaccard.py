@@ -1,12 +1,19 @@
 """Tests for Jaccard inter-annotator measures."""
 
-from typing import List
+from typing import Dict, List, Tuple
 
 import pytest
 
 from snippet_annotation.annotation import Interval, TaskAnnotations, WorkerType
-from snippet_annotation.measures.jaccard import Jaccard, JaccardLenient
-from tests.helper_functions import create_annotations_from_intervals
+from snippet_annotation.measures.jaccard import (
+    Jaccard,
+    JaccardLenient,
+    MultiThresholdJaccard,
+)
+from tests.helper_functions import (
+    assert_matches_reference_on_random_intervals,
+    create_annotations_from_intervals,
+)
 
 
 @pytest.mark.parametrize(
@@ -187,3 +194,94 @@ def test_get_task_inter_annotator_agreement():
         jaccard_n.get_task_inter_annotator_agreement(task_annotations)
         == (0.5 + 0.25) / 2
     )
+    assert jaccard_n.get_streamed_inter_annotator_agreement(
+        iter(task_annotations.annotations.items())
+    ) == jaccard_n.get_task_inter_annotator_agreement(task_annotations)
+
+
+def test_multi_threshold_jaccard():
+    """Test that all thresholds match separately computed Jaccard measures."""
+    k_values = [4, 3, 2, 1]
+
+    def create_task_annotations(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> TaskAnnotations:
+        """Creates task annotations with a passage for every text.
+
+        Args:
+            texts_intervals: Intervals chosen by workers for every input text.
+
+        Returns:
+            Task annotations.
+        """
+        return TaskAnnotations(
+            annotations={
+                ("q", str(text)): create_annotations_from_intervals(
+                    workers_intervals
+                )
+                for text, workers_intervals in enumerate(texts_intervals)
+            },
+            worker_type=WorkerType.MTURK_REGULAR,
+        )
+
+    def get_fused_agreements(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> List[Tuple[float, Dict[int, float]]]:
+        """Computes agreements for all thresholds together.
+
+        Args:
+            texts_intervals: Intervals chosen by workers for every input text.
+
+        Returns:
+            Strict and lenient agreements of every text and of the task.
+        """
+        task_annotations = create_task_annotations(texts_intervals)
+        jaccard = MultiThresholdJaccard(k_values)
+        return [
+            jaccard.get_text_annotation_similarities(workers_annotations)
+            for workers_annotations in task_annotations.annotations.values()
+        ] + [jaccard.get_task_inter_annotator_agreements(task_annotations)]
+
+    def get_separate_agreements(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> List[Tuple[float, Dict[int, float]]]:
+        """Computes agreements for every threshold separately.
+
+        Args:
+            texts_intervals: Intervals chosen by workers for every input text.
+
+        Returns:
+            Strict and lenient agreements of every text and of the task.
+        """
+        task_annotations = create_task_annotations(texts_intervals)
+        return [
+            (
+                Jaccard().get_text_annotation_similarity(workers_annotations),
+                {
+                    k: JaccardLenient(k).get_text_annotation_similarity(
+                        workers_annotations
+                    )
+                    for k in k_values
+                },
+            )
+            for workers_annotations in task_annotations.annotations.values()
+        ] + [
+            (
+                Jaccard().get_task_inter_annotator_agreement(task_annotations),
+                {
+                    k: JaccardLenient(k).get_task_inter_annotator_agreement(
+                        task_annotations
+                    )
+                    for k in k_values
+                },
+            )
+        ]
+
+    assert_matches_reference_on_random_intervals(
+        get_fused_agreements,
+        get_separate_agreements,
+        num_seeds=10,
+        num_texts=(1, 5),
+        num_intervals=(0, 4),
+        lengths=(1, 15),
+    )
@@ -1,11 +1,26 @@
 """Tests for computing ROUGE-like measures."""
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import pytest
-from snippet_annotation.annotation import InputText, Interval, WorkerType
-from snippet_annotation.measures.rouge import Rouge, RougeMeasure, RougeVariant
+from snippet_annotation.annotation import (
+    InputText,
+    Interval,
+    TaskAnnotations,
+    WorkerAnnotation,
+    WorkerType,
+)
+from snippet_annotation.measures.rouge import (
+    FusedRouge,
+    Rouge,
+    RougeMeasure,
+    RougePairScores,
+    RougeScores,
+    RougeVariant,
+    get_pairwise_f1_matrix,
+)
 from tests.helper_functions import (
+    assert_matches_reference_on_random_intervals,
     create_annotations_from_intervals,
     create_task_annotations_from_intervals,
 )
@@ -455,3 +470,179 @@ def test_get_task_expert_annotator_agreement():
             for measure, measure_value in measures_values.items()
         ]
     )
+
+
+@pytest.mark.parametrize("rouge_variant", list(RougeVariant))
+def test_fused_rouge(rouge_variant: RougeVariant):
+    """Test that fused measures match separately computed ROUGE measures.
+
+    Args:
+        rouge_variant: Variant of ROUGE measure.
+    """
+
+    def create_task_annotations(
+        texts_intervals: List[List[List[Interval]]], reference: bool
+    ) -> TaskAnnotations:
+        """Creates annotations of reference annotators or of workers.
+
+        Every other annotation of a text is made by a reference annotator.
+
+        Args:
+            texts_intervals: Intervals chosen by all annotators for every
+               input text.
+            reference: Whether annotations of reference annotators are
+               created.
+
+        Returns:
+            Task annotations.
+        """
+        return TaskAnnotations(
+            annotations={
+                ("q", str(text)): create_annotations_from_intervals(
+                    workers_intervals[0 if reference else 1 :: 2]
+                )
+                for text, workers_intervals in enumerate(texts_intervals)
+            },
+            worker_type=WorkerType.MTURK_REGULAR,
+        )
+
+    def get_fused_values(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> List[float]:
+        """Computes all ROUGE measures together.
+
+        Args:
+            texts_intervals: Intervals chosen by all annotators for every
+               input text.
+
+        Returns:
+            Value of every ROUGE measure.
+        """
+        rouge_scores = FusedRouge(rouge_variant, n=2).get_task_scores(
+            create_task_annotations(texts_intervals, reference=True),
+            create_task_annotations(texts_intervals, reference=False),
+        )
+        return [
+            rouge_scores.get_measure_value(rouge_measure)
+            for rouge_measure in RougeMeasure
+        ]
+
+    def get_separate_values(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> List[float]:
+        """Computes every ROUGE measure separately.
+
+        Args:
+            texts_intervals: Intervals chosen by all annotators for every
+               input text.
+
+        Returns:
+            Value of every ROUGE measure.
+        """
+        return [
+            Rouge(
+                rouge_measure, rouge_variant, n=2
+            ).get_task_reference_annotator_agreement(
+                create_task_annotations(texts_intervals, reference=True),
+                create_task_annotations(texts_intervals, reference=False),
+            )
+            for rouge_measure in RougeMeasure
+        ]
+
+    assert_matches_reference_on_random_intervals(
+        get_fused_values,
+        get_separate_values,
+        num_seeds=5,
+        num_texts=(4, 4),
+        num_workers=(2, 8),
+        num_intervals=(1, 3),
+        max_start=40,
+        lengths=(1, 10),
+    )
+
+
+def test_fused_rouge_pair_scores():
+    """Test for computing ROUGE measures for every reference-worker pair."""
+    reference_annotations = [
+        WorkerAnnotation([Interval(0, 4)], None, "expert"),
+    ]
+    worker_annotations = [
+        WorkerAnnotation([Interval(0, 4), Interval(10, 14)], None, "w1"),
+        WorkerAnnotation([Interval(20, 24)], None, "w2"),
+    ]
+
+    assert FusedRouge(RougeVariant.MEAN).get_text_pair_scores(
+        reference_annotations, worker_annotations
+    ) == [
+        RougePairScores("expert", "w1", 4, 4, 8, RougeScores(0.5, 1, 2 / 3)),
+        RougePairScores("expert", "w2", 0, 4, 4, RougeScores(0, 0, 0)),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("rouge_variant", "worker_ids"),
+    [
+        (RougeVariant.MEAN, ["w1", "w2"]),
+        (RougeVariant.MAJORITY, [None]),
+        (RougeVariant.SIMILARITY, ["w1"]),
+    ],
+)
+def test_fused_rouge_pair_scores_worker_ids(
+    rouge_variant: RougeVariant, worker_ids: List[Optional[str]]
+):
+    """Test that pairs have ids of workers whose intervals are compared.
+
+    Args:
+        rouge_variant: Variant of ROUGE measure.
+        worker_ids: Expected ids of workers, None for majority intervals.
+    """
+    reference_annotations = [
+        WorkerAnnotation([Interval(0, 4)], None, "expert"),
+    ]
+    worker_annotations = [
+        WorkerAnnotation([Interval(0, 4), Interval(10, 14)], None, "w1"),
+        WorkerAnnotation([Interval(0, 4)], None, "w2"),
+    ]
+
+    pair_scores = FusedRouge(rouge_variant, n=2).get_text_pair_scores(
+        reference_annotations, worker_annotations
+    )
+
+    assert [pair.worker_id for pair in pair_scores] == worker_ids
+
+
+@pytest.mark.parametrize(
+    "workers_intervals",
+    [
+        [[Interval(0, 4)]],
+        [[Interval(0, 4), Interval(10, 14)], [Interval(20, 24)]],
+        [[Interval(0, 4)], [Interval(4, 8)], [Interval(2, 10)]],
+        [[Interval(0, 6), Interval(3, 9)], [Interval(2, 5)], [Interval(0, 9)]],
+        [[Interval(3, 3)], [Interval(0, 5)], []],
+    ],
+)
+def test_get_pairwise_f1_matrix(workers_intervals: List[List[Interval]]):
+    """Test that the matrix matches F1 computed for every ordered pair.
+
+    Intervals of some annotations overlap, so F1 of their pairs is computed
+    for both orders.
+
+    Args:
+        workers_intervals: Intervals chosen by every worker.
+    """
+    rouge = Rouge(
+        rouge_measure=RougeMeasure.F1, rouge_variant=RougeVariant.MEAN
+    )
+
+    f1_matrix = get_pairwise_f1_matrix(
+        tuple(tuple(intervals) for intervals in workers_intervals)
+    )
+    for row, reference_intervals in enumerate(workers_intervals):
+        for column, worker_intervals in enumerate(workers_intervals):
+            assert f1_matrix[row][column] == (
+                0.0
+                if row == column
+                else rouge._get_reference_annotator_agreement(
+                    reference_intervals, worker_intervals
+                )
+            )
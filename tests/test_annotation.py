@@ -0,0 +1,128 @@
+"""Tests for classes representing snippet annotations."""
+
+import pickle
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from snippet_annotation.annotation import (
+    FrozenWorkerAnnotation,
+    InputText,
+    Interval,
+    TextStore,
+    WorkerAnnotation,
+)
+
+
+@pytest.mark.parametrize(
+    "annotation_object",
+    [
+        Interval(1, 5),
+        InputText("Query?", "q_1", "Text.", "p_1"),
+        FrozenWorkerAnnotation(
+            (Interval(1, 5), Interval(7, 9)),
+            InputText("Query?", "q_1", "Text.", "p_1"),
+            "w_1",
+        ),
+    ],
+)
+def test_frozen_classes(annotation_object: object):
+    """Test that frozen classes are slotted, hashable and picklable.
+
+    Args:
+        annotation_object: Instance of a frozen class.
+    """
+    copied_object = pickle.loads(pickle.dumps(annotation_object))
+
+    assert not hasattr(annotation_object, "__dict__")
+    assert copied_object == annotation_object
+    assert hash(copied_object) == hash(annotation_object)
+    assert len({annotation_object, copied_object}) == 1
+    with pytest.raises(FrozenInstanceError):
+        setattr(annotation_object, annotation_object.__slots__[0], None)
+
+
+def test_freeze_worker_annotation():
+    """Test for converting worker annotations to frozen ones and back."""
+    annotation = WorkerAnnotation(
+        [Interval(1, 5), Interval(7, 9)],
+        InputText("Query?", "q_1", "Text.", "p_1"),
+        "w_1",
+    )
+    frozen_annotation = annotation.freeze()
+
+    assert frozen_annotation.intervals == (Interval(1, 5), Interval(7, 9))
+    assert frozen_annotation.input_text is annotation.input_text
+    assert frozen_annotation.thaw() == annotation
+
+
+@pytest.mark.parametrize("canonical", [False, True])
+def test_freeze_worker_annotation_keeps_canonical(canonical: bool):
+    """Test that the canonical flag survives freezing, thawing and pickling.
+
+    Args:
+        canonical: Whether intervals are known to be canonical.
+    """
+    annotation = WorkerAnnotation(
+        [Interval(1, 5), Interval(7, 9)],
+        InputText("Query?", "q_1", "Text.", "p_1"),
+        "w_1",
+        canonical=canonical,
+    )
+    frozen_annotation = annotation.freeze()
+    copied_annotation = pickle.loads(pickle.dumps(frozen_annotation))
+
+    assert frozen_annotation.canonical is canonical
+    assert frozen_annotation.thaw().canonical is canonical
+    assert copied_annotation.canonical is canonical
+    assert copied_annotation == frozen_annotation
+    assert (
+        frozen_annotation
+        == WorkerAnnotation(
+            annotation.intervals, annotation.input_text, annotation.worker_id
+        ).freeze()
+    )
+
+
+def test_text_store_shares_equal_texts():
+    """Test that copies of the same query and text are shared."""
+    text_store = TextStore()
+    text = "".join(["Sentence one. ", "Sentence two."])
+    text_copy = "".join(["Sentence one. ", "Sentence two."])
+
+    input_text = text_store.get_input_text("Query?", "q_1", text, "p_1")
+    input_text_copy = text_store.get_input_text(
+        "Query?", "q_1", text_copy, "p_1"
+    )
+
+    assert input_text is input_text_copy
+    assert text_store.get_text("p_1", text_copy) is text
+    assert len(text_store) == 1
+
+
+def test_text_store_shares_texts_between_queries():
+    """Test that a text annotated for different queries is stored once."""
+    text_store = TextStore()
+    text = "".join(["Sentence one. ", "Sentence two."])
+
+    input_text_1 = text_store.get_input_text("Query 1?", "q_1", text, "p_1")
+    input_text_2 = text_store.get_input_text(
+        "Query 2?", "q_2", "".join(["Sentence one. ", "Sentence two."]), "p_1"
+    )
+
+    assert input_text_1 is not input_text_2
+    assert input_text_1.text is input_text_2.text
+    assert input_text_2 == InputText("Query 2?", "q_2", text, "p_1")
+
+
+def test_text_store_keeps_different_texts_with_same_id():
+    """Test that a text id reused for a different text is not shared."""
+    text_store = TextStore()
+
+    input_text_1 = text_store.get_input_text("Query?", "q_1", "Text.", "p_1")
+    input_text_2 = text_store.get_input_text(
+        "Query?", "q_1", "Other text.", "p_1"
+    )
+
+    assert input_text_1.text == "Text."
+    assert input_text_2.text == "Other text."
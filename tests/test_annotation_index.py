@@ -0,0 +1,230 @@
+"""Tests for the index of characters selected by workers."""
+
+from typing import Dict, List
+
+import pytest
+
+from snippet_annotation.annotation import (
+    Interval,
+    QueryPassage,
+    WorkerAnnotation,
+)
+from snippet_annotation.annotation_index import AnnotationIndex
+from tests.helper_functions import assert_matches_reference_on_random_intervals
+
+
+def _create_annotations(
+    workers_intervals: Dict[str, List[Interval]]
+) -> List[WorkerAnnotation]:
+    """Creates worker annotations from intervals of workers.
+
+    Args:
+        workers_intervals: Intervals selected by every worker.
+
+    Returns:
+        List of workers' annotations.
+    """
+    return [
+        WorkerAnnotation(
+            intervals=intervals, input_text=None, worker_id=worker_id
+        )
+        for worker_id, intervals in workers_intervals.items()
+    ]
+
+
+@pytest.fixture
+def index() -> AnnotationIndex:
+    """Index of annotations of two passages.
+
+    Returns:
+        Annotation index.
+    """
+    return AnnotationIndex.from_annotations(
+        {
+            ("q1", "p1"): _create_annotations(
+                {
+                    "w1": [Interval(0, 5), Interval(10, 20)],
+                    "w2": [Interval(3, 12)],
+                    "w3": [Interval(11, 15), Interval(12, 14)],
+                }
+            ),
+            ("q1", "p2"): _create_annotations({"w1": [Interval(2, 4)]}),
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    ("position", "workers"),
+    [
+        (-1, []),
+        (0, ["w1"]),
+        (3, ["w1", "w2"]),
+        (5, ["w2"]),
+        (11, ["w1", "w2", "w3"]),
+        (12, ["w1", "w3"]),
+        (19, ["w1"]),
+        (20, []),
+    ],
+)
+def test_get_workers_at(
+    index: AnnotationIndex, position: int, workers: List[str]
+):
+    """Test for finding workers who selected a character.
+
+    Args:
+        index: Annotation index.
+        position: Character position.
+        workers: Expected ids of workers.
+    """
+    assert index.get_workers_at(("q1", "p1"), position) == workers
+    assert index.get_votes_at(("q1", "p1"), position) == len(workers)
+
+
+@pytest.mark.parametrize(
+    ("start", "end", "workers"),
+    [
+        (-5, 0, []),
+        (-5, 1, ["w1"]),
+        (5, 10, ["w2"]),
+        (6, 11, ["w1", "w2"]),
+        (15, 30, ["w1"]),
+        (20, 30, []),
+        (0, 30, ["w1", "w2", "w3"]),
+        (10, 10, []),
+        (12, 13, ["w1", "w3"]),
+    ],
+)
+def test_get_workers_overlapping(
+    index: AnnotationIndex, start: int, end: int, workers: List[str]
+):
+    """Test for finding workers who selected characters in a range.
+
+    Args:
+        index: Annotation index.
+        start: First character position of the range.
+        end: Position after the last character of the range.
+        workers: Expected ids of workers.
+    """
+    assert index.get_workers_overlapping(("q1", "p1"), start, end) == workers
+
+
+@pytest.mark.parametrize(
+    ("k", "spans", "passages"),
+    [
+        (1, [Interval(0, 20)], [("q1", "p1"), ("q1", "p2")]),
+        (2, [Interval(3, 5), Interval(10, 15)], [("q1", "p1")]),
+        (3, [Interval(11, 12)], [("q1", "p1")]),
+        (4, [], []),
+    ],
+)
+def test_get_spans_with_votes(
+    index: AnnotationIndex,
+    k: int,
+    spans: List[Interval],
+    passages: List[QueryPassage],
+):
+    """Test for finding spans and passages selected by at least k workers.
+
+    Args:
+        index: Annotation index.
+        k: The minimum number of workers.
+        spans: Expected spans in the first passage.
+        passages: Expected passages.
+    """
+    assert index.get_spans_with_votes(("q1", "p1"), k) == spans
+    assert list(index.find_passages_with_votes(k)) == passages
+
+
+def test_add_annotations(index: AnnotationIndex):
+    """Test that added annotations are indexed after queries.
+
+    Args:
+        index: Annotation index.
+    """
+    assert index.get_workers_at(("q1", "p2"), 3) == ["w1"]
+    index.add_annotations(
+        {
+            ("q1", "p2"): _create_annotations({"w4": [Interval(3, 6)]}),
+            ("q2", "p1"): _create_annotations({"w4": [Interval(0, 1)]}),
+        }
+    )
+
+    assert len(index) == 3
+    assert ("q2", "p1") in index
+    assert index.get_workers_at(("q1", "p2"), 3) == ["w1", "w4"]
+    assert index.get_max_votes(("q1", "p2")) == 2
+    with pytest.raises(KeyError):
+        index.get_workers_at(("q3", "p1"), 0)
+
+
+def test_annotation_index_on_random_intervals():
+    """Test that queries match scanning all intervals."""
+    ranges = [
+        (start, end)
+        for start in range(-2, 80)
+        for end in range(start, start + 5)
+    ]
+
+    def get_workers_dict(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> Dict[str, List[Interval]]:
+        """Assigns ids to workers who annotated a single text.
+
+        Args:
+            texts_intervals: Intervals chosen by workers for a single text.
+
+        Returns:
+            Intervals selected by every worker.
+        """
+        return {
+            "w{}".format(worker): intervals
+            for worker, intervals in enumerate(texts_intervals[0])
+        }
+
+    def find_workers_with_index(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> List[List[str]]:
+        """Finds workers overlapping every range with the index.
+
+        Args:
+            texts_intervals: Intervals chosen by workers for a single text.
+
+        Returns:
+            Sorted ids of workers for every range.
+        """
+        index = AnnotationIndex.from_annotations(
+            {("q", "p"): _create_annotations(get_workers_dict(texts_intervals))}
+        )
+        return [
+            index.get_workers_overlapping(("q", "p"), start, end)
+            for start, end in ranges
+        ]
+
+    def find_workers_with_scan(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> List[List[str]]:
+        """Finds workers overlapping every range by scanning all intervals.
+
+        Args:
+            texts_intervals: Intervals chosen by workers for a single text.
+
+        Returns:
+            Sorted ids of workers for every range.
+        """
+        return [
+            sorted(
+                worker_id
+                for worker_id, intervals in get_workers_dict(
+                    texts_intervals
+                ).items()
+                if any(
+                    max(start, interval.start) < min(end, interval.end)
+                    for interval in intervals
+                )
+            )
+            for start, end in ranges
+        ]
+
+    assert_matches_reference_on_random_intervals(
+        find_workers_with_index, find_workers_with_scan, num_seeds=10
+    )
@@ -0,0 +1,43 @@
+"""Tests for dependencies loaded by importing the snippet_annotation package.
+
+Import times depend on the machine, so they are only checked by
+`scripts/benchmark_import_time.py`.
+"""
+
+from scripts.benchmark_import_time import (
+    HEAVY_MODULES,
+    get_heavy_modules,
+    get_package_modules,
+    measure_import_times,
+)
+
+
+def test_package_imports_no_heavy_modules():
+    """Test that importing modules does not load heavy dependencies.
+
+    Modules of interval stores, which need numpy, are left out.
+    """
+    modules = ["snippet_annotation"] + [
+        module
+        for module in get_package_modules()
+        if not any(
+            module in importing_modules
+            for importing_modules in HEAVY_MODULES.values()
+        )
+    ]
+    import_times = measure_import_times(modules)
+
+    assert "snippet_annotation.measures.jaccard" in modules
+    assert "snippet_annotation.utilities.data_loader" in modules
+    assert all(module in import_times for module in modules)
+    assert get_heavy_modules(import_times, modules) == []
+
+
+def test_interval_store_imports_numpy():
+    """Test that numpy is reported only for modules that may not import it."""
+    module = "snippet_annotation.interval_store"
+    import_times = measure_import_times([module])
+
+    assert "numpy" in import_times
+    assert get_heavy_modules(import_times, [module]) == []
+    assert get_heavy_modules(import_times, ["snippet_annotation"]) == ["numpy"]
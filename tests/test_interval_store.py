@@ -0,0 +1,130 @@
+"""Tests for array-backed storage of intervals."""
+
+from typing import List
+
+import numpy as np
+import pytest
+
+from snippet_annotation.annotation import InputText, Interval, WorkerType
+from snippet_annotation.interval_store import (
+    IntervalStore,
+    get_intersection_length,
+    get_intervals_chosen_by_n,
+    get_union_length,
+)
+from snippet_annotation.measures.jaccard import Jaccard, JaccardLenient
+from snippet_annotation.measures.rouge import Rouge, RougeMeasure, RougeVariant
+from snippet_annotation.utilities.annotation_utilities import (
+    find_intervals_chosen_by_n_workers,
+    get_intervals_intersection,
+    get_sum_of_intervals_length,
+    merge_annotations,
+)
+from tests.helper_functions import (
+    create_annotations_from_intervals,
+    create_task_annotations_from_intervals,
+)
+
+WORKERS_INTERVALS = [
+    [
+        [Interval(0, 4), Interval(10, 14), Interval(20, 24), Interval(30, 34)],
+        [Interval(0, 4), Interval(20, 24)],
+        [Interval(0, 4), Interval(30, 34)],
+    ],
+    [
+        [Interval(746, 853), Interval(863, 918), Interval(937, 989)],
+        [Interval(721, 998), Interval(1000, 1103)],
+        [Interval(5, 6), Interval(1, 3)],
+        [],
+    ],
+    [[Interval(1, 6)]],
+]
+
+
+def _create_store(workers_intervals: List[List[List[Interval]]]):
+    """Creates task annotations and an interval store with them.
+
+    Args:
+        workers_intervals: Intervals chosen by workers for every input text.
+
+    Returns:
+        Task annotations and the interval store.
+    """
+    task_annotations = create_task_annotations_from_intervals(
+        [
+            InputText("query", "q_{}".format(i), "text", "p_{}".format(i))
+            for i in range(len(workers_intervals))
+        ],
+        workers_intervals,
+        WorkerType.MTURK_REGULAR,
+    )
+    return task_annotations, IntervalStore.from_task_annotations(
+        task_annotations
+    )
+
+
+def test_from_task_annotations():
+    """Test for storing task annotations in CSR layout."""
+    task_annotations, store = _create_store(WORKERS_INTERVALS)
+
+    assert len(store) == 3
+    assert store.text_offsets.tolist() == [0, 3, 7, 8]
+    assert store.annotation_offsets.tolist() == [0, 4, 6, 8, 11, 13, 15, 15, 16]
+    assert store.get_text_index(("q_1", "p_1")) == 1
+    assert store.get_text_index(("q_1", "p_2")) == -1
+    starts, ends = store.get_annotation_intervals(5)
+    assert starts.tolist() == [5, 1]
+    assert ends.tolist() == [6, 3]
+    assert store.to_task_annotations() == task_annotations
+
+
+@pytest.mark.parametrize("intervals", WORKERS_INTERVALS)
+def test_array_operations(intervals: List[List[Interval]]):
+    """Test that operations on arrays give the same results as on intervals.
+
+    Args:
+        intervals: Intervals chosen by different workers.
+    """
+    annotations = create_annotations_from_intervals(intervals)
+    starts = np.array([i.start for a in intervals for i in a], dtype=np.int64)
+    ends = np.array([i.end for a in intervals for i in a], dtype=np.int64)
+
+    assert get_union_length(starts, ends) == get_sum_of_intervals_length(
+        merge_annotations(annotations)
+    )
+    for n in range(1, len(intervals) + 1):
+        chosen_starts, chosen_ends = get_intervals_chosen_by_n(starts, ends, n)
+        assert [
+            Interval(start, end)
+            for start, end in zip(chosen_starts.tolist(), chosen_ends.tolist())
+        ] == find_intervals_chosen_by_n_workers(annotations, n)
+    assert get_intersection_length(
+        [i.start for i in intervals[0]],
+        [i.end for i in intervals[0]],
+        [i.start for i in intervals[-1]],
+        [i.end for i in intervals[-1]],
+    ) == get_sum_of_intervals_length(
+        get_intervals_intersection(intervals[0], intervals[-1])
+    )
+
+
+def test_measures_on_store():
+    """Test that measures give the same results on interval store."""
+    task_annotations, store = _create_store(WORKERS_INTERVALS)
+    reference_annotations, reference_store = _create_store(
+        [[[Interval(0, 10), Interval(20, 30)]], [[Interval(740, 1000)]]]
+    )
+
+    for jaccard in [Jaccard(), JaccardLenient(2)]:
+        assert jaccard.get_store_inter_annotator_agreement(
+            store
+        ) == jaccard.get_task_inter_annotator_agreement(task_annotations)
+
+    for rouge_measure in RougeMeasure:
+        for rouge_variant in RougeVariant:
+            rouge = Rouge(rouge_measure, rouge_variant, n=2)
+            assert rouge.get_store_reference_annotator_agreement(
+                reference_store, store
+            ) == rouge.get_task_reference_annotator_agreement(
+                reference_annotations, task_annotations
+            )
@@ -0,0 +1,155 @@
+"""Tests for coverage counts of all texts in a task."""
+
+from typing import List, Tuple
+
+from snippet_annotation.annotation import (
+    InputText,
+    Interval,
+    TaskAnnotations,
+    WorkerType,
+)
+from snippet_annotation.interval_store import IntervalStore
+from snippet_annotation.measures.jaccard import Jaccard, JaccardLenient
+from snippet_annotation.task_coverage import TaskCoverage
+from snippet_annotation.utilities.annotation_utilities import (
+    find_intervals_chosen_by_n_workers,
+    get_sum_of_intervals_length,
+    merge_annotations,
+)
+from tests.helper_functions import (
+    assert_matches_reference_on_random_intervals,
+    create_task_annotations_from_intervals,
+)
+
+N_VALUES = range(0, 5)
+
+JACCARD_MEASURES = [Jaccard(), JaccardLenient(2), JaccardLenient(3)]
+
+# Index of a text with an interval of characters chosen in it.
+Region = Tuple[int, Interval]
+
+
+def _create_task_annotations(
+    texts_intervals: List[List[List[Interval]]],
+) -> TaskAnnotations:
+    """Creates task annotations with a separate input text for every text.
+
+    Args:
+        texts_intervals: Intervals chosen by workers for every input text.
+
+    Returns:
+        Task annotations.
+    """
+    return create_task_annotations_from_intervals(
+        [
+            InputText("query", "q_{}".format(i), "text", "p_{}".format(i))
+            for i in range(len(texts_intervals))
+        ],
+        texts_intervals,
+        WorkerType.MTURK_REGULAR,
+    )
+
+
+def test_task_coverage():
+    """Test that coverage gives the same regions as operations on intervals.
+
+    Intervals of a worker may be unsorted, overlapping or touching and some
+    texts have no intervals at all.
+    """
+
+    def get_results_with_coverage(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> Tuple[List[int], List[List[int]], List[List[Region]], List[float]]:
+        """Computes lengths, regions and Jaccard agreement with coverage.
+
+        Args:
+            texts_intervals: Intervals chosen by workers for every input text.
+
+        Returns:
+            Union lengths of every text, lengths and regions chosen by n
+            workers for every n and Jaccard agreements of the task.
+        """
+        task_annotations = _create_task_annotations(texts_intervals)
+        coverage = TaskCoverage(
+            IntervalStore.from_task_annotations(task_annotations)
+        )
+        regions = []
+        for n in N_VALUES:
+            text_indices, starts, ends = coverage.get_chosen_regions(n)
+            regions.append(
+                [
+                    (text_index, Interval(start, end))
+                    for text_index, start, end in zip(
+                        text_indices.tolist(), starts.tolist(), ends.tolist()
+                    )
+                ]
+            )
+        return (
+            coverage.get_union_lengths().tolist(),
+            [coverage.get_chosen_lengths(n).tolist() for n in N_VALUES],
+            regions,
+            [
+                jaccard.get_task_inter_annotator_agreement(task_annotations)
+                for jaccard in JACCARD_MEASURES
+            ],
+        )
+
+    def get_results_with_intervals(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> Tuple[List[int], List[List[int]], List[List[Region]], List[float]]:
+        """Computes lengths, regions and Jaccard agreement text by text.
+
+        Args:
+            texts_intervals: Intervals chosen by workers for every input text.
+
+        Returns:
+            Union lengths of every text, lengths and regions chosen by n
+            workers for every n and Jaccard agreements of the task.
+        """
+        texts_annotations = list(
+            _create_task_annotations(texts_intervals).annotations.values()
+        )
+        return (
+            [
+                get_sum_of_intervals_length(merge_annotations(annotations))
+                for annotations in texts_annotations
+            ],
+            [
+                [
+                    get_sum_of_intervals_length(
+                        find_intervals_chosen_by_n_workers(annotations, n)
+                    )
+                    for annotations in texts_annotations
+                ]
+                for n in N_VALUES
+            ],
+            [
+                [
+                    (text_index, interval)
+                    for text_index, annotations in enumerate(texts_annotations)
+                    for interval in find_intervals_chosen_by_n_workers(
+                        annotations, n
+                    )
+                ]
+                for n in N_VALUES
+            ],
+            [
+                sum(
+                    jaccard.get_text_annotation_similarity(annotations)
+                    for annotations in texts_annotations
+                )
+                / len(texts_annotations)
+                for jaccard in JACCARD_MEASURES
+            ],
+        )
+
+    assert_matches_reference_on_random_intervals(
+        get_results_with_coverage,
+        get_results_with_intervals,
+        num_seeds=10,
+        num_texts=(1, 8),
+        num_workers=(1, 5),
+        num_intervals=(0, 4),
+        max_start=50,
+        lengths=(1, 12),
+    )
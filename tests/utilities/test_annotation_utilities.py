@@ -1,17 +1,36 @@
 """Test for utility functions for working with annotations."""
 
-from typing import List
+from collections import defaultdict
+from typing import Dict, List, Tuple
 
 import pytest
 
-from snippet_annotation.annotation import Interval
+from snippet_annotation.annotation import (
+    InputText,
+    Interval,
+    WorkerAnnotation,
+)
 from snippet_annotation.utilities.annotation_utilities import (
+    canonicalize_annotation,
+    canonicalize_intervals,
     find_intervals_chosen_by_n_workers,
     get_intervals_intersection,
+    get_lengths_chosen_by_n_workers,
+    get_n_way_intersection,
     get_sum_of_intervals_length,
+    is_canonical,
     merge_annotations,
+    merge_intervals,
+    project_intervals_onto_spans,
+)
+from snippet_annotation.utilities.conversion import AnnotationSource
+from snippet_annotation.utilities.data_loader import (
+    load_worker_annotations_from_file,
+)
+from tests.helper_functions import (
+    assert_matches_reference_on_random_intervals,
+    create_annotations_from_intervals,
 )
-from tests.helper_functions import create_annotations_from_intervals
 
 
 @pytest.mark.parametrize(
@@ -131,6 +150,16 @@ def test_get_sum_of_intervals_length(intervals: List[Interval], length: int):
             [[Interval(1, 2)], [Interval(3, 4)], [Interval(5, 6)]],
             [Interval(1, 2), Interval(3, 4), Interval(5, 6)],
         ),
+        ([], []),
+        ([[], []], []),
+        (
+            [[Interval(6, 8), Interval(1, 4)], [Interval(3, 5)]],
+            [Interval(1, 5), Interval(6, 8)],
+        ),
+        (
+            [[Interval(2, 2)], [Interval(2, 5), Interval(7, 7)]],
+            [Interval(2, 5), Interval(7, 7)],
+        ),
     ],
 )
 def test_merge_annotations(
@@ -147,6 +176,78 @@ def test_merge_annotations(
     assert merge_annotations(annotations) == merged_intervals
 
 
+@pytest.mark.parametrize(
+    ("intervals", "merged_intervals"),
+    [
+        ([], []),
+        ([[], []], []),
+        (
+            [[Interval(1, 3), Interval(6, 8)], []],
+            [Interval(1, 3), Interval(6, 8)],
+        ),
+        ([[Interval(1, 3)], [Interval(3, 5)]], [Interval(1, 5)]),
+        (
+            [[Interval(1, 3)], [Interval(4, 5)]],
+            [Interval(1, 3), Interval(4, 5)],
+        ),
+        (
+            [[Interval(1, 3), Interval(6, 8)], [Interval(2, 7)]],
+            [Interval(1, 8)],
+        ),
+        (
+            [
+                [Interval(0, 2), Interval(10, 12)],
+                [Interval(4, 4), Interval(11, 15)],
+                [Interval(2, 2), Interval(17, 18)],
+            ],
+            [
+                Interval(0, 2),
+                Interval(4, 4),
+                Interval(10, 15),
+                Interval(17, 18),
+            ],
+        ),
+    ],
+)
+def test_merge_canonical_annotations(
+    intervals: List[List[Interval]],
+    merged_intervals: List[Interval],
+):
+    """Test that merging canonical annotations matches sorting their intervals.
+
+    Args:
+        intervals: Lists of canonical intervals chosen by different workers.
+        merged_intervals: Union of lists of intervals.
+    """
+    annotations = create_annotations_from_intervals(intervals)
+    assert merge_annotations(annotations, canonical=True) == merged_intervals
+    assert merge_annotations(annotations) == merged_intervals
+
+
+@pytest.mark.parametrize(
+    ("sorted_intervals", "merged_intervals"),
+    [
+        ([], []),
+        ([Interval(1, 3), Interval(3, 5)], [Interval(1, 5)]),
+        ([Interval(1, 3), Interval(4, 5)], [Interval(1, 3), Interval(4, 5)]),
+        (
+            [Interval(1, 9), Interval(2, 4), Interval(5, 12), Interval(13, 14)],
+            [Interval(1, 12), Interval(13, 14)],
+        ),
+    ],
+)
+def test_merge_intervals(
+    sorted_intervals: List[Interval], merged_intervals: List[Interval]
+):
+    """Test for creating union of intervals sorted by start positions.
+
+    Args:
+        sorted_intervals: Intervals sorted by their start positions.
+        merged_intervals: Expected union of intervals.
+    """
+    assert merge_intervals(sorted_intervals) == merged_intervals
+
+
 @pytest.mark.parametrize(
     ("intervals", "n", "majority_intervals"),
     [
@@ -223,3 +324,330 @@ def test_find_intervals_chosen_by_n_workers(
     assert (
         find_intervals_chosen_by_n_workers(annotations, n) == majority_intervals
     )
+
+
+def _find_intervals_chosen_by_n_workers_per_position(
+    annotations: List[WorkerAnnotation], n: int
+) -> List[Interval]:
+    """Finds intervals chosen by n workers by counting every position.
+
+    Reference implementation used before the sweep over interval boundaries.
+
+    Args:
+        annotations: List of annotations made by a group of workers.
+        n: The minimum amount of workers in the group that need to annotate an
+           interval.
+
+    Returns:
+        List of intervals chosen by at least n workers in a group.
+    """
+    intervals_chosen_by_n = []
+    num_workers_per_position: Dict[int, int] = defaultdict(int)
+    for annotation in annotations:
+        for interval in annotation.intervals:
+            for position in range(interval.start, interval.end + 1):
+                num_workers_per_position[position] += 1
+
+    current_position = 0
+    current_interval_start = -1
+    while current_position < len(num_workers_per_position):
+        if (
+            num_workers_per_position[current_position] < n
+            and current_interval_start != -1
+        ):
+            intervals_chosen_by_n.append(
+                Interval(current_interval_start, current_position - 1)
+            )
+            current_interval_start = -1
+        elif (
+            num_workers_per_position[current_position] >= n
+            and current_interval_start == -1
+        ):
+            current_interval_start = current_position
+        current_position += 1
+
+    if current_interval_start != -1:
+        intervals_chosen_by_n.append(
+            Interval(current_interval_start, current_position - 1)
+        )
+    return intervals_chosen_by_n
+
+
+@pytest.mark.parametrize(
+    ("task_data_path", "source"),
+    [
+        ("tests/data/test_paragraph_annotations.csv", AnnotationSource.MTURK),
+        ("tests/data/test_sentence_annotations.csv", AnnotationSource.MTURK),
+        (
+            "tests/data/test_paragraph_confidence_annotations.csv",
+            AnnotationSource.MTURK,
+        ),
+        (
+            "tests/data/test_prolific_annotations.csv",
+            AnnotationSource.PROLIFIC,
+        ),
+    ],
+)
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 4])
+def test_find_intervals_chosen_by_n_workers_on_fixtures(
+    task_data_path: str, source: AnnotationSource, n: int
+):
+    """Test that the sweep matches counting of positions on fixtures.
+
+    Args:
+        task_data_path: Path to the file with annotations.
+        source: Source of the annotation.
+        n: The minimum amount of workers in the group that need to annotate an
+           interval.
+    """
+    for annotations in load_worker_annotations_from_file(
+        task_data_path, source
+    ).values():
+        assert find_intervals_chosen_by_n_workers(
+            annotations, n
+        ) == _find_intervals_chosen_by_n_workers_per_position(annotations, n)
+
+
+def test_find_intervals_chosen_by_n_workers_on_random_intervals():
+    """Test that the sweep matches counting of positions on random intervals.
+
+    Intervals of a worker may be unsorted, overlapping, touching or empty.
+    """
+    n_values = list(range(-1, 7))
+
+    def find_intervals_with_sweep(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> Tuple[List[List[Interval]], List[int]]:
+        """Finds intervals and their lengths with the sweep.
+
+        Args:
+            texts_intervals: Intervals chosen by workers for a single text.
+
+        Returns:
+            Intervals chosen by n workers and their lengths for every n.
+        """
+        annotations = create_annotations_from_intervals(texts_intervals[0])
+        return [
+            find_intervals_chosen_by_n_workers(annotations, n) for n in n_values
+        ], get_lengths_chosen_by_n_workers(annotations, n_values)
+
+    def find_intervals_per_position(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> Tuple[List[List[Interval]], List[int]]:
+        """Finds intervals and their lengths by counting every position.
+
+        Args:
+            texts_intervals: Intervals chosen by workers for a single text.
+
+        Returns:
+            Intervals chosen by n workers and their lengths for every n.
+        """
+        annotations = create_annotations_from_intervals(texts_intervals[0])
+        intervals_chosen_by_n = [
+            _find_intervals_chosen_by_n_workers_per_position(annotations, n)
+            for n in n_values
+        ]
+        return intervals_chosen_by_n, [
+            get_sum_of_intervals_length(intervals)
+            for intervals in intervals_chosen_by_n
+        ]
+
+    assert_matches_reference_on_random_intervals(
+        find_intervals_with_sweep, find_intervals_per_position
+    )
+
+
+@pytest.mark.parametrize(
+    ("intervals", "canonical"),
+    [
+        ([], True),
+        ([Interval(0, 4), Interval(5, 5), Interval(8, 10)], True),
+        ([Interval(0, 4), Interval(4, 10)], False),
+        ([Interval(5, 10), Interval(0, 3)], False),
+        ([Interval(-1, 3)], False),
+        ([Interval(3, 2)], False),
+    ],
+)
+def test_is_canonical(intervals: List[Interval], canonical: bool):
+    """Test for checking whether intervals are canonical.
+
+    Args:
+        intervals: List of intervals.
+        canonical: Expected result.
+    """
+    assert is_canonical(intervals) == canonical
+
+
+@pytest.mark.parametrize(
+    ("intervals_lists", "intersection", "boundary_counts"),
+    [
+        ([], [], []),
+        ([[Interval(0, 4)], []], [], []),
+        (
+            [
+                [Interval(0, 10), Interval(20, 30)],
+                [Interval(2, 10), Interval(15, 25)],
+                [Interval(0, 5), Interval(7, 28)],
+            ],
+            [Interval(2, 5), Interval(7, 10), Interval(20, 25)],
+            [(1, 1), (1, 2), (1, 1)],
+        ),
+        (
+            [[Interval(0, 9)], [Interval(0, 4), Interval(5, 9)]],
+            [Interval(0, 9)],
+            [(2, 2)],
+        ),
+        ([[Interval(0, 2), Interval(5, 7)], [Interval(3, 4)]], [], []),
+        ([[Interval(0, 4)], [Interval(4, 8)]], [Interval(4, 4)], [(1, 1)]),
+        ([[Interval(3, 3)], [Interval(0, 5)]], [Interval(3, 3)], [(1, 1)]),
+        (
+            [
+                [Interval(0, 4), Interval(6, 9)],
+                [Interval(2, 7)],
+                [Interval(3, 8)],
+            ],
+            [Interval(3, 4), Interval(6, 7)],
+            [(1, 1), (1, 1)],
+        ),
+    ],
+)
+def test_get_n_way_intersection(
+    intervals_lists: List[List[Interval]],
+    intersection: List[Interval],
+    boundary_counts: List[Tuple[int, int]],
+):
+    """Test for finding the intersection of multiple lists of intervals.
+
+    Args:
+        intervals_lists: Canonical intervals of every annotation.
+        intersection: Expected intervals covered by all annotations.
+        boundary_counts: Expected numbers of annotations with intervals
+           starting and ending at boundaries of the intersection.
+    """
+    assert get_n_way_intersection(intervals_lists) == (
+        intersection,
+        boundary_counts,
+    )
+    assert intersection == find_intervals_chosen_by_n_workers(
+        create_annotations_from_intervals(intervals_lists),
+        len(intervals_lists),
+    )
+
+
+@pytest.mark.parametrize(
+    ("intervals", "text_length", "canonical_intervals"),
+    [
+        ([], None, []),
+        (
+            [Interval(121, 297), Interval(34, 120)],
+            None,
+            [Interval(34, 120), Interval(121, 297)],
+        ),
+        (
+            [Interval(10, 20), Interval(0, 5), Interval(5, 12)],
+            None,
+            [Interval(0, 20)],
+        ),
+        (
+            [Interval(-3, 2), Interval(4, 4), Interval(8, 50)],
+            10,
+            [Interval(0, 2), Interval(8, 10)],
+        ),
+        ([Interval(12, 15), Interval(3, 1)], 10, []),
+    ],
+)
+def test_canonicalize_intervals(
+    intervals: List[Interval],
+    text_length: int,
+    canonical_intervals: List[Interval],
+):
+    """Test for making intervals canonical.
+
+    Args:
+        intervals: List of intervals.
+        text_length: Length of the annotated text.
+        canonical_intervals: Expected canonical intervals.
+    """
+    assert canonicalize_intervals(intervals, text_length) == canonical_intervals
+    assert is_canonical(canonical_intervals)
+
+
+def test_canonicalize_annotation():
+    """Test that canonical annotations are clamped to the text and marked."""
+    annotation = WorkerAnnotation(
+        intervals=[Interval(5, 12), Interval(0, 6)],
+        input_text=InputText("query", "q1", "some text", "p1"),
+        worker_id="worker",
+    )
+    canonical_annotation = canonicalize_annotation(annotation)
+
+    assert canonical_annotation == WorkerAnnotation(
+        intervals=[Interval(0, 9)],
+        input_text=annotation.input_text,
+        worker_id="worker",
+        canonical=True,
+    )
+    assert canonical_annotation.canonical
+    assert canonicalize_annotation(canonical_annotation) is (
+        canonical_annotation
+    )
+    assert not annotation.canonical
+
+
+def test_canonicalize_annotation_with_canonical_intervals():
+    """Test that the canonical flag does not affect equality."""
+    annotation = WorkerAnnotation(
+        intervals=[Interval(0, 4)],
+        input_text=InputText("query", "q1", "some text", "p1"),
+        worker_id="worker",
+    )
+
+    assert canonicalize_annotation(annotation) == annotation
+    assert canonicalize_annotation(annotation.freeze()) == annotation
+
+
+@pytest.mark.parametrize(
+    ("intervals", "projections"),
+    [
+        ([], [[], [], []]),
+        (
+            [Interval(1, 2), Interval(8, 9)],
+            [[Interval(1, 2)], [Interval(2, 3)], []],
+        ),
+        ([Interval(3, 7)], [[Interval(3, 4)], [Interval(0, 1)], []]),
+        (
+            [Interval(2, 4), Interval(4, 6)],
+            [[Interval(2, 4)], [Interval(0, 0)], []],
+        ),
+        (
+            [Interval(1, 10), Interval(8, 14)],
+            [
+                [Interval(1, 4)],
+                [Interval(0, 4), Interval(2, 5)],
+                [Interval(0, 2)],
+            ],
+        ),
+        ([Interval(3, 2), Interval(6, 6)], [[], [Interval(0, 0)], []]),
+    ],
+)
+def test_project_intervals_onto_spans(
+    intervals: List[Interval], projections: List[List[Interval]]
+):
+    """Test that projections match intersections with every span.
+
+    Args:
+        intervals: List of intervals.
+        projections: Expected intersections with every span.
+    """
+    spans = [(0, 5), (6, 12), (12, 20)]
+
+    assert project_intervals_onto_spans(intervals, spans) == projections
+    assert projections == [
+        [
+            Interval(interval.start - start, interval.end - start)
+            for interval in get_intervals_intersection(
+                intervals, [Interval(start, end - 1)]
+            )
+        ]
+        for start, end in spans
+    ]
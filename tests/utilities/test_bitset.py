@@ -0,0 +1,149 @@
+"""Tests for the bitset representation of intervals."""
+
+from typing import List, Tuple
+
+import pytest
+
+from snippet_annotation.annotation import Interval
+from snippet_annotation.utilities.annotation_utilities import (
+    find_intervals_chosen_by_n_workers,
+    get_intervals_intersection,
+    get_sum_of_intervals_length,
+    merge_annotations,
+)
+from snippet_annotation.utilities.bitset import (
+    bitset_to_intervals,
+    fits_bitsets,
+    get_bitset_length,
+    get_bitsets_union,
+    get_chosen_length,
+    intervals_to_bitset,
+)
+from tests.helper_functions import (
+    assert_matches_reference_on_random_intervals,
+    create_annotations_from_intervals,
+)
+
+
+@pytest.mark.parametrize(
+    ("intervals_lists", "fits"),
+    [
+        ([], True),
+        ([[], [Interval(0, 4), Interval(5, 5), Interval(8, 10)]], True),
+        ([[Interval(0, 4), Interval(4, 10)]], False),
+        ([[Interval(5, 10), Interval(0, 3)]], False),
+        ([[Interval(-1, 3)]], False),
+        ([[Interval(3, 2)]], False),
+        ([[Interval(0, 4)], [Interval(0, 5000)]], False),
+    ],
+)
+def test_fits_bitsets(intervals_lists: List[List[Interval]], fits: bool):
+    """Test for checking whether intervals can be represented with bitsets.
+
+    Args:
+        intervals_lists: Lists of intervals.
+        fits: Expected result.
+    """
+    assert fits_bitsets(intervals_lists) == fits
+
+
+@pytest.mark.parametrize(
+    ("intervals", "inclusive", "bitset"),
+    [
+        ([], False, 0),
+        ([Interval(1, 3)], False, 0b110),
+        ([Interval(1, 3)], True, 0b1110),
+        ([Interval(0, 1), Interval(3, 5)], False, 0b11001),
+        ([Interval(2, 2)], False, 0),
+        ([Interval(2, 2)], True, 0b100),
+    ],
+)
+def test_intervals_to_bitset(
+    intervals: List[Interval], inclusive: bool, bitset: int
+):
+    """Test for creating bitsets from intervals.
+
+    Args:
+        intervals: List of intervals.
+        inclusive: Whether end positions are covered.
+        bitset: Expected bitset.
+    """
+    assert intervals_to_bitset(intervals, inclusive) == bitset
+    assert bitset_to_intervals(intervals_to_bitset(intervals)) == [
+        interval for interval in intervals if interval.start < interval.end
+    ]
+
+
+def test_bitsets_on_random_intervals():
+    """Test that bitsets match interval utilities on canonical intervals."""
+
+    def get_lengths_with_bitsets(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> Tuple[List[Interval], List[int], List[int], List[int]]:
+        """Computes union and lengths of intervals with bitsets.
+
+        Args:
+            texts_intervals: Intervals chosen by workers for a single text.
+
+        Returns:
+            Union of intervals, lengths of intervals of every worker and of
+            their intersections with intervals of the first worker and lengths
+            of intervals chosen by n workers for every n.
+        """
+        workers_intervals = texts_intervals[0]
+        assert fits_bitsets(workers_intervals)
+        bitsets = [
+            intervals_to_bitset(intervals) for intervals in workers_intervals
+        ]
+        return (
+            bitset_to_intervals(get_bitsets_union(bitsets)),
+            [get_bitset_length(bitset) for bitset in bitsets],
+            [get_bitset_length(bitset & bitsets[0]) for bitset in bitsets],
+            [get_chosen_length(workers_intervals, n) for n in range(0, 8)],
+        )
+
+    def get_lengths_with_intervals(
+        texts_intervals: List[List[List[Interval]]],
+    ) -> Tuple[List[Interval], List[int], List[int], List[int]]:
+        """Computes union and lengths of intervals with interval utilities.
+
+        Args:
+            texts_intervals: Intervals chosen by workers for a single text.
+
+        Returns:
+            Union of intervals, lengths of intervals of every worker and of
+            their intersections with intervals of the first worker and lengths
+            of intervals chosen by n workers for every n.
+        """
+        workers_intervals = texts_intervals[0]
+        annotations = create_annotations_from_intervals(workers_intervals)
+        return (
+            [
+                interval
+                for interval in merge_annotations(annotations)
+                if interval.start < interval.end
+            ],
+            [
+                get_sum_of_intervals_length(intervals)
+                for intervals in workers_intervals
+            ],
+            [
+                get_sum_of_intervals_length(
+                    get_intervals_intersection(intervals, workers_intervals[0])
+                )
+                for intervals in workers_intervals
+            ],
+            [
+                get_sum_of_intervals_length(
+                    find_intervals_chosen_by_n_workers(annotations, n)
+                )
+                for n in range(0, 8)
+            ],
+        )
+
+    assert_matches_reference_on_random_intervals(
+        get_lengths_with_bitsets,
+        get_lengths_with_intervals,
+        lengths=(0, 15),
+        disjoint=True,
+    )
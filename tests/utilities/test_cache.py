@@ -0,0 +1,101 @@
+"""Tests for the on-disk cache of data loaded from annotation files."""
+
+import os
+import shutil
+
+from snippet_annotation.utilities.cache import AnnotationCache
+from snippet_annotation.utilities.conversion import AnnotationSource
+from snippet_annotation.utilities.data_loader import (
+    load_worker_annotations_from_file,
+)
+
+
+def _copy_test_file(tmp_path) -> str:
+    """Copies a test annotations file to a temporary directory.
+
+    Args:
+        tmp_path: Temporary directory.
+
+    Returns:
+        Path to the copied file.
+    """
+    path = str(tmp_path / "annotations.csv")
+    shutil.copy("tests/data/test_paragraph_annotations.csv", path)
+    return path
+
+
+def test_get_or_load(tmp_path):
+    """Test that data is loaded only once for an unchanged file."""
+    path = _copy_test_file(tmp_path)
+    cache = AnnotationCache(cache_dir=str(tmp_path / "cache"))
+    loads = []
+
+    def load():
+        loads.append(path)
+        return {"loaded": len(loads)}
+
+    assert cache.get_or_load(path, "test", load) == {"loaded": 1}
+    assert cache.get_or_load(path, "test", load) == {"loaded": 1}
+    assert cache.get_or_load(path, "other", load) == {"loaded": 2}
+
+    with open(path, "a") as annotation_file:
+        annotation_file.write("\n")
+    assert cache.get_or_load(path, "test", load) == {"loaded": 3}
+
+
+def test_invalidate(tmp_path):
+    """Test for removing cached data."""
+    path = _copy_test_file(tmp_path)
+    cache = AnnotationCache(cache_dir=str(tmp_path / "cache"))
+    cache.get_or_load(path, "test", lambda: 1)
+    assert cache.get_size() > 0
+
+    cache.invalidate(path)
+    assert cache.get_size() == 0
+    assert cache.get_or_load(path, "test", lambda: 2) == 2
+
+
+def test_eviction(tmp_path):
+    """Test that least recently used entries are evicted."""
+    path = _copy_test_file(tmp_path)
+    cache = AnnotationCache(cache_dir=str(tmp_path / "cache"))
+    cache.get_or_load(path, "first", lambda: "a" * 100)
+    entry_size = cache.get_size()
+
+    cache.max_size_bytes = entry_size
+    cache.get_or_load(path, "second", lambda: "b" * 100)
+    assert len(os.listdir(cache.cache_dir)) == 1
+    assert cache.get_or_load(path, "second", lambda: "c") == "b" * 100
+
+
+def test_disabled_cache(tmp_path):
+    """Test that a disabled cache always loads data."""
+    path = _copy_test_file(tmp_path)
+    cache = AnnotationCache(cache_dir=str(tmp_path / "cache"), enabled=False)
+    assert cache.get_or_load(path, "test", lambda: 1) == 1
+    assert cache.get_or_load(path, "test", lambda: 2) == 2
+    assert not os.path.exists(cache.cache_dir)
+
+
+def test_load_worker_annotations_from_cache(tmp_path, annotation_cache):
+    """Test that cached annotations are the same as annotations from file.
+
+    Args:
+        tmp_path: Temporary directory.
+        annotation_cache: Default cache used by loaders.
+    """
+    path = _copy_test_file(tmp_path)
+    annotations = load_worker_annotations_from_file(
+        path, AnnotationSource.MTURK
+    )
+    assert annotation_cache.get_size() > 0
+    assert (
+        load_worker_annotations_from_file(path, AnnotationSource.MTURK)
+        == annotations
+    )
+    assert (
+        load_worker_annotations_from_file(
+            path, AnnotationSource.MTURK, use_cache=False
+        )
+        == annotations
+    )
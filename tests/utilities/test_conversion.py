@@ -9,7 +9,11 @@ from snippet_annotation.utilities.conversion import (
     AnnotationSource,
     convert_paragraph_annotation_to_sentence_based,
     convert_paragraph_task_annotation_to_sentence_based,
+    convert_sentence_task_annotation_to_paragraph_based,
     convert_worker_annotation_to_intervals,
+    get_sentence_id,
+    get_sentence_offsets,
+    parse_sentence_id,
 )
 
 
@@ -297,3 +301,132 @@ def test_convert_paragraph_task_annotation_to_sentence_based():
     )
 
     assert sentences_annotations == expected_sentences_annotations
+
+
+def test_convert_paragraph_annotation_with_repeated_sentences():
+    """Test that repeated sentences get intervals from their own positions."""
+    input_text = InputText("Test query", "q_1", "Yes. Maybe. Yes.", "p_1")
+    annotations = [
+        WorkerAnnotation(
+            intervals=[Interval(12, 15)], input_text=input_text, worker_id=w
+        )
+        for w in ["w_1", "w_2"]
+    ]
+
+    sentences_annotations = convert_paragraph_task_annotation_to_sentence_based(
+        {("q_1", "p_1"): annotations}
+    )
+
+    assert [
+        sentence_annotations[0].intervals
+        for sentence_annotations in sentences_annotations.values()
+    ] == [[], [], [Interval(0, 3)]]
+    # Sentence input texts are shared by workers.
+    assert all(
+        sentence_annotations[0].input_text is sentence_annotations[1].input_text
+        for sentence_annotations in sentences_annotations.values()
+    )
+
+
+@pytest.mark.parametrize(
+    ("query_id", "sentence_id", "text_id", "position"),
+    [
+        ("q_1", "q_1--p_1--0", "p_1", 0),
+        (
+            "132_1-1",
+            "132_1-1--MARCO_16_3117875026-1--12",
+            "MARCO_16_3117875026-1",
+            12,
+        ),
+        ("q", "q--p--x--3", "p--x", 3),
+    ],
+)
+def test_parse_sentence_id(
+    query_id: str, sentence_id: str, text_id: str, position: int
+):
+    """Test for getting paragraph ids and positions from sentence ids.
+
+    Args:
+        query_id: Id of the query.
+        sentence_id: Id of the sentence.
+        text_id: Expected id of the paragraph.
+        position: Expected position of the sentence.
+    """
+    assert parse_sentence_id(query_id, sentence_id) == (text_id, position)
+    assert get_sentence_id(query_id, text_id, position) == sentence_id
+
+
+def test_parse_sentence_id_of_other_query():
+    """Test that sentence ids of other queries are rejected."""
+    with pytest.raises(ValueError):
+        parse_sentence_id("q_2", "q_1--p_1--0")
+
+
+def test_convert_sentence_task_annotation_to_paragraph_based():
+    """Test that paragraph annotations are rebuilt from sentences."""
+    input_text = InputText(
+        "Test query", "q_1", "Sentence 1.  Sentence 2. Sentence 3.", "p_1"
+    )
+    paragraph_annotations = {
+        ("q_1", "p_1"): [
+            WorkerAnnotation(
+                intervals=[Interval(0, 5), Interval(13, 23)],
+                input_text=input_text,
+                worker_id="w_1",
+            ),
+            WorkerAnnotation(
+                intervals=[Interval(28, 35)],
+                input_text=input_text,
+                worker_id="w_2",
+            ),
+        ]
+    }
+    sentence_annotations = convert_paragraph_task_annotation_to_sentence_based(
+        paragraph_annotations
+    )
+
+    lifted_annotations = convert_sentence_task_annotation_to_paragraph_based(
+        sentence_annotations,
+        get_sentence_offsets(
+            sentence_annotations, {("q_1", "p_1"): input_text}
+        ),
+    )
+    assert lifted_annotations == paragraph_annotations
+
+    rebuilt_annotations = convert_sentence_task_annotation_to_paragraph_based(
+        sentence_annotations
+    )
+    assert rebuilt_annotations[("q_1", "p_1")][0].input_text.text == (
+        "Sentence 1. Sentence 2. Sentence 3."
+    )
+    assert [
+        annotation.intervals
+        for annotation in rebuilt_annotations[("q_1", "p_1")]
+    ] == [[Interval(0, 5), Interval(12, 22)], [Interval(27, 34)]]
+
+
+def test_convert_sentence_task_annotation_without_annotations():
+    """Test that sentences without annotations are skipped."""
+    input_text = InputText(
+        "Test query", "q_1", "Sentence 1.", get_sentence_id("q_1", "p_1", 1)
+    )
+    sentence_annotations = {
+        ("q_1", get_sentence_id("q_1", "p_1", 0)): [],
+        ("q_1", get_sentence_id("q_1", "p_1", 1)): [
+            WorkerAnnotation([Interval(0, 8)], input_text, "w_1")
+        ],
+        ("q_1", get_sentence_id("q_1", "p_2", 0)): [],
+    }
+
+    paragraph_annotations = convert_sentence_task_annotation_to_paragraph_based(
+        sentence_annotations
+    )
+
+    assert list(paragraph_annotations) == [("q_1", "p_1")]
+    assert paragraph_annotations[("q_1", "p_1")] == [
+        WorkerAnnotation(
+            [Interval(0, 8)],
+            InputText("Test query", "q_1", "Sentence 1.", "p_1"),
+            "w_1",
+        )
+    ]
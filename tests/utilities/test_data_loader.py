@@ -2,13 +2,33 @@
 
 from typing import List
 
+import pandas as pd
 import pytest
 
-from snippet_annotation.annotation import InputText, Interval, WorkerAnnotation
+from snippet_annotation.annotation import (
+    ConfidenceScore,
+    HITMetadata,
+    InputText,
+    Interval,
+    WorkerAnnotation,
+)
+from snippet_annotation.utilities.annotation_utilities import (
+    canonicalize_intervals,
+)
 from snippet_annotation.utilities.conversion import AnnotationSource
 from snippet_annotation.utilities.data_loader import (
+    ANNOTATIONS_TABLE_COLUMNS,
+    REJECTED_ASSIGNMENTS_FILTER,
+    RowFilter,
+    group_annotations_table,
+    iter_worker_annotations_from_file,
+    load_annotations_table,
+    load_confidence_values_from_file,
+    load_task_data_from_file,
+    load_task_data_from_files,
     load_worker_annotations_from_file,
 )
+from snippet_annotation.utilities.task_answers import MalformedTaskAnswersError
 
 
 @pytest.mark.parametrize(
@@ -123,3 +143,335 @@ def test_load_worker_annotations_from_file(
             )
         ]
     )
+
+
+@pytest.mark.parametrize(
+    ("task_data_path", "source", "text_ids", "workers_intervals"),
+    [
+        (
+            "tests/data/test_paragraph_annotations.csv",
+            AnnotationSource.MTURK,
+            ["MARCO_16_3117875026-1", "MARCO_16_3117875026-1"],
+            [
+                [Interval(551, 596), Interval(746, 997)],
+                [Interval(1000, 1103), Interval(1105, 1248)],
+            ],
+        ),
+        (
+            "tests/data/test_prolific_annotations.csv",
+            AnnotationSource.PROLIFIC,
+            ["MARCO_16_3117875026-1", "MARCO_16_3117875026-1"],
+            [
+                [Interval(20, 34), Interval(1019, 1102), Interval(1225, 1248)],
+                [Interval(5, 45), Interval(545, 596), Interval(721, 918)],
+            ],
+        ),
+    ],
+)
+def test_load_annotations_table(
+    task_data_path: str,
+    source: AnnotationSource,
+    text_ids: List[str],
+    workers_intervals: List[List[Interval]],
+):
+    """Test for loading annotations for a given task as a columnar table.
+
+    Args:
+        task_data_path: Path to the file with annotations.
+        source: Source of the annotation.
+        text_ids: Expected ids of annotated texts.
+        workers_intervals: Annotated intervals.
+    """
+    annotations_table = load_annotations_table(task_data_path, source)
+
+    assert list(annotations_table.columns) == ANNOTATIONS_TABLE_COLUMNS
+    assert annotations_table["text_id"].tolist() == text_ids
+    assert annotations_table["intervals"].tolist() == workers_intervals
+
+
+def test_group_annotations_table():
+    """Test for grouping a columnar annotations table by input text."""
+    annotations_table = load_annotations_table(
+        "tests/data/test_sentence_annotations.csv", AnnotationSource.MTURK
+    )
+    annotations = group_annotations_table(annotations_table)
+
+    assert list(annotations.keys()) == [
+        ("132_1-1", "132_1-1--MARCO_16_3117875026-1--2")
+    ]
+    assert [
+        annotation.worker_id
+        for annotation in annotations[
+            ("132_1-1", "132_1-1--MARCO_16_3117875026-1--2")
+        ]
+    ] == ["A1GOLJMO4GID3I", "A26ZENZ5G8AEGM"]
+
+
+def test_load_task_data_from_file():
+    """Test for loading annotations, confidence and metadata at once."""
+    task_data = load_task_data_from_file(
+        "tests/data/test_paragraph_confidence_annotations.csv",
+        AnnotationSource.MTURK,
+    )
+    query_passage = ("81_1", "MARCO_1104225")
+
+    assert list(task_data.annotations.keys()) == [query_passage]
+    assert [
+        annotation.intervals
+        for annotation in task_data.annotations[query_passage]
+    ] == [
+        [Interval(34, 120), Interval(253, 297)],
+        [Interval(34, 120), Interval(121, 297)],
+        [Interval(34, 120)],
+    ]
+    assert task_data.confidence_scores == {
+        query_passage: [
+            ConfidenceScore.MEDIUM,
+            ConfidenceScore.HIGH,
+            ConfidenceScore.LOW,
+        ]
+    }
+    assert task_data.hit_metadata[query_passage][1] == HITMetadata(
+        assignment_id="3Y5140Z9D2VA1WUXE0E1LQ0ADGMIP0",
+        assignment_status="Submitted",
+        work_time_in_seconds=236,
+    )
+    assert all(
+        annotation.input_text
+        is task_data.annotations[query_passage][0].input_text
+        for annotation in task_data.annotations[query_passage]
+    )
+    assert task_data.confidence_scores == load_confidence_values_from_file(
+        "tests/data/test_paragraph_confidence_annotations.csv"
+    )
+
+
+def test_load_task_data_from_file_with_missing_work_time(tmp_path):
+    """Test that an empty work time cell is loaded as a missing value."""
+    annotations = pd.read_csv(
+        "tests/data/test_paragraph_confidence_annotations.csv"
+    )
+    annotations.loc[0, "WorkTimeInSeconds"] = None
+    task_data_path = str(tmp_path / "missing_work_time.csv")
+    annotations.to_csv(task_data_path, index=False)
+
+    task_data = load_task_data_from_file(
+        task_data_path, AnnotationSource.MTURK, use_cache=False
+    )
+
+    assert [
+        metadata.work_time_in_seconds
+        for metadata in task_data.hit_metadata[("81_1", "MARCO_1104225")]
+    ] == [None, 236, 106]
+
+
+def test_load_confidence_values_from_file_without_confidence():
+    """Test that rows without confidence scores are reported."""
+    with pytest.raises(MalformedTaskAnswersError) as e:
+        load_confidence_values_from_file(
+            "tests/data/test_paragraph_annotations.csv"
+        )
+    assert list(e.value.reasons.keys()) == [0, 1]
+
+
+@pytest.mark.parametrize(
+    ("task_data_path", "source"),
+    [
+        ("tests/data/test_paragraph_annotations.csv", AnnotationSource.MTURK),
+        ("tests/data/test_sentence_annotations.csv", AnnotationSource.MTURK),
+        (
+            "tests/data/test_paragraph_confidence_annotations.csv",
+            AnnotationSource.MTURK,
+        ),
+        (
+            "tests/data/test_prolific_annotations.csv",
+            AnnotationSource.PROLIFIC,
+        ),
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_iter_worker_annotations_from_file(
+    task_data_path: str, source: AnnotationSource, chunk_size: int
+):
+    """Test that streamed annotations are the same as loaded annotations.
+
+    Args:
+        task_data_path: Path to the file with annotations.
+        source: Source of the annotation.
+        chunk_size: Number of rows read at once.
+    """
+    streamed_annotations = list(
+        iter_worker_annotations_from_file(task_data_path, source, chunk_size)
+    )
+
+    assert dict(streamed_annotations) == load_worker_annotations_from_file(
+        task_data_path, source, use_cache=False
+    )
+    assert len(streamed_annotations) == len(dict(streamed_annotations))
+
+
+def test_iter_worker_annotations_from_file_non_consecutive_rows(tmp_path):
+    """Test that texts are yielded once all their rows have been read."""
+    annotations = pd.read_csv(
+        "tests/data/test_paragraph_confidence_annotations.csv"
+    )
+    other_annotations = annotations.copy()
+    other_annotations["Input.passage_id"] = "MARCO_1"
+    # Rows of two texts are interleaved: A, B, A, B, A, B.
+    interleaved_annotations = pd.concat(
+        [annotations, other_annotations]
+    ).sort_index(kind="stable")
+    task_data_path = str(tmp_path / "interleaved.csv")
+    interleaved_annotations.to_csv(task_data_path, index=False)
+
+    streamed_annotations = list(
+        iter_worker_annotations_from_file(
+            task_data_path, AnnotationSource.MTURK, chunk_size=2
+        )
+    )
+
+    assert [key for key, _ in streamed_annotations] == [
+        ("81_1", "MARCO_1104225"),
+        ("81_1", "MARCO_1"),
+    ]
+    assert [len(annotations) for _, annotations in streamed_annotations] == [
+        3,
+        3,
+    ]
+
+
+def test_iter_worker_annotations_from_file_malformed_rows(tmp_path):
+    """Test that malformed rows are reported with their row in the file."""
+    annotations = pd.read_csv("tests/data/test_paragraph_annotations.csv")
+    annotations.loc[1, "Answer.taskAnswers"] = "[{}]"
+    task_data_path = str(tmp_path / "malformed.csv")
+    annotations.to_csv(task_data_path, index=False)
+
+    with pytest.raises(MalformedTaskAnswersError) as e:
+        list(
+            iter_worker_annotations_from_file(
+                task_data_path, AnnotationSource.MTURK, chunk_size=1
+            )
+        )
+    assert list(e.value.reasons.keys()) == [1]
+    assert e.value.path == task_data_path
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_load_task_data_from_files(num_workers: int):
+    """Test that data loaded from several files follows the order of paths.
+
+    Args:
+        num_workers: Number of processes parsing files.
+    """
+    task_data_paths = [
+        "tests/data/test_sentence_annotations.csv",
+        "tests/data/test_paragraph_confidence_annotations.csv",
+        "tests/data/test_paragraph_annotations.csv",
+    ]
+    task_data = load_task_data_from_files(
+        task_data_paths, AnnotationSource.MTURK, num_workers
+    )
+
+    assert task_data == [
+        load_task_data_from_file(
+            task_data_path, AnnotationSource.MTURK, use_cache=False
+        )
+        for task_data_path in task_data_paths
+    ]
+
+
+def test_load_annotations_table_with_row_filters(tmp_path):
+    """Test that rows are filtered while reading an annotations file."""
+    annotations = pd.read_csv(
+        "tests/data/test_paragraph_confidence_annotations.csv"
+    )
+    annotations.loc[0, "AssignmentStatus"] = "Rejected"
+    task_data_path = str(tmp_path / "rejected.csv")
+    annotations.to_csv(task_data_path, index=False)
+
+    annotations_table = load_annotations_table(
+        task_data_path,
+        AnnotationSource.MTURK,
+        [
+            REJECTED_ASSIGNMENTS_FILTER,
+            RowFilter("WorkerId", ("worker_333", "worker_298")),
+        ],
+    )
+
+    assert annotations_table["worker_id"].tolist() == ["worker_333"]
+    assert annotations_table.index.tolist() == [2]
+    assert [
+        annotation.worker_id
+        for annotations in iter_worker_annotations_from_file(
+            task_data_path,
+            AnnotationSource.MTURK,
+            chunk_size=1,
+            row_filters=[REJECTED_ASSIGNMENTS_FILTER],
+        )
+        for annotation in annotations[1]
+    ] == ["worker_195", "worker_333"]
+
+
+def test_load_task_data_from_file_with_row_filters():
+    """Test that filtered and unfiltered data are cached separately."""
+    task_data_path = "tests/data/test_paragraph_confidence_annotations.csv"
+    load_task_data_from_file(task_data_path, AnnotationSource.MTURK)
+    task_data = load_task_data_from_file(
+        task_data_path,
+        AnnotationSource.MTURK,
+        row_filters=[RowFilter("WorkerId", ("worker_195",), exclude=True)],
+    )
+
+    assert [
+        annotation.worker_id
+        for annotation in task_data.annotations[("81_1", "MARCO_1104225")]
+    ] == ["worker_298", "worker_333"]
+
+
+def test_load_annotations_table_with_missing_filter_column():
+    """Test that filters on columns missing in a file are rejected."""
+    with pytest.raises(ValueError):
+        load_annotations_table(
+            "tests/data/test_prolific_annotations.csv",
+            AnnotationSource.PROLIFIC,
+            [REJECTED_ASSIGNMENTS_FILTER],
+        )
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_load_task_data_from_file_canonicalized(use_cache: bool):
+    """Test that canonicalized annotations do not change cached data.
+
+    Args:
+        use_cache: Whether the cache is used.
+    """
+    task_data_path = "tests/data/test_paragraph_annotations.csv"
+    canonical_annotations = load_worker_annotations_from_file(
+        task_data_path,
+        AnnotationSource.MTURK,
+        use_cache=use_cache,
+        canonicalize=True,
+    )
+    annotations = load_worker_annotations_from_file(
+        task_data_path, AnnotationSource.MTURK, use_cache=use_cache
+    )
+
+    assert canonical_annotations.keys() == annotations.keys()
+    for key, workers_annotations in annotations.items():
+        for annotation, canonical_annotation in zip(
+            workers_annotations, canonical_annotations[key]
+        ):
+            assert not annotation.canonical
+            assert canonical_annotation.canonical
+            assert canonical_annotation.intervals == canonicalize_intervals(
+                annotation.intervals, len(annotation.input_text.text)
+            )
+    assert (
+        dict(
+            iter_worker_annotations_from_file(
+                task_data_path, AnnotationSource.MTURK, canonicalize=True
+            )
+        )
+        == canonical_annotations
+    )
@@ -0,0 +1,172 @@
+"""Tests for the sentence tokenizer."""
+
+import sys
+from typing import List, Tuple
+
+import pytest
+
+from snippet_annotation.utilities import sentence_tokenizer
+from snippet_annotation.utilities.sentence_tokenizer import (
+    RegexSentenceTokenizer,
+    SegmentationCache,
+    get_sentence_tokenizer,
+)
+
+
+@pytest.mark.parametrize(
+    ("text", "sentences"),
+    [
+        ("", []),
+        ("   ", []),
+        ("One sentence", ["One sentence"]),
+        (
+            "Sentence 1. Sentence 2. Sentence 3.",
+            ["Sentence 1.", "Sentence 2.", "Sentence 3."],
+        ),
+        (
+            "  Is it? Yes!  It is (really).\nNew line.",
+            ["Is it?", "Yes!", "It is (really).", "New line."],
+        ),
+        (
+            'He said "Stop." Then he left.',
+            ['He said "Stop."', "Then he left."],
+        ),
+        (
+            "Mr. Smith met Dr. J. Doe, e.g. at 3 p.m. today. Done.",
+            ["Mr. Smith met Dr. J. Doe, e.g. at 3 p.m. today.", "Done."],
+        ),
+        (
+            "Version 2.5 is out... Update now.",
+            ["Version 2.5 is out...", "Update now."],
+        ),
+    ],
+)
+def test_regex_sentence_tokenizer(text: str, sentences: List[str]):
+    """Test for splitting texts into sentences without NLTK data.
+
+    Args:
+        text: Text to split.
+        sentences: Expected sentences.
+    """
+    spans = RegexSentenceTokenizer().span_tokenize(text)
+
+    assert [text[start:end] for start, end in spans] == sentences
+    assert spans == sorted(spans)
+
+
+def test_get_sentence_tokenizer_offline(monkeypatch: pytest.MonkeyPatch):
+    """Test that the tokenizer is loaded once without downloading data.
+
+    Args:
+        monkeypatch: Fixture for patching modules.
+    """
+    nltk = pytest.importorskip("nltk")
+
+    def _download(*args: Tuple, **kwargs: Tuple) -> None:
+        raise AssertionError("NLTK data must not be downloaded.")
+
+    monkeypatch.setattr(nltk, "download", _download)
+    monkeypatch.setattr(sentence_tokenizer, "_tokenizers", {})
+
+    tokenizer = get_sentence_tokenizer()
+
+    assert get_sentence_tokenizer() is tokenizer
+    assert list(tokenizer.span_tokenize("First one. Second one.")) == [
+        (0, 10),
+        (11, 22),
+    ]
+
+
+def test_get_sentence_tokenizer_without_nltk(monkeypatch: pytest.MonkeyPatch):
+    """Test that the fallback tokenizer is used if NLTK is not installed.
+
+    Args:
+        monkeypatch: Fixture for patching modules.
+    """
+    monkeypatch.setitem(sys.modules, "nltk", None)
+    monkeypatch.setitem(sys.modules, "nltk.data", None)
+    monkeypatch.setattr(sentence_tokenizer, "_tokenizers", {})
+
+    assert isinstance(get_sentence_tokenizer(), RegexSentenceTokenizer)
+
+
+class _CountingTokenizer(RegexSentenceTokenizer):
+    """Tokenizer counting split texts."""
+
+    def __init__(self) -> None:
+        """Tokenizer counting split texts."""
+        self.num_calls = 0
+
+    def span_tokenize(self, text: str) -> List[Tuple[int, int]]:
+        """Finds sentences in a text and counts the call.
+
+        Args:
+            text: Text to split.
+
+        Returns:
+            Start and end positions of sentences.
+        """
+        self.num_calls += 1
+        return super().span_tokenize(text)
+
+
+@pytest.fixture
+def tokenizer(monkeypatch: pytest.MonkeyPatch) -> _CountingTokenizer:
+    """Tokenizer used for all languages.
+
+    Args:
+        monkeypatch: Fixture for patching modules.
+
+    Returns:
+        Counting tokenizer.
+    """
+    counting_tokenizer = _CountingTokenizer()
+    monkeypatch.setattr(
+        sentence_tokenizer,
+        "get_sentence_tokenizer",
+        lambda language: counting_tokenizer,
+    )
+    return counting_tokenizer
+
+
+def test_segmentation_cache(tokenizer: _CountingTokenizer):
+    """Test that every text is split once while it is kept in memory.
+
+    Args:
+        tokenizer: Counting tokenizer.
+    """
+    cache = SegmentationCache(max_entries=2)
+    texts = ["First one. Second one.", "Only one.", "A. B. C."]
+
+    for text in texts[:2] * 3:
+        assert cache.get_spans(text) == RegexSentenceTokenizer().span_tokenize(
+            text
+        )
+    assert tokenizer.num_calls == 2
+
+    cache.get_spans(texts[2])
+    cache.get_spans(texts[1])
+    assert tokenizer.num_calls == 3
+    assert len(cache) == 2
+    cache.get_spans(texts[0])
+    assert tokenizer.num_calls == 4
+
+
+def test_segmentation_cache_on_disk(tmp_path, tokenizer: _CountingTokenizer):
+    """Test that spans stored on disk are reused by another cache.
+
+    Args:
+        tmp_path: Temporary directory.
+        tokenizer: Counting tokenizer.
+    """
+    cache_dir = str(tmp_path / "sentences")
+    text = "First one. Second one."
+    spans = SegmentationCache(cache_dir=cache_dir).get_spans(text)
+
+    assert SegmentationCache(cache_dir=cache_dir).get_spans(text) == spans
+    assert tokenizer.num_calls == 1
+
+    cache = SegmentationCache(cache_dir=cache_dir)
+    cache.clear()
+    assert cache.get_spans(text) == spans
+    assert tokenizer.num_calls == 2
@@ -0,0 +1,189 @@
+"""Tests for parsing worker answers exported from MTurk and Prolific."""
+
+import ast
+import pickle
+from typing import List, Optional
+
+import pandas as pd
+import pytest
+
+from snippet_annotation.annotation import ConfidenceScore, Interval
+from snippet_annotation.utilities.conversion import (
+    MTURK_PARAGRAPH_ANNOTATION_NAME,
+    MTURK_SENTENCE_ANNOTATION_NAME,
+    PROLIFIC_PARAGRAPH_ANNOTATION_NAME,
+)
+from snippet_annotation.utilities.task_answers import (
+    MalformedTaskAnswersError,
+    _decode_payload,
+    parse_task_answers,
+    parse_task_answers_column,
+)
+
+
+@pytest.mark.parametrize(
+    ("payload", "annotation_name", "intervals", "confidence"),
+    [
+        (
+            (
+                '[{"answer_confidence":{"high":False,"low":False,"medium":'
+                'True,"very_high":False,"very_low":False},"relevant-text-'
+                'spans-single-passage-annotation":{"entities":[{"endOffset":'
+                '120,"label":"relevant-text-span","startOffset":34},{'
+                '"endOffset":297,"label":"relevant-text-span","startOffset":'
+                "253}]}}]"
+            ),
+            MTURK_PARAGRAPH_ANNOTATION_NAME,
+            [Interval(34, 120), Interval(253, 297)],
+            ConfidenceScore.MEDIUM,
+        ),
+        (
+            (
+                "[{'relevant-text-spans-prolific-annotation': {'entities': "
+                "[{'startOffset': 171, 'endOffset': 223, 'label': "
+                "'relevant-text-span'}]}}]"
+            ),
+            PROLIFIC_PARAGRAPH_ANNOTATION_NAME,
+            [Interval(171, 223)],
+            None,
+        ),
+        (
+            (
+                "[{'relevant-text-spans-sentence': {'entities': [{"
+                "'startOffset': 0, 'endOffset': 5, 'label': \"it's\"}]}}]"
+            ),
+            MTURK_SENTENCE_ANNOTATION_NAME,
+            [Interval(0, 5)],
+            None,
+        ),
+        (
+            (
+                '[{"answer_confidence":{"high":True,"very_high":False},'
+                '"relevant-text-spans-sentence":{"entities":[]}}]'
+            ),
+            None,
+            [],
+            ConfidenceScore.HIGH,
+        ),
+    ],
+)
+def test_parse_task_answers(
+    payload: str,
+    annotation_name: Optional[str],
+    intervals: List[Interval],
+    confidence: Optional[ConfidenceScore],
+):
+    """Test for parsing intervals and confidence score from task answers.
+
+    Args:
+        payload: Task answers as raw text.
+        annotation_name: Name of the annotation with selected intervals.
+        intervals: Expected intervals.
+        confidence: Expected confidence score.
+    """
+    task_answers = parse_task_answers(payload, annotation_name)
+    assert task_answers.intervals == intervals
+    assert task_answers.confidence == confidence
+
+
+@pytest.mark.parametrize(
+    ("task_data_path", "annotation_name"),
+    [
+        (
+            "tests/data/test_paragraph_annotations.csv",
+            MTURK_PARAGRAPH_ANNOTATION_NAME,
+        ),
+        (
+            "tests/data/test_sentence_annotations.csv",
+            MTURK_SENTENCE_ANNOTATION_NAME,
+        ),
+        (
+            "tests/data/test_prolific_annotations.csv",
+            PROLIFIC_PARAGRAPH_ANNOTATION_NAME,
+        ),
+    ],
+)
+def test_parse_task_answers_column_matches_literal_eval(
+    task_data_path: str, annotation_name: str
+):
+    """Test that parsed answers are the same as parsed Python literals.
+
+    Args:
+        task_data_path: Path to the file with annotations.
+        annotation_name: Name of the annotation with selected intervals.
+    """
+    payloads = pd.read_csv(task_data_path)["Answer.taskAnswers"].tolist()
+    expected_intervals = [
+        [
+            Interval(int(entity["startOffset"]), int(entity["endOffset"]))
+            for entity in ast.literal_eval(payload)[0][annotation_name][
+                "entities"
+            ]
+        ]
+        for payload in payloads
+    ]
+    assert [
+        task_answers.intervals
+        for task_answers in parse_task_answers_column(payloads, annotation_name)
+    ] == expected_intervals
+
+
+def test_parse_task_answers_column_reports_malformed_rows():
+    """Test that all malformed rows are reported together."""
+    payloads = [
+        '[{"relevant-text-spans-sentence":{"entities":[]}}]',
+        '[{"relevant-text-spans-sentence":{"entities":[{"endOffset":5}]}}]',
+        '[{"relevant-text-spans-sentence":',
+        float("nan"),
+        "[]",
+        '[{"answer_confidence":{"extreme":True}}]',
+    ]
+    with pytest.raises(MalformedTaskAnswersError) as e:
+        parse_task_answers_column(payloads, MTURK_SENTENCE_ANNOTATION_NAME)
+    assert list(e.value.reasons.keys()) == [1, 2, 3, 4, 5]
+
+
+def test_malformed_task_answers_error_is_picklable():
+    """Test that the error is unpickled with its reasons and path."""
+    error = pickle.loads(
+        pickle.dumps(MalformedTaskAnswersError({3: "no entities"}, "a.csv"))
+    )
+
+    assert error.reasons == {3: "no entities"}
+    assert error.path == "a.csv"
+    assert "row 3: no entities" in str(error)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        (
+            '[{"answer_confidence":{"high":True,"low":False},"comment":'
+            '"True story, None of it is False","note":None,'
+            '"relevant-text-spans-sentence":{"entities":[]}}]'
+        ),
+        (
+            "[{'comment': 'True story, None of it', 'flag': False, 'none': "
+            "None, 'relevant-text-spans-sentence': {'entities': []}}]"
+        ),
+        (
+            "[{'comment': \"It's True, isn't it? None.\", 'flag': True, "
+            "'relevant-text-spans-sentence': {'entities': []}}]"
+        ),
+        (
+            "[{'comment': 'It\\'s False', 'flag': None, "
+            "'relevant-text-spans-sentence': {'entities': []}}]"
+        ),
+        (
+            '[{"comment":"Say \\"True\\" or \\"None\\"","flag":True,'
+            '"relevant-text-spans-sentence":{"entities":[]}}]'
+        ),
+    ],
+)
+def test_decode_payload_keeps_literals_in_strings(payload: str):
+    """Test that True, False and None are replaced only outside of strings.
+
+    Args:
+        payload: Task answers with literals inside string values.
+    """
+    assert _decode_payload(payload) == ast.literal_eval(payload)